@@ -1,6 +1,14 @@
+import hashlib
+import json
+
 import frappe
 from frappe import _
-import json
+
+# Events that may run slow handlers, acknowledged immediately in background mode
+DEFERRED_EVENT_TYPES = ("MESSAGE", "CARD_CLICKED")
+# Seconds an event is remembered, covering Google Chat's delivery retries
+EVENT_DEDUP_TTL = 300
+EVENT_PENDING = b""
 
 @frappe.whitelist(allow_guest=True)
 def handle_google_chat_event():
@@ -8,16 +16,24 @@ def handle_google_chat_event():
     Handle incoming events from Google Chat.
     Endpoint: /api/method/gchat_integration.api.handle_google_chat_event
     """
+    event_key = None
     try:
         # Check if bot is enabled
-        from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import is_bot_enabled
-        if not is_bot_enabled():
+        from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+            get_settings_snapshot,
+        )
+        settings = get_settings_snapshot()
+        if not settings.enable_bot:
             frappe.log_error("Google Chat Bot is not enabled in settings", "Google Chat Integration")
             return {"text": "Bot integration is not enabled"}
-        
+
         if frappe.request.method != "POST":
             return
 
+        if not is_valid_event(settings.project_number):
+            frappe.local.response["http_status_code"] = 401
+            return {"text": "Invalid bearer token"}
+
         data = frappe.get_request_header("Content-Type")
         if "application/json" not in data:
             data = json.loads(frappe.request.get_data())
@@ -27,28 +43,142 @@ def handle_google_chat_event():
         if not data:
             return
 
-        event_type = data.get("type")
-        
-        if event_type == "ADDED_TO_SPACE":
-            return on_added_to_space(data)
-        elif event_type == "REMOVED_FROM_SPACE":
-            return on_removed_from_space(data)
-        elif event_type == "MESSAGE":
-            return on_message(data)
-        elif event_type == "CARD_CLICKED":
-            return on_card_clicked(data)
+        event_key = get_event_key(data)
+        if event_key and (cached := claim_event(event_key)) is not None:
+            # A retried delivery, answer it like the first one instead of handling it again
+            return cached
+
+        if settings.process_events_in_background and data.get("type") in DEFERRED_EVENT_TYPES:
+            # Acknowledge now, the handler's response is posted to the space when done
+            frappe.enqueue("gchat_integration.api.process_event", queue="short", chat_event=data)
+            response = {}
         else:
-            return {"text": "Unknown event type"}
+            response = dispatch_event(data)
+
+        if event_key:
+            store_event_response(event_key, response)
+        return response
 
     except Exception as e:
-        frappe.log_error(f"Google Chat Event Error: {str(e)}", "Google Chat Integration")
+        if event_key:
+            # Let Google Chat's retry handle the event again
+            release_event(event_key)
+        frappe.log_error(f"Google Chat Event Error: {e!s}", "Google Chat Integration")
         return {"text": "Error processing event"}
 
+def is_valid_event(project_number):
+    """Check that the request was sent by Google Chat, if a project number is configured."""
+    if not project_number:
+        return True
+
+    from gchat_integration.gchat_integration.event_verification import InvalidEvent, verify_event_token
+    try:
+        verify_event_token(frappe.get_request_header("Authorization"), project_number)
+    except InvalidEvent as e:
+        frappe.logger().info(f"Rejected Google Chat request: {e}")
+        return False
+    return True
+
+def get_event_key(data):
+    """Identify an event delivery, retries of an event carry the same identifiers."""
+    if not data.get("eventTime"):
+        return None
+
+    message = data.get("message") or {}
+    action = data.get("action") or {}
+    identifiers = (
+        data.get("type"),
+        data.get("eventTime"),
+        (data.get("space") or {}).get("name"),
+        (data.get("user") or {}).get("name"),
+        message.get("name"),
+        action.get("actionMethodName"),
+        json.dumps(action.get("parameters"), sort_keys=True),
+    )
+    return hashlib.sha1("|".join(str(i) for i in identifiers).encode()).hexdigest()
+
+def claim_event(event_key):
+    """
+    Claim an event for handling.
+    Returns None if the event is new, otherwise the response of its earlier delivery
+    ({} while that one is still being handled).
+    """
+    cache = frappe.cache()
+    key = cache.make_key(f"gchat_event:{event_key}")
+    if cache.set(key, EVENT_PENDING, nx=True, ex=EVENT_DEDUP_TTL):
+        return None
+
+    response = cache.get(key)
+    return json.loads(response) if response else {}
+
+def store_event_response(event_key, response):
+    cache = frappe.cache()
+    cache.set(cache.make_key(f"gchat_event:{event_key}"), json.dumps(response or {}), xx=True, ex=EVENT_DEDUP_TTL)
+
+def release_event(event_key):
+    cache = frappe.cache()
+    cache.delete(cache.make_key(f"gchat_event:{event_key}"))
+
+def dispatch_event(data):
+    """Run the handler for an event and return its response."""
+    event_type = data.get("type")
+
+    if event_type == "ADDED_TO_SPACE":
+        return on_added_to_space(data)
+    elif event_type == "REMOVED_FROM_SPACE":
+        return on_removed_from_space(data)
+    elif event_type == "MESSAGE":
+        return on_message(data)
+    elif event_type == "CARD_CLICKED":
+        return on_card_clicked(data)
+    else:
+        return {"text": "Unknown event type"}
+
+def process_event(chat_event):
+    """Background job: handle an acknowledged event and post its response to the space."""
+    try:
+        response = dispatch_event(chat_event)
+        if response:
+            post_event_response(chat_event, response)
+    except Exception as e:
+        if event_key := get_event_key(chat_event):
+            # Let Google Chat's retry handle the event again
+            release_event(event_key)
+        frappe.log_error(f"Google Chat Event Error: {e!s}\nEvent: {json.dumps(chat_event)}", "Google Chat Integration")
+
+def post_event_response(event, response):
+    """Post a handler's response as a message in the event's space, in the same thread."""
+    space_id = (event.get("space") or {}).get("name")
+    if not space_id:
+        return
+
+    body = dict(response)
+    thread_name = ((event.get("message") or {}).get("thread") or {}).get("name")
+    if thread_name:
+        body["thread"] = {"name": thread_name}
+
+    return send_space_message(space_id, body)
+
+def send_space_message(space_id, body):
+    """
+    Create a message in a Google Chat Space using Chat API.
+    Requires Service Account credentials.
+    """
+    from gchat_integration.gchat_integration.chat_api import create_message
+
+    frappe.logger().debug(f"Space Message Payload for {space_id}: {json.dumps(body)}")
+    try:
+        create_message(space_id, body)
+        return "success"
+    except Exception as e:
+        frappe.log_error(f"Exception: {e!s}\nSpace: {space_id}\nPayload: {json.dumps(body)}", "Google Chat Integration")
+        return "error"
+
 def on_added_to_space(data):
     """Handle ADDED_TO_SPACE event."""
     user_name = data.get("user", {}).get("displayName", "User")
     space_name = data.get("space", {}).get("displayName", "this space")
-    
+
     return {
         "text": f"Thanks for adding me to {space_name}, {user_name}!"
     }
@@ -60,66 +190,174 @@ def on_removed_from_space(data):
 
 def on_message(data):
     """Handle MESSAGE event."""
-    # Echo back for now or handle commands
+    # Registered commands (gchat_commands hook), otherwise echo back
+    from gchat_integration.gchat_integration.commands import route_message
+    response = route_message(data)
+    if response is not None:
+        return response
+
     message_text = data.get("message", {}).get("text", "")
-    
+
     return {
         "text": f"You said: {message_text}"
     }
 
 def on_card_clicked(data):
     """Handle CARD_CLICKED event (e.g. Workflow Approvals)."""
-    action_method = data.get("action", {}).get("actionMethodName")
-    parameters = data.get("action", {}).get("parameters", [])
-    
+    from gchat_integration.gchat_integration.workflow_approvals import BULK_ACTION_METHOD, handle_bulk_action
+
+    action_method = data.get("action", {}).get("actionMethodName") or data.get("common", {}).get("invokedFunction")
+
     if action_method == "approve_workflow":
-        return handle_workflow_action(parameters, "Approve")
+        return handle_workflow_action(data, "Approve")
     elif action_method == "reject_workflow":
-        return handle_workflow_action(parameters, "Reject")
-    
+        return handle_workflow_action(data, "Reject")
+    elif action_method == BULK_ACTION_METHOD:
+        # Digest card of pending approvals, applied in one background batch
+        return handle_bulk_action(data)
+
     return {"text": "Action received"}
 
-def handle_workflow_action(parameters, action):
-    """Process workflow action."""
-    # Check if workflow approvals are enabled
-    from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import is_workflow_approvals_enabled
-    if not is_workflow_approvals_enabled():
-        return {"text": "Workflow approvals are not enabled"}
-    
+def handle_workflow_action(data, action):
+    """Apply a workflow action to one document, as the user who clicked."""
+    # Check if workflow approvals are enabled, for verified events only
+    from gchat_integration.gchat_integration.workflow_approvals import get_unavailable_reason
+    if reason := get_unavailable_reason():
+        return {"text": reason}
+
     # parameters is a list of dicts: [{'key': 'doctype', 'value': ...}, {'key': 'docname', 'value': ...}]
     doctype = None
     docname = None
-    
-    for param in parameters:
+
+    for param in data.get("action", {}).get("parameters", []):
         if param.get("key") == "doctype":
             doctype = param.get("value")
         elif param.get("key") == "docname":
             docname = param.get("value")
-            
+
     if doctype and docname:
+        from gchat_integration.gchat_integration.workflow_approvals import (
+            apply_workflow_actions,
+            get_event_user,
+            get_result_message,
+        )
+
+        user = get_event_user(data)
+        if not user:
+            return {"text": "Your Google Chat account is not linked to an enabled user"}
+
+        if doctype == "Workflow Action":
+            # Cards sent for a Workflow Action act on the document it is for
+            doctype, docname = frappe.db.get_value("Workflow Action", docname, ["reference_doctype", "reference_name"]) or (doctype, docname)
+
         frappe.logger().info(f"Processing workflow action {action} for {doctype} {docname}")
-        # frappe.get_doc(doctype, docname).apply_workflow_transition(action) # Example
-        return {"text": f"Workflow {action} action processed for {docname}"}
-        
+        results = apply_workflow_actions(user, [(doctype, docname, None)], action)
+        return {"text": get_result_message(action, results)}
+
     return {"text": f"Workflow {action} action processed (missing parameters)"}
 
-def send_google_chat_bot_message(space_id, message, reference_doctype, reference_name):
+def send_google_chat_bot_message(space_id, message, reference_doctype, reference_name, raise_on_error=False, message_mode=None):
     """
     Send a message to Google Chat Space using Chat API.
     Requires Service Account credentials.
+
+    With `message_mode` "Reply in Thread", all messages about the reference document go
+    into one thread. With "Update Message", the document's first message is stored and
+    later sends patch it (split messages are posted into its thread instead).
+
+    Returns "success" or "error". With `raise_on_error`, failures raise `DeliveryError`
+    (or `RateLimitExceeded`) instead.
     """
     frappe.logger().info(f"Preparing to send Bot message to Space: {space_id}")
-    
-    # Convert HTML to text/widgets
-    from gchat_integration.gchat_integration.doctype.google_chat_webhook.google_chat_webhook import convert_html_to_gchat_text
-    formatted_message = convert_html_to_gchat_text(message)
-    
+
+    # Convert HTML to text/widgets, sharing the conversion cache with webhook sends.
+    # Messages too long for one message are split, the card carries the last part
+    from gchat_integration.gchat_integration.formatting import iter_message_parts
+    parts = list(iter_message_parts(message)) or [""]
+    formatted_message = parts.pop()
+
+    card = build_bot_card(formatted_message, reference_doctype, reference_name)
+    frappe.logger().debug(f"Bot Message Payload: {json.dumps(card)}")
+
+    from gchat_integration.gchat_integration.chat_api import (
+        MODE_REPLY,
+        MODE_UPDATE,
+        create_message,
+        get_document_thread_key,
+        get_space_name,
+        get_thread_key,
+    )
+    from gchat_integration.gchat_integration.rate_limiter import RateLimitExceeded
+    from gchat_integration.gchat_integration.retry import DeliveryError
+
+    # Earlier parts go first as plain text, all in one thread
+    if message_mode in (MODE_REPLY, MODE_UPDATE):
+        thread_key = get_document_thread_key(reference_doctype, reference_name)
+    else:
+        thread_key = get_thread_key(reference_doctype, reference_name, message) if parts else None
+
+    try:
+        if message_mode == MODE_UPDATE and not parts and update_document_message(space_id, card, reference_doctype, reference_name):
+            frappe.logger().info(f"Google Chat message updated in space: {space_id}")
+            return "success"
+
+        for part in parts:
+            create_message(space_id, {"text": part}, thread_key=thread_key)
+        created = create_message(space_id, card, thread_key=thread_key)
+
+        if message_mode == MODE_UPDATE:
+            from gchat_integration.gchat_integration.doctype.google_chat_document_message.google_chat_document_message import (
+                set_document_message,
+            )
+            set_document_message(reference_doctype, reference_name, get_space_name(space_id), created)
+    except RateLimitExceeded as e:
+        if raise_on_error:
+            # Queued messages wait for the space's rate limit instead of failing
+            raise
+
+        frappe.log_error(f"Space: {space_id}\n{e!s}", "Google Chat Integration")
+        return "error"
+    except Exception as e:
+        if raise_on_error:
+            raise e if isinstance(e, DeliveryError) else DeliveryError(str(e))
+
+        frappe.log_error(f"Exception: {e!s}\nSpace: {space_id}\nPayload: {json.dumps(card)}", "Google Chat Integration")
+        return "error"
+
+    frappe.logger().info(f"Google Chat message sent successfully to space: {space_id}")
+    return "success"
+
+def deliver_bot_bulk(space_ids, message, reference_doctype, reference_name):
+    """
+    Send one new message to several spaces concurrently, without logging.
+
+    The message is converted and its card built once. A message too long for one
+    message is split, the parts are posted one after another into one thread of
+    each space.
+
+    Returns a dict of space to `(error, latency in seconds)`. The error is None for a
+    delivered message, otherwise a `DeliveryError` or `RateLimitExceeded`.
+    """
+    from gchat_integration.gchat_integration.chat_api import create_messages, get_thread_key
+    from gchat_integration.gchat_integration.formatting import iter_message_parts
+
+    space_ids = list(dict.fromkeys(space_ids))
+    parts = list(iter_message_parts(message)) or [""]
+    bodies = [{"text": part} for part in parts[:-1]]
+    bodies.append(build_bot_card(parts[-1], reference_doctype, reference_name))
+    thread_key = get_thread_key(reference_doctype, reference_name, message) if len(parts) > 1 else None
+
+    results = create_messages([(space_id, bodies) for space_id in space_ids], thread_key=thread_key)
+    return dict(zip(space_ids, results, strict=True))
+
+def build_bot_card(formatted_message, reference_doctype, reference_name):
+    """Build the Chatbot card for a message, with a button opening the reference document."""
     # Check if it's a workflow action (heuristic: if message contains "Approve" or "Reject" or if we want to force it)
     # For now, let's just create a card with the message and a link
-    
+
     from frappe.utils import get_url_to_form
     doc_url = get_url_to_form(reference_doctype, reference_name)
-    
+
     card = {
         "cardsV2": [
             {
@@ -158,7 +396,7 @@ def send_google_chat_bot_message(space_id, message, reference_doctype, reference
             }
         ]
     }
-    
+
     # If it's a Workflow Action, we might want to add Approve/Reject buttons
     # This would require checking the context or document state
     if reference_doctype == "Workflow Action":
@@ -194,12 +432,30 @@ def send_google_chat_bot_message(space_id, message, reference_doctype, reference
             }
         ])
 
-    frappe.logger().info(f"Bot Message Payload: {json.dumps(card)}")
-    
-    # TODO: Authenticate and send to Google Chat API
-    # credentials = get_service_account_credentials()
-    # service = build('chat', 'v1', credentials=credentials)
-    # service.spaces().messages().create(parent=space_id, body=card).execute()
-    
-    return "success"
+    return card
+
+def update_document_message(space_id, card, reference_doctype, reference_name):
+    """
+    Patch the stored message of a document with a new card.
+    Returns False if there is none to update (never sent, or deleted in Google Chat).
+    """
+    from gchat_integration.gchat_integration.chat_api import get_space_name, update_message
+    from gchat_integration.gchat_integration.doctype.google_chat_document_message.google_chat_document_message import (
+        get_document_message,
+    )
+    from gchat_integration.gchat_integration.retry import DeliveryError
+
+    message_name = get_document_message(reference_doctype, reference_name, get_space_name(space_id))
+    if not message_name:
+        return False
+
+    try:
+        update_message(message_name, card)
+    except DeliveryError as e:
+        if e.status_code == 404:
+            # Deleted in Google Chat, post a new one
+            return False
+        raise
+
+    return True
 
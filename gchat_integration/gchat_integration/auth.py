@@ -0,0 +1,178 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+OAuth access tokens for the Chat API, from the service account in Google Chat Settings.
+
+The service account key is parsed once per process. A token is obtained with a signed
+JWT assertion and cached in Redis, shared by all workers, and in process memory, so a
+send in steady state neither signs anything nor talks to the token endpoint. Tokens
+are refreshed ahead of expiry by a single worker holding a Redis lock, the others keep
+using the current token meanwhile.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from hashlib import sha1
+
+import frappe
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+from gchat_integration.gchat_integration.http_client import request
+from gchat_integration.gchat_integration.retry import DeliveryError
+
+CHAT_BOT_SCOPE = "https://www.googleapis.com/auth/chat.bot"
+DEFAULT_TOKEN_URI = "https://oauth2.googleapis.com/token"
+JWT_BEARER_GRANT = "urn:ietf:params:oauth:grant-type:jwt-bearer"
+ASSERTION_LIFETIME = 3600  # seconds, the maximum Google accepts
+REFRESH_MARGIN = 300  # seconds before expiry a token is refreshed
+LOCK_TIMEOUT = 30  # seconds a refresh may hold the lock
+LOCK_WAIT = 10  # seconds to wait for another worker's refresh when there is no valid token
+
+# site -> (fingerprint, ServiceAccount)
+_accounts = {}
+# (site, fingerprint, scope) -> (access token, expires at)
+_tokens = {}
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ServiceAccount:
+	"""A parsed service account key."""
+
+	fingerprint: str
+	client_email: str
+	private_key_id: str | None
+	private_key: object
+	token_uri: str
+
+	def sign_assertion(self, scope):
+		now = int(time.time())
+		claims = {
+			"iss": self.client_email,
+			"scope": scope,
+			"aud": self.token_uri,
+			"iat": now,
+			"exp": now + ASSERTION_LIFETIME,
+		}
+		headers = {"kid": self.private_key_id} if self.private_key_id else None
+		return jwt.encode(claims, self.private_key, algorithm="RS256", headers=headers)
+
+
+def get_service_account():
+	"""Return the service account from Google Chat Settings, parsing its key only when it changed."""
+	from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+		get_settings_snapshot,
+	)
+
+	settings = get_settings_snapshot()
+	if not settings.service_account_creds:
+		raise DeliveryError("Service Account JSON is not configured in Google Chat Settings")
+
+	fingerprint = sha1(f"{settings.service_account_creds}|{settings.token_uri or ''}".encode()).hexdigest()
+	cached = _accounts.get(frappe.local.site)
+	if cached and cached[0] == fingerprint:
+		return cached[1]
+
+	creds = json.loads(settings.service_account_creds)
+	account = ServiceAccount(
+		fingerprint=fingerprint,
+		client_email=creds["client_email"],
+		private_key_id=creds.get("private_key_id"),
+		private_key=load_pem_private_key(creds["private_key"].encode(), password=None),
+		token_uri=settings.token_uri or creds.get("token_uri") or DEFAULT_TOKEN_URI,
+	)
+	_accounts[frappe.local.site] = (fingerprint, account)
+	return account
+
+
+def get_access_token(scope=CHAT_BOT_SCOPE):
+	"""Return a valid access token for the configured service account.
+
+	Raises:
+		DeliveryError: if no token could be obtained (retryable for transient failures)
+	"""
+	account = get_service_account()
+	local_key = (frappe.local.site, account.fingerprint, scope)
+	token = _tokens.get(local_key)
+	if _is_fresh(token):
+		return token[0]
+
+	cache = frappe.cache()
+	redis_key = cache.make_key(f"gchat_access_token:{account.fingerprint}:{scope}")
+	token = _read_token(cache, redis_key)
+	if not _is_fresh(token):
+		token = _refresh_token(cache, redis_key, account, scope, current=token)
+
+	with _lock:
+		_tokens[local_key] = token
+	return token[0]
+
+
+def get_auth_headers(scope=CHAT_BOT_SCOPE):
+	return {"Authorization": f"Bearer {get_access_token(scope)}"}
+
+
+def _is_fresh(token):
+	return token is not None and token[1] - time.time() > REFRESH_MARGIN
+
+
+def _read_token(cache, redis_key):
+	value = cache.get(redis_key)
+	if not value:
+		return None
+	token = json.loads(value)
+	return token["access_token"], token["expires_at"]
+
+
+def _refresh_token(cache, redis_key, account, scope, current=None):
+	"""Fetch a new token while holding the refresh lock, unless another worker already did."""
+	usable = current is not None and current[1] > time.time()
+	lock = cache.lock(f"{redis_key}:lock", timeout=LOCK_TIMEOUT)
+
+	# With a still valid token there is no need to wait for another worker's refresh
+	if not lock.acquire(blocking=not usable, blocking_timeout=LOCK_WAIT):
+		if usable:
+			return current
+		raise DeliveryError("Timed out waiting for the access token refresh", retryable=True)
+
+	try:
+		token = _read_token(cache, redis_key)
+		if _is_fresh(token):
+			return token
+
+		token = _fetch_token(account, scope)
+		cache.set(
+			redis_key,
+			json.dumps({"access_token": token[0], "expires_at": token[1]}),
+			ex=max(int(token[1] - time.time()), 1),
+		)
+		return token
+	finally:
+		try:
+			lock.release()
+		except Exception:
+			# The lock expired meanwhile, another worker may hold it now
+			pass
+
+
+def _fetch_token(account, scope):
+	try:
+		response = request(
+			"POST",
+			account.token_uri,
+			data={"grant_type": JWT_BEARER_GRANT, "assertion": account.sign_assertion(scope)},
+		)
+	except Exception as e:
+		raise DeliveryError.from_exception(e)
+
+	if not response.ok:
+		raise DeliveryError.from_response(
+			response, f"Token request failed\nStatus: {response.status_code}\nResponse: {response.text}"
+		)
+
+	data = response.json()
+	return data["access_token"], time.time() + int(data.get("expires_in", ASSERTION_LIFETIME))
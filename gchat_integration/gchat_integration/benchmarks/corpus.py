@@ -0,0 +1,142 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Generated HTML corpus for converter benchmarks and property tests.
+
+Every generator is deterministic for a given seed, so benchmark runs compare like with like.
+"""
+
+import random
+
+WORDS = (
+	"order customer invoice amount overdue pending approved delivery warehouse item "
+	"quantity rate total due date payment reminder shipment stock project task"
+).split()
+INLINE_TAGS = ("b", "strong", "i", "em", "s", "strike")
+HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+REPORT_SIZE = 200 * 1024  # characters
+
+
+def words(rng, count):
+	return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_text(rng, count=8):
+	"""Plain words with some of them wrapped in (non-nested) inline formatting tags."""
+	parts = []
+	for _ in range(count):
+		word = rng.choice(WORDS)
+		if rng.random() < 0.2:
+			tag = rng.choice(INLINE_TAGS)
+			word = f"<{tag}>{word}</{tag}>"
+		parts.append(word)
+	return " ".join(parts)
+
+
+def alert(rng):
+	"""A typical notification: heading, a paragraph and a short list."""
+	items = "".join(f"<li>{words(rng, 2)}: {rng.randint(1, 9999)}</li>\n" for _ in range(3))
+	return (
+		f"<h3>{words(rng, 2)}</h3>\n\n"
+		f"<p>Transaction SO-{rng.randint(1, 99999):05d} {inline_text(rng)}.</p>\n\n"
+		f"<ul>\n{items}</ul>\n"
+	)
+
+
+def row_list(rng, rows=50):
+	items = "".join(f"<li>{inline_text(rng, 5)}: <b>{rng.randint(1, 999)}</b></li>\n" for _ in range(rows))
+	return f"<h4>{words(rng, 3)}</h4>\n<ul>\n{items}</ul>\n"
+
+
+def report(rng, size=REPORT_SIZE):
+	"""A large report body of headings, paragraphs and lists, about `size` characters long."""
+	parts = []
+	length = 0
+	while length < size:
+		part = rng.choice(
+			(
+				lambda: f"<h2>{words(rng, 4)}</h2>\n",
+				lambda: f"<p>{inline_text(rng, 30)}<br>{inline_text(rng, 10)}</p>\n",
+				lambda: row_list(rng, rng.randint(5, 20)),
+			)
+		)()
+		parts.append(part)
+		length += len(part)
+	return "".join(parts)
+
+
+def nested(rng, depth=50):
+	"""Deeply nested lists and inline formatting."""
+	html = []
+	for level in range(depth):
+		html.append(f"<ul><li>{words(rng, 2)} <b><i>level {level}</i></b>")
+	html.extend("</li></ul>" for _ in range(depth))
+	return "".join(html)
+
+
+def malformed(rng, size=2000):
+	"""Fragments of broken markup: unterminated tags and comments, stray brackets, unclosed items."""
+	fragments = (
+		"<",
+		">",
+		"<<",
+		"<b",
+		"</",
+		"<!--",
+		"-->",
+		"<li>",
+		"</ul>",
+		"<ul>",
+		"<p class='x",
+		"<br/",
+		"&amp;",
+		"<!doctype html>",
+		"<h3>",
+		"</h1>",
+	)
+	html = []
+	while sum(map(len, html)) < size:
+		html.append(rng.choice(fragments) if rng.random() < 0.5 else rng.choice(WORDS))
+	return " ".join(html)
+
+
+def documented(rng, blocks=6):
+	"""Well-formed HTML limited to the documented tags, without nesting or line breaks in elements.
+
+	On this subset every converter implementation must produce the same output.
+	"""
+	html = []
+	for _ in range(blocks):
+		kind = rng.randrange(4)
+		if kind == 0:
+			tag = rng.choice(HEADINGS)
+			html.append(f"<{tag}>{words(rng, 3)}</{tag}>")
+		elif kind == 1:
+			html.append(f"<p>{inline_text(rng)}</p>")
+		elif kind == 2:
+			items = "\n".join(f"<li>{inline_text(rng, 4)}</li>" for _ in range(rng.randint(1, 5)))
+			html.append(f"<ul>\n{items}\n</ul>")
+		else:
+			html.append(f"{inline_text(rng, 4)}<br>{words(rng, 2)}")
+	return "\n\n".join(html)
+
+
+# name -> (generator, messages in the corpus)
+CORPUS = {
+	"alert": (alert, 50),
+	"list_50_rows": (row_list, 20),
+	"report_200kb": (report, 2),
+	"nested": (nested, 20),
+	"malformed": (malformed, 20),
+}
+
+
+def build_corpus(seed=0):
+	"""Return `{name: [html, ...]}` for every corpus entry."""
+	corpus = {}
+	for name, (generate, count) in CORPUS.items():
+		rng = random.Random(f"{seed}:{name}")
+		corpus[name] = [generate(rng) for _ in range(count)]
+	return corpus
@@ -0,0 +1,56 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+The original regex based converter, kept as a reference implementation.
+
+Property tests check that the current converter produces the same output on the
+documented tags, and the benchmarks can be run against it for comparison.
+"""
+
+import re
+
+
+def convert_html_to_gchat_text(html_content):
+	"""Convert HTML content to Google Chat compatible text format."""
+	if not html_content:
+		return ""
+
+	# Replace headers with bold text and newline
+	html_content = re.sub(r"<h[1-6]>(.*?)</h[1-6]>", r"*\1*\n", html_content, flags=re.IGNORECASE)
+
+	# Replace paragraphs with double newline
+	html_content = re.sub(r"<p>(.*?)</p>", r"\1\n\n", html_content, flags=re.IGNORECASE)
+
+	# Replace unordered lists
+	html_content = re.sub(r"<ul>(.*?)</ul>", r"\1", html_content, flags=re.IGNORECASE | re.DOTALL)
+
+	# Replace list items with bullet points
+	html_content = re.sub(r"<li>(.*?)</li>", r"• \1\n", html_content, flags=re.IGNORECASE)
+	# Handle unclosed list items if any (common in some HTML)
+	html_content = re.sub(
+		r"<li>(.*?)(?=<li>|</ul>)", r"• \1\n", html_content, flags=re.IGNORECASE | re.DOTALL
+	)
+
+	# Replace line breaks
+	html_content = re.sub(r"<br\s*/?>", r"\n", html_content, flags=re.IGNORECASE)
+
+	# Replace bold tags
+	html_content = re.sub(r"<b>(.*?)</b>", r"*\1*", html_content, flags=re.IGNORECASE)
+	html_content = re.sub(r"<strong>(.*?)</strong>", r"*\1*", html_content, flags=re.IGNORECASE)
+
+	# Replace italic tags
+	html_content = re.sub(r"<i>(.*?)</i>", r"_\1_", html_content, flags=re.IGNORECASE)
+	html_content = re.sub(r"<em>(.*?)</em>", r"_\1_", html_content, flags=re.IGNORECASE)
+
+	# Replace strike tags
+	html_content = re.sub(r"<strike>(.*?)</strike>", r"~\1~", html_content, flags=re.IGNORECASE)
+	html_content = re.sub(r"<s>(.*?)</s>", r"~\1~", html_content, flags=re.IGNORECASE)
+
+	# Remove other tags but keep content
+	html_content = re.sub(r"<[^>]+>", "", html_content)
+
+	# Fix multiple newlines (max 2)
+	html_content = re.sub(r"\n{3,}", r"\n\n", html_content)
+
+	return html_content.strip()
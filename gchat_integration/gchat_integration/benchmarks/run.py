@@ -0,0 +1,139 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Benchmarks for `convert_html_to_gchat_text` over the generated corpus.
+
+Reports conversions per second and peak memory per corpus entry and compares them with
+the stored baselines. Runs without a site:
+
+	python -m gchat_integration.gchat_integration.benchmarks.run
+	python -m gchat_integration.gchat_integration.benchmarks.run --update-baselines
+	python -m gchat_integration.gchat_integration.benchmarks.run --reference
+
+Exits with status 1 if any entry is slower, or uses more memory, than its baseline by
+more than the threshold. Baselines are machine specific, update them on the machine
+that runs the comparison.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from gchat_integration.gchat_integration.benchmarks.corpus import build_corpus
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+DEFAULT_THRESHOLD = 0.25  # allowed regression, as a fraction of the baseline
+MIN_TIME = 0.5  # seconds spent timing each corpus entry
+
+
+def get_converter(reference=False):
+	if reference:
+		from gchat_integration.gchat_integration.benchmarks.reference import convert_html_to_gchat_text
+
+		return convert_html_to_gchat_text
+
+	from gchat_integration.gchat_integration.formatting import convert_html_to_gchat_text
+
+	# Measure conversion, not the cache
+	return lambda html: convert_html_to_gchat_text(html, use_cache=False)
+
+
+def measure(convert, messages, min_time=MIN_TIME):
+	"""Return `(conversions per second, peak memory in KiB)` for converting `messages`."""
+	# Warm up caches of the converter itself (compiled patterns, token actions)
+	for html in messages:
+		convert(html)
+
+	runs = 0
+	started = time.perf_counter()
+	while (elapsed := time.perf_counter() - started) < min_time or not runs:
+		for html in messages:
+			convert(html)
+		runs += 1
+
+	tracemalloc.start()
+	try:
+		for html in messages:
+			convert(html)
+		_, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+
+	return runs * len(messages) / elapsed, peak / 1024
+
+
+def run_benchmarks(reference=False, seed=0, min_time=MIN_TIME):
+	convert = get_converter(reference)
+	results = {}
+	for name, messages in build_corpus(seed).items():
+		ops, peak = measure(convert, messages, min_time)
+		results[name] = {"ops_per_sec": round(ops, 1), "peak_kib": round(peak, 1)}
+	return results
+
+
+def find_regressions(results, baselines, threshold=DEFAULT_THRESHOLD):
+	"""Return a description of every entry that regressed by more than `threshold`."""
+	regressions = []
+	for name, result in results.items():
+		baseline = baselines.get(name)
+		if not baseline:
+			continue
+
+		if result["ops_per_sec"] < baseline["ops_per_sec"] * (1 - threshold):
+			regressions.append(f"{name}: {result['ops_per_sec']} ops/sec, baseline {baseline['ops_per_sec']}")
+		if result["peak_kib"] > baseline["peak_kib"] * (1 + threshold):
+			regressions.append(f"{name}: {result['peak_kib']} KiB peak, baseline {baseline['peak_kib']}")
+
+	return regressions
+
+
+def load_baselines(path=BASELINES_PATH):
+	if not path.exists():
+		return {}
+	return json.loads(path.read_text())
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+	)
+	parser.add_argument("--update-baselines", action="store_true", help="store the results as new baselines")
+	parser.add_argument("--reference", action="store_true", help="benchmark the reference regex converter")
+	parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+	parser.add_argument("--min-time", type=float, default=MIN_TIME)
+	args = parser.parse_args(argv)
+
+	results = run_benchmarks(reference=args.reference, min_time=args.min_time)
+	baselines = load_baselines()
+
+	print(f"{'corpus':<16}{'ops/sec':>14}{'baseline':>14}{'peak KiB':>12}{'baseline':>12}")
+	for name, result in results.items():
+		baseline = baselines.get(name, {})
+		print(
+			f"{name:<16}{result['ops_per_sec']:>14,.1f}{baseline.get('ops_per_sec', 0):>14,.1f}"
+			f"{result['peak_kib']:>12,.1f}{baseline.get('peak_kib', 0):>12,.1f}"
+		)
+
+	if args.update_baselines:
+		BASELINES_PATH.write_text(json.dumps(results, indent=4, sort_keys=True) + "\n")
+		print(f"Baselines written to {BASELINES_PATH}")
+		return 0
+
+	if args.reference:
+		return 0
+
+	if regressions := find_regressions(results, baselines, args.threshold):
+		print(f"\nRegressions beyond {args.threshold:.0%}:")
+		for regression in regressions:
+			print(f"  {regression}")
+		return 1
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
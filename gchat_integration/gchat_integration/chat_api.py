@@ -0,0 +1,185 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Minimal Google Chat REST client for `spaces.messages.create` and `spaces.messages.patch`.
+
+Requests go over the pooled keep-alive sessions of `http_client` with its deadlines,
+authenticated with the cached service account token. There is no discovery document
+or SDK client to build, so a call costs one HTTP request.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+
+from gchat_integration.gchat_integration.auth import get_auth_headers
+from gchat_integration.gchat_integration.http_client import POOL_MAXSIZE, get_timeouts, request
+from gchat_integration.gchat_integration.rate_limiter import RateLimitExceeded, acquire, reserve
+from gchat_integration.gchat_integration.retry import DeliveryError
+
+DEFAULT_BASE_URL = "https://chat.googleapis.com/v1"
+REPLY_IN_THREAD = "REPLY_MESSAGE_FALLBACK_TO_NEW_THREAD"
+
+# Message modes of a Notification (google_chat_message_mode), for documents notified repeatedly
+MODE_NEW = "New Message"
+MODE_REPLY = "Reply in Thread"
+MODE_UPDATE = "Update Message"
+
+
+def get_base_url():
+	from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+		get_settings_snapshot,
+	)
+
+	return (get_settings_snapshot().chat_api_base_url or DEFAULT_BASE_URL).rstrip("/")
+
+
+def get_space_name(space_id):
+	"""Return the resource name of a space, accepting `spaces/AAAA` or just `AAAA`."""
+	space_id = space_id.strip()
+	return space_id if space_id.startswith("spaces/") else f"spaces/{space_id}"
+
+
+def get_thread_key(*identifiers):
+	"""Return a stable thread key for the parts of one message."""
+	return sha1("|".join(str(i) for i in identifiers).encode()).hexdigest()[:32]
+
+
+def get_document_thread_key(reference_doctype, reference_name):
+	"""Return the thread key all messages about a document are posted in."""
+	return get_thread_key("document", reference_doctype, reference_name)
+
+
+def create_message(space_id, body, thread_key=None, reply_option=None, timeouts=None):
+	"""Create a message in a space, waiting for a slot in the space's rate limit.
+
+	Args:
+		space_id: Space ID (e.g. spaces/AAAAxxxx)
+		body: Message resource, e.g. `{"text": ...}` or `{"cardsV2": [...]}`
+		thread_key: Thread to post in, created on first use
+		reply_option: `messageReplyOption`, defaults to replying in the thread of
+			`thread_key` or `body["thread"]` if either is given
+
+	Returns:
+		The created message resource
+
+	Raises:
+		DeliveryError: if the request failed
+	"""
+	space = get_space_name(space_id)
+	acquire(space)
+	return _call("POST", f"{space}/messages", body, _create_params(body, thread_key, reply_option), timeouts)
+
+
+def update_message(message_name, body, update_mask="text,cardsV2", timeouts=None):
+	"""Patch the fields in `update_mask` of an existing message.
+
+	Args:
+		message_name: Resource name, e.g. spaces/AAAA/messages/BBBB
+		body: Message resource with the new values
+	"""
+	acquire(message_name.split("/messages/", 1)[0])
+	return _call("PATCH", message_name, body, {"updateMask": update_mask}, timeouts)
+
+
+def create_messages(messages, thread_key=None, max_workers=POOL_MAXSIZE):
+	"""Create messages in several spaces concurrently.
+
+	Authentication, deadlines and rate limit slots are resolved up front, only the HTTP
+	requests run in the thread pool. The parts of a message are created one after another.
+
+	Args:
+		messages: List of `(space_id, bodies)` tuples, `bodies` being the parts of one message
+		thread_key: Thread the parts are posted in, needed if there is more than one part
+
+	Returns:
+		List of `(error, latency in seconds)` per message. The error is None if all parts
+		were created, otherwise the `DeliveryError` (or `RateLimitExceeded`) of the first
+		part that was not
+	"""
+	base_url = get_base_url()
+	headers = get_auth_headers()
+	timeouts = get_timeouts()
+
+	results = [None] * len(messages)
+	sends = []
+	for i, (space_id, bodies) in enumerate(messages):
+		space = get_space_name(space_id)
+		try:
+			send_at = [time.monotonic() + reserve(space) for _body in bodies]
+		except RateLimitExceeded as e:
+			results[i] = (e, 0)
+			continue
+
+		url = f"{base_url}/{space}/messages"
+		calls = [
+			(url, body, _create_params(body, thread_key), at)
+			for body, at in zip(bodies, send_at, strict=True)
+		]
+		sends.append((i, calls))
+
+	if sends:
+		workers = min(max_workers, len(sends))
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gchat-api") as executor:
+			outcomes = executor.map(lambda send: _create_in_thread(send[1], headers, timeouts), sends)
+			for (i, _calls), outcome in zip(sends, outcomes, strict=True):
+				results[i] = outcome
+
+	return results
+
+
+def _create_in_thread(calls, headers, timeouts):
+	"""Create the parts of a message from a pool thread, stopping at the first that fails.
+
+	Args:
+		calls: List of `(url, body, params, send_at)`, `send_at` being the `time.monotonic()`
+			of the part's rate limit slot
+
+	Returns:
+		`(error, latency in seconds)`, the latency adds up the requests
+	"""
+	latency = 0
+	for url, body, params, send_at in calls:
+		if (wait := send_at - time.monotonic()) > 0:
+			time.sleep(wait)
+		started = time.monotonic()
+		try:
+			_send("POST", url, body, params, headers, timeouts)
+		except DeliveryError as e:
+			return e, latency + time.monotonic() - started
+		latency += time.monotonic() - started
+	return None, latency
+
+
+def _create_params(body, thread_key=None, reply_option=None):
+	params = {}
+	if thread_key:
+		params["threadKey"] = thread_key
+	if reply_option or thread_key or body.get("thread"):
+		params["messageReplyOption"] = reply_option or REPLY_IN_THREAD
+	return params
+
+
+def _call(method, path, body, params, timeouts=None):
+	return _send(
+		method, f"{get_base_url()}/{path}", body, params, get_auth_headers(), timeouts or get_timeouts()
+	)
+
+
+def _send(method, url, body, params, headers, timeouts):
+	"""Send one request, raising `DeliveryError` if it failed.
+
+	Safe to call from pool threads, it does not touch frappe.local.
+	"""
+	try:
+		response = request(method, url, timeouts=timeouts, params=params, json=body, headers=headers)
+	except Exception as e:
+		raise DeliveryError.from_exception(e)
+
+	if not response.ok:
+		raise DeliveryError.from_response(
+			response, f"Status: {response.status_code}\nResponse: {response.text}"
+		)
+
+	return response.json()
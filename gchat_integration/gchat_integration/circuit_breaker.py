@@ -0,0 +1,194 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Cluster-wide circuit breaker per Google Chat Webhook.
+
+A webhook whose space was deleted, or whose URL was revoked, answers every send with
+404 or 403. Such errors trip the breaker after a few consecutive failures and mark the
+webhook unhealthy; sends then fail instantly, without a request or an Error Log row,
+and a single probe goes through every `UNHEALTHY_COOLDOWN` to detect recovery. Repeated
+server errors and timeouts trip it for `OPEN_DURATION` only.
+
+States live in the bench's Redis, shared by all workers:
+
+- closed: sends go through, consecutive failures are counted
+- open: sends are rejected with `CircuitOpen` until the cooldown ends
+- half-open: after the cooldown one probe send is let through, its result closes or
+  reopens the breaker
+
+A webhook without failures has no state in Redis, so a healthy send costs one script
+call and a look at its cached health. State expires after `STATE_TTL` without failures,
+the cached health then resets a webhook still marked unhealthy on its next success.
+"""
+
+import frappe
+
+from gchat_integration.gchat_integration.retry import DeliveryError
+
+FAILURE_THRESHOLD = 5  # consecutive server errors or timeouts
+PERMANENT_FAILURE_THRESHOLD = 3  # consecutive 401/403/404/410 responses
+OPEN_DURATION = 60  # seconds
+UNHEALTHY_COOLDOWN = 3600  # seconds between probes of an unhealthy webhook
+PROBE_TIMEOUT = 30  # seconds before another probe is let through
+STATE_TTL = 24 * 3600  # seconds a breaker is remembered without sends
+
+# The endpoint is gone or refuses this webhook, retrying will not help
+PERMANENT_STATUS_CODES = frozenset({401, 403, 404, 410})
+
+# Returns {milliseconds until sends are allowed (0 to send now), 1 if open because of
+# permanent errors, 1 if there is state to clear on success}. Past the cooldown, the
+# caller becomes the half-open probe and other callers wait for PROBE_TIMEOUT.
+ALLOW_SCRIPT = """
+local probe_timeout = tonumber(ARGV[1])
+
+local state = redis.call('HMGET', KEYS[1], 'state', 'open_until', 'permanent')
+if not state[1] then
+	return {0, 0, 0}
+end
+if state[1] == 'closed' then
+	return {0, 0, 1}
+end
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local open_until = tonumber(state[2]) or 0
+local permanent = tonumber(state[3]) or 0
+if now < open_until then
+	return {open_until - now, permanent, 1}
+end
+
+redis.call('HSET', KEYS[1], 'state', 'half_open', 'open_until', now + probe_timeout)
+return {0, permanent, 1}
+"""
+
+# Counts a failure and opens the breaker at the threshold or on a failed probe.
+# Returns 1 if this failure opened it.
+FAILURE_SCRIPT = """
+local permanent = tonumber(ARGV[1])
+local threshold = tonumber(ARGV[2])
+local open_duration = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+local field = permanent == 1 and 'permanent_failures' or 'failures'
+local count = redis.call('HINCRBY', KEYS[1], field, 1)
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+redis.call('PEXPIRE', KEYS[1], ttl)
+
+if state == 'open' or (state == 'closed' and count < threshold) then
+	if state == 'closed' then
+		redis.call('HSET', KEYS[1], 'state', 'closed')
+	end
+	return 0
+end
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('HSET', KEYS[1], 'state', 'open', 'open_until', now + open_duration, 'permanent', permanent)
+return 1
+"""
+
+_scripts = {}
+
+
+class CircuitOpen(DeliveryError):
+	"""Raised instead of sending to a webhook whose breaker is open."""
+
+	def __init__(self, webhook, retry_after, permanent=False):
+		self.webhook = webhook
+		reason = "is unhealthy" if permanent else "is failing"
+		super().__init__(
+			f"Google Chat Webhook {webhook} {reason}, not sending for {retry_after:.0f}s",
+			retryable=not permanent,
+			retry_after=retry_after,
+		)
+
+
+def allow(webhook):
+	"""Check that a send to `webhook` may go out.
+
+	Returns:
+		True if the breaker has failures to clear, pass it on to `record_success`
+
+	Raises:
+		CircuitOpen: if the breaker is open
+	"""
+	wait_ms, permanent, tracked = _get_script(ALLOW_SCRIPT)(
+		keys=[_get_key(webhook)], args=[PROBE_TIMEOUT * 1000]
+	)
+	if wait_ms:
+		raise CircuitOpen(webhook, wait_ms / 1000, permanent=bool(permanent))
+	return bool(tracked)
+
+
+def record_success(webhook, tracked=True):
+	"""Close the breaker after a successful send, and mark the webhook healthy again."""
+	from gchat_integration.gchat_integration.doctype.google_chat_webhook.google_chat_webhook import (
+		get_webhook_config,
+	)
+
+	if tracked:
+		frappe.cache().delete(_get_key(webhook))
+		_set_health(webhook, "Healthy")
+		return
+
+	# No state in Redis, but it may have expired while the webhook was unhealthy
+	config = get_webhook_config(webhook)
+	if config and config.health == "Unhealthy":
+		_set_health(webhook, "Healthy")
+
+
+def record_failure(webhook, status_code=None):
+	"""Count a failed send, `status_code` is None for timeouts and connection errors.
+
+	Rate limiting (429) and rejected payloads (other 4xx) say nothing about the
+	endpoint and are not counted.
+	"""
+	permanent = status_code in PERMANENT_STATUS_CODES
+	if status_code and not permanent and status_code < 500 and status_code != 408:
+		return
+
+	threshold, open_duration = (
+		(PERMANENT_FAILURE_THRESHOLD, UNHEALTHY_COOLDOWN) if permanent else (FAILURE_THRESHOLD, OPEN_DURATION)
+	)
+	opened = _get_script(FAILURE_SCRIPT)(
+		keys=[_get_key(webhook)],
+		args=[int(permanent), threshold, open_duration * 1000, STATE_TTL * 1000],
+	)
+	if opened and permanent:
+		_set_health(webhook, "Unhealthy", f"Status {status_code} on {threshold} consecutive sends")
+
+
+def reset(webhook):
+	frappe.cache().delete(_get_key(webhook))
+
+
+def _set_health(webhook, health, error=None):
+	"""Record the health on the webhook, only writing (and logging) when it changes."""
+	if frappe.db.get_value("Google Chat Webhook", webhook, "health") in (health, None):
+		return
+
+	from gchat_integration.gchat_integration.doctype.google_chat_webhook.google_chat_webhook import (
+		invalidate_webhook_config,
+	)
+
+	frappe.db.set_value(
+		"Google Chat Webhook", webhook, {"health": health, "health_error": error}, update_modified=False
+	)
+	invalidate_webhook_config()
+	if health == "Unhealthy":
+		frappe.log_error(
+			f"Google Chat Webhook {webhook} marked unhealthy: {error}\n"
+			f"Sends are skipped, one probe goes through every {UNHEALTHY_COOLDOWN // 60} minutes.",
+			"Google Chat Integration",
+		)
+
+
+def _get_key(webhook):
+	return frappe.cache().make_key(f"gchat_circuit:{webhook}")
+
+
+def _get_script(script):
+	if script not in _scripts:
+		_scripts[script] = frappe.cache().register_script(script)
+	return _scripts[script]
@@ -0,0 +1,120 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Command router for bot MESSAGE events.
+
+Apps register commands through the `gchat_commands` hook in their hooks.py, mapping a
+slash command or a keyword (the first word of the message) to a handler:
+
+	gchat_commands = {
+		"/status": "my_app.chat.status",
+		"stock": "my_app.chat.stock_level",
+	}
+
+A handler is called with the event and the text after the command, and returns a
+response dict (e.g. `{"text": ...}` or a card) or plain text.
+
+The dispatch table is built once per site from the hooks, and each handler is imported
+on its first call, so registered commands cost nothing at import time or for other
+messages.
+"""
+
+import threading
+import time
+
+import frappe
+
+# Calls slower than this are logged
+SLOW_COMMAND_THRESHOLD = 1.0  # seconds
+
+# site -> {command: handler path}
+_routes = {}
+# handler path -> function
+_handlers = {}
+# command -> [calls, total seconds, slowest call]
+_timings = {}
+_lock = threading.Lock()
+
+
+def route_message(event):
+	"""Run the registered handler for a MESSAGE event.
+
+	Returns:
+		The handler's response, or None if the message is not a registered command
+	"""
+	command, argument_text = parse_command(event.get("message") or {})
+	path = get_routes().get(command)
+	if not path:
+		return None
+
+	handler = _handlers.get(path)
+	if handler is None:
+		handler = _handlers[path] = frappe.get_attr(path)
+
+	started = time.perf_counter()
+	try:
+		response = handler(event, argument_text)
+	finally:
+		_record_timing(command, time.perf_counter() - started)
+
+	return {"text": response} if isinstance(response, str) else response
+
+
+def parse_command(message):
+	"""Return `(command, argument text)` for a message: its slash command, or else its first word."""
+	for annotation in message.get("annotations") or ():
+		if annotation.get("type") == "SLASH_COMMAND":
+			command = (annotation.get("slashCommand") or {}).get("commandName") or ""
+			return command.lower(), (message.get("argumentText") or "").strip()
+
+	# argumentText is the text without the bot's @mention
+	text = (message.get("argumentText") or message.get("text") or "").strip()
+	keyword, _, argument_text = text.partition(" ")
+	return keyword.lower(), argument_text.strip()
+
+
+def get_routes():
+	"""Return this site's dispatch table, built from the `gchat_commands` hooks on first use."""
+	site = frappe.local.site
+	routes = _routes.get(site)
+	if routes is None:
+		routes = {}
+		for command, paths in frappe.get_hooks("gchat_commands").items():
+			# The last installed app wins, like for other hooks
+			routes[command.lower()] = paths[-1] if isinstance(paths, list) else paths
+		_routes[site] = routes
+	return routes
+
+
+def _record_timing(command, elapsed):
+	with _lock:
+		timing = _timings.setdefault(command, [0, 0.0, 0.0])
+		timing[0] += 1
+		timing[1] += elapsed
+		timing[2] = max(timing[2], elapsed)
+
+	if elapsed > SLOW_COMMAND_THRESHOLD:
+		frappe.logger().warning(f"Google Chat command {command} took {elapsed:.2f}s")
+
+
+@frappe.whitelist()
+def get_command_stats():
+	"""Calls and timings (in milliseconds) per command in this worker process."""
+	frappe.only_for("System Manager")
+
+	with _lock:
+		return {
+			command: {
+				"calls": calls,
+				"average_ms": round(total / calls * 1000, 1),
+				"max_ms": round(slowest * 1000, 1),
+			}
+			for command, (calls, total, slowest) in _timings.items()
+		}
+
+
+def help_command(event, argument_text):
+	"""List the registered commands."""
+	commands = sorted(get_routes())
+	return "*Available commands*\n" + "\n".join(f"• {command}" for command in commands)
@@ -0,0 +1,160 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Delivery log of Google Chat sends.
+
+Every send, successful or not, is recorded. Recording must not slow down the send, so
+entries are appended to a Redis list and written to the database in bulk inserts by
+`flush_delivery_log`, from the scheduler or once enough entries have piled up. Entries
+not written yet are lost if the Redis cache is cleared, which is acceptable for a log.
+"""
+
+import json
+from hashlib import blake2b
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+from frappe.utils import now
+
+BUFFER_KEY = "gchat_delivery_log"
+FLUSH_JOB_ID = "gchat_delivery_log_flush"
+FLUSH_BATCH_SIZE = 500
+# Buffered entries that trigger a flush before the next scheduler run
+FLUSH_THRESHOLD = 500
+# Oldest entries are dropped beyond this, should the flush stop running
+MAX_BUFFERED = 50_000
+ERROR_LENGTH = 1000
+LOG_FIELDS = (
+	"status",
+	"google_chat_type",
+	"webhook",
+	"space",
+	"reference_doctype",
+	"reference_name",
+	"latency",
+	"attempts",
+	"status_code",
+	"payload_hash",
+	"error",
+)
+
+
+class GoogleChatDeliveryLog(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		attempts: DF.Int
+		error: DF.SmallText | None
+		google_chat_type: DF.Literal["Webhook", "Chatbot"]
+		latency: DF.Float
+		payload_hash: DF.Data | None
+		reference_doctype: DF.Link | None
+		reference_name: DF.DynamicLink | None
+		space: DF.Data | None
+		status: DF.Literal["Success", "Failed"]
+		status_code: DF.Int
+		webhook: DF.Link | None
+	# end: auto-generated types
+
+	@staticmethod
+	def clear_old_logs(days=30):
+		table = frappe.qb.DocType("Google Chat Delivery Log")
+		frappe.db.delete(table, filters=(table.creation < (Now() - Interval(days=days))))
+
+
+def log_delivery(
+	status,
+	reference_doctype=None,
+	reference_name=None,
+	webhook=None,
+	space=None,
+	latency=None,
+	attempts=1,
+	payload=None,
+	error=None,
+):
+	"""Buffer a delivery log entry. Never raises, a send must not fail because of its log.
+
+	Args:
+		status: "Success" or "Failed"
+		webhook: Name of the Google Chat Webhook document, for webhook sends
+		space: Space ID, for Chatbot sends
+		latency: Seconds the send took
+		attempts: Number of this attempt
+		payload: Message sent, stored as a hash only
+		error: The exception of a failed send, a `DeliveryError` also gives the status code
+	"""
+	entry = {
+		"status": status,
+		"google_chat_type": "Chatbot" if space else "Webhook",
+		"webhook": webhook,
+		"space": space,
+		"reference_doctype": reference_doctype,
+		"reference_name": reference_name,
+		"latency": round(latency * 1000, 1) if latency is not None else None,
+		"attempts": attempts,
+		"status_code": getattr(error, "status_code", None),
+		"payload_hash": get_payload_hash(payload) if payload else None,
+		"error": str(error)[:ERROR_LENGTH] if error else None,
+		"creation": now(),
+	}
+
+	try:
+		cache = frappe.cache()
+		key = cache.make_key(BUFFER_KEY)
+		pipeline = cache.pipeline()
+		pipeline.rpush(key, json.dumps(entry))
+		pipeline.ltrim(key, -MAX_BUFFERED, -1)
+		length, _trimmed = pipeline.execute()
+		if length >= FLUSH_THRESHOLD:
+			frappe.enqueue(flush_delivery_log, queue="short", job_id=FLUSH_JOB_ID, deduplicate=True)
+	except Exception:
+		frappe.logger().warning("Could not buffer Google Chat delivery log entry", exc_info=True)
+
+
+def get_payload_hash(payload):
+	return blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def flush_delivery_log():
+	"""Move buffered entries to the database, in bulk inserts of `FLUSH_BATCH_SIZE`."""
+	cache = frappe.cache()
+	key = cache.make_key(BUFFER_KEY)
+	fields = ("name", "creation", "modified", "owner", "modified_by", *LOG_FIELDS)
+
+	while True:
+		# Take a batch off the head of the list atomically, concurrent flushes never share entries
+		pipeline = cache.pipeline()
+		pipeline.lrange(key, 0, FLUSH_BATCH_SIZE - 1)
+		pipeline.ltrim(key, FLUSH_BATCH_SIZE, -1)
+		entries, _trimmed = pipeline.execute()
+		if not entries:
+			break
+
+		values = []
+		for entry in entries:
+			entry = json.loads(entry)
+			values.append(
+				(
+					frappe.generate_hash(length=10),
+					entry["creation"],
+					entry["creation"],
+					"Administrator",
+					"Administrator",
+					*(entry.get(field) for field in LOG_FIELDS),
+				)
+			)
+
+		frappe.db.bulk_insert("Google Chat Delivery Log", fields, values)
+		frappe.db.commit()
+
+		if len(entries) < FLUSH_BATCH_SIZE:
+			break
@@ -0,0 +1,9 @@
+// Copyright (c) 2026, Frappe and contributors
+// For license information, please see license.txt
+
+frappe.listview_settings["Google Chat Delivery Log"] = {
+	get_indicator(doc) {
+		const colors = { Success: "green", Failed: "red" };
+		return [__(doc.status), colors[doc.status], "status,=," + doc.status];
+	},
+};
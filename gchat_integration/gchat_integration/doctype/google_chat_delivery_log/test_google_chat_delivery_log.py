@@ -0,0 +1,57 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from gchat_integration.gchat_integration.doctype.google_chat_delivery_log.google_chat_delivery_log import (
+	flush_delivery_log,
+	get_payload_hash,
+	log_delivery,
+)
+from gchat_integration.gchat_integration.retry import DeliveryError
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class IntegrationTestGoogleChatDeliveryLog(IntegrationTestCase):
+	"""
+	Integration tests for GoogleChatDeliveryLog.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def test_entries_are_written_on_flush(self):
+		flush_delivery_log()
+		before = frappe.db.count("Google Chat Delivery Log")
+
+		log_delivery(
+			"Success", "User", "Administrator", space="spaces/LOG", latency=0.25, payload="<p>Hi</p>"
+		)
+		log_delivery(
+			"Failed",
+			"User",
+			"Administrator",
+			space="spaces/LOG",
+			attempts=3,
+			error=DeliveryError("Status: 503", status_code=503, retryable=True),
+		)
+		# Buffered, nothing is written on the send path
+		self.assertEqual(frappe.db.count("Google Chat Delivery Log"), before)
+
+		flush_delivery_log()
+		logs = frappe.get_all(
+			"Google Chat Delivery Log",
+			filters={"space": "spaces/LOG"},
+			fields=["status", "latency", "attempts", "status_code", "payload_hash", "error"],
+			order_by="status desc",
+		)
+		self.assertEqual(len(logs), 2)
+		self.assertEqual(logs[0].status, "Success")
+		self.assertEqual(logs[0].latency, 250)
+		self.assertEqual(logs[0].payload_hash, get_payload_hash("<p>Hi</p>"))
+		self.assertEqual((logs[1].status, logs[1].attempts, logs[1].status_code), ("Failed", 3, 503))
+		self.assertEqual(logs[1].error, "Status: 503")
@@ -0,0 +1,67 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+from hashlib import sha1
+
+import frappe
+from frappe.model.document import Document
+
+DOCTYPE = "Google Chat Document Message"
+
+
+class GoogleChatDocumentMessage(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		message_name: DF.Data | None
+		reference_doctype: DF.Link | None
+		reference_name: DF.DynamicLink | None
+		space: DF.Data | None
+		thread_name: DF.Data | None
+	# end: auto-generated types
+
+	def autoname(self):
+		self.name = get_document_message_name(self.reference_doctype, self.reference_name, self.space)
+
+
+def get_document_message_name(reference_doctype, reference_name, space):
+	"""Return the record name of a document's message in a space, the same in every worker."""
+	return sha1(f"{reference_doctype}|{reference_name}|{space}".encode()).hexdigest()
+
+
+def get_document_message(reference_doctype, reference_name, space):
+	"""Return the stored `message_name` of a document's message in a space, or None."""
+	return frappe.db.get_value(
+		DOCTYPE,
+		{"reference_doctype": reference_doctype, "reference_name": reference_name, "space": space},
+		"message_name",
+	)
+
+
+def set_document_message(reference_doctype, reference_name, space, message):
+	"""Store the message created for a document in a space, replacing an earlier one.
+
+	Args:
+		message: Message resource returned by the Chat API
+	"""
+	filters = {"reference_doctype": reference_doctype, "reference_name": reference_name, "space": space}
+	values = {"message_name": message.get("name"), "thread_name": (message.get("thread") or {}).get("name")}
+
+	if name := frappe.db.get_value(DOCTYPE, filters):
+		frappe.db.set_value(DOCTYPE, name, values, update_modified=False)
+		return
+
+	doc = frappe.get_doc({"doctype": DOCTYPE, **filters, **values})
+	doc.name = get_document_message_name(reference_doctype, reference_name, space)
+	frappe.db.savepoint("gchat_document_message")
+	try:
+		doc.db_insert()
+	except frappe.DuplicateEntryError:
+		# Stored by another worker since the lookup, the later message wins
+		frappe.db.rollback(save_point="gchat_document_message")
+		frappe.db.set_value(DOCTYPE, doc.name, values, update_modified=False)
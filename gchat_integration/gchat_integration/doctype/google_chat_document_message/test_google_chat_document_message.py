@@ -0,0 +1,72 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import json
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from gchat_integration.api import send_google_chat_bot_message
+from gchat_integration.gchat_integration import auth
+from gchat_integration.gchat_integration.chat_api import MODE_UPDATE
+from gchat_integration.gchat_integration.doctype.google_chat_document_message.google_chat_document_message import (
+	get_document_message,
+	set_document_message,
+)
+from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+	_settings_cache,
+)
+from gchat_integration.gchat_integration.testing.mock_chat_server import MockChatServer
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class IntegrationTestGoogleChatDocumentMessage(IntegrationTestCase):
+	"""
+	Integration tests for GoogleChatDocumentMessage.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def setUp(self):
+		self.server = MockChatServer().start()
+		self.server.configure_settings()
+
+	def tearDown(self):
+		self.server.stop()
+		auth._tokens.clear()
+		_settings_cache.invalidate_now()
+
+	def test_update_mode_edits_the_document_message(self):
+		def send(message):
+			return send_google_chat_bot_message(
+				"spaces/UPDATE", message, "ToDo", "_Test ToDo", message_mode=MODE_UPDATE
+			)
+
+		self.assertEqual(send("Status: <b>Open</b>"), "success")
+		self.assertEqual(send("Status: <b>Closed</b>"), "success")
+
+		self.assertEqual(len(self.server.messages), 1)
+		message_name = get_document_message("ToDo", "_Test ToDo", "spaces/UPDATE")
+		self.assertIn(message_name, self.server.messages)
+		self.assertIn("Closed", json.dumps(self.server.messages[message_name]))
+
+		# Deleted in Google Chat: a new message is posted and stored
+		self.server.messages.clear()
+		self.assertEqual(send("Status: <b>Reopened</b>"), "success")
+		self.assertEqual(len(self.server.messages), 1)
+		self.assertNotEqual(get_document_message("ToDo", "_Test ToDo", "spaces/UPDATE"), message_name)
+
+	def test_concurrent_store_keeps_one_record(self):
+		set_document_message("ToDo", "_Test Race", "spaces/RACE", {"name": "spaces/RACE/messages/1"})
+
+		# Stored by another worker after this one looked for a record
+		with patch.object(frappe.local.db, "get_value", return_value=None):
+			set_document_message("ToDo", "_Test Race", "spaces/RACE", {"name": "spaces/RACE/messages/2"})
+
+		self.assertEqual(frappe.db.count("Google Chat Document Message", {"reference_name": "_Test Race"}), 1)
+		self.assertEqual(get_document_message("ToDo", "_Test Race", "spaces/RACE"), "spaces/RACE/messages/2")
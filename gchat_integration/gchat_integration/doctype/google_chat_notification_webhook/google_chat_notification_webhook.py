@@ -0,0 +1,22 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+from frappe.model.document import Document
+
+
+class GoogleChatNotificationWebhook(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		parent: DF.Data
+		parentfield: DF.Data
+		parenttype: DF.Data
+		webhook: DF.Link
+	# end: auto-generated types
+
+	pass
@@ -0,0 +1,17 @@
+// Copyright (c) 2026, Frappe and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Google Chat Outbox", {
+	refresh(frm) {
+		if (frm.doc.status !== "Dead Letter") return;
+
+		frm.add_custom_button(__("Requeue"), () => {
+			frappe
+				.call({
+					method: "gchat_integration.gchat_integration.doctype.google_chat_outbox.google_chat_outbox.requeue_dead_letters",
+					args: { names: [frm.doc.name] },
+				})
+				.then(() => frm.reload_doc());
+		});
+	},
+});
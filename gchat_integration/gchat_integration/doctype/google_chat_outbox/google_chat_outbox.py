@@ -0,0 +1,538 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Transactional outbox for Google Chat messages.
+
+Notifications write a row here inside the transaction of the document that triggered
+them. Rows are only delivered by a background worker after that transaction commits,
+so a save never waits on Google Chat and a rolled back save never emits a message.
+
+Messages that cannot be delivered end up as "Dead Letter" rows, keeping the message and
+the last error until they are requeued with `requeue_dead_letters` or deleted.
+"""
+
+import time
+from collections import deque
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Min
+from frappe.utils import add_to_date, now_datetime
+
+from gchat_integration.gchat_integration.chat_api import MODE_NEW, get_space_name
+from gchat_integration.gchat_integration.circuit_breaker import CircuitOpen
+from gchat_integration.gchat_integration.doctype.google_chat_delivery_log.google_chat_delivery_log import (
+	log_delivery,
+)
+from gchat_integration.gchat_integration.rate_limiter import RateLimitExceeded
+from gchat_integration.gchat_integration.retry import (
+	DEFAULT_BACKOFF,
+	DEFAULT_MAX_ATTEMPTS,
+	DEFAULT_MAX_BACKOFF,
+	DeliveryError,
+	get_retry_delay,
+)
+
+DRAIN_JOB_ID = "gchat_outbox_drain"
+WAKEUP_JOB_ID = "gchat_outbox_wakeup"
+WAKEUP_POLL_INTERVAL = 5  # seconds
+WAKEUP_MAX_RUNTIME = 20 * 60  # the scheduler starts a new one if rows are still deferred
+BATCH_SIZE = 50
+# Rows left in "Sending" this long belong to a worker that died mid-delivery
+STALE_SENDING_MINUTES = 10
+ROW_FIELDS = (
+	"name",
+	"google_chat_type",
+	"webhook",
+	"space",
+	"reference_doctype",
+	"reference_name",
+	"message",
+	"message_mode",
+	"attempts",
+)
+
+
+class GoogleChatOutbox(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		attempts: DF.Int
+		deliver_after: DF.Datetime | None
+		google_chat_type: DF.Literal["Webhook", "Chatbot"]
+		last_error: DF.SmallText | None
+		message: DF.LongText | None
+		message_mode: DF.Literal["New Message", "Reply in Thread", "Update Message"]
+		notification: DF.Link | None
+		reference_doctype: DF.Link | None
+		reference_name: DF.DynamicLink | None
+		space: DF.Data | None
+		status: DF.Literal["Queued", "Sending", "Dead Letter"]
+		webhook: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def enqueue_message(
+	message, reference_doctype, reference_name, webhook=None, space=None, notification=None, message_mode=None
+):
+	"""Queue a message for delivery once the current transaction commits.
+
+	Args:
+		message: Rendered (HTML) message
+		reference_doctype: DocType of the reference document
+		reference_name: Name of the reference document
+		webhook: Name of the Google Chat Webhook document, for webhook delivery
+		space: Space ID (e.g. spaces/AAAAxxxx), for Chatbot delivery
+		notification: Name of the Notification that produced the message
+		message_mode: "New Message", "Reply in Thread" or "Update Message"
+	"""
+	outbox = frappe.get_doc(
+		{
+			"doctype": "Google Chat Outbox",
+			"status": "Queued",
+			"google_chat_type": "Chatbot" if space else "Webhook",
+			"webhook": webhook,
+			"space": space,
+			"notification": notification,
+			"reference_doctype": reference_doctype,
+			"reference_name": reference_name,
+			"message": message,
+			"message_mode": message_mode or MODE_NEW,
+		}
+	)
+	# Plain INSERT, this runs inside the user's save and must stay cheap
+	outbox.db_insert()
+
+	_schedule_drain()
+	return outbox.name
+
+
+def _schedule_drain():
+	"""Enqueue a single drain job after the current transaction commits."""
+	if frappe.flags.gchat_outbox_drain_scheduled:
+		return
+
+	frappe.flags.gchat_outbox_drain_scheduled = True
+	frappe.db.after_commit.add(_enqueue_drain)
+	frappe.db.after_rollback.add(_reset_drain_flag)
+
+
+def _reset_drain_flag():
+	frappe.flags.gchat_outbox_drain_scheduled = False
+
+
+def _enqueue_drain():
+	_reset_drain_flag()
+	frappe.enqueue(drain_outbox, queue="short", job_id=DRAIN_JOB_ID, deduplicate=True)
+
+
+def drain_outbox():
+	"""Deliver queued outbox rows until none are due."""
+	while rows := _claim_batch():
+		_deliver_batch(rows)
+
+
+def drain_deferred():
+	"""Wait for deferred rows (digest windows, rate limits, retries) and drain them as they fall due.
+
+	Only one of these jobs runs at a time, so deferrals never hold more than one worker.
+	"""
+	started = time.monotonic()
+	while (next_due := _get_next_due()) and time.monotonic() - started < WAKEUP_MAX_RUNTIME:
+		delay = (next_due - now_datetime()).total_seconds()
+		if delay > 0:
+			# Wake up regularly, a row deferred meanwhile may be due earlier
+			time.sleep(min(delay, WAKEUP_POLL_INTERVAL))
+		drain_outbox()
+
+
+def process_outbox():
+	"""Scheduler safety net: recover rows of dead workers and drain anything left behind."""
+	Outbox = frappe.qb.DocType("Google Chat Outbox")
+	(
+		frappe.qb.update(Outbox)
+		.set(Outbox.status, "Queued")
+		.where(Outbox.status == "Sending")
+		.where(Outbox.modified < add_to_date(now_datetime(), minutes=-STALE_SENDING_MINUTES))
+	).run()
+	frappe.db.commit()
+
+	drain_outbox()
+	if _get_next_due():
+		_schedule_wakeup()
+
+
+@frappe.whitelist()
+def requeue_dead_letters(names=None):
+	"""Queue dead letters for delivery again.
+
+	Args:
+		names: List (or JSON list) of outbox rows, all dead letters if not given
+	"""
+	frappe.only_for("System Manager")
+
+	filters = {"status": "Dead Letter"}
+	if names:
+		filters["name"] = ("in", frappe.parse_json(names))
+
+	names = frappe.get_all("Google Chat Outbox", filters=filters, pluck="name")
+	if not names:
+		return 0
+
+	Outbox = frappe.qb.DocType("Google Chat Outbox")
+	(
+		frappe.qb.update(Outbox)
+		.set(Outbox.status, "Queued")
+		.set(Outbox.attempts, 0)
+		.set(Outbox.deliver_after, None)
+		.where(Outbox.name.isin(names))
+	).run()
+
+	_schedule_drain()
+	return len(names)
+
+
+def _get_next_due():
+	Outbox = frappe.qb.DocType("Google Chat Outbox")
+	result = (
+		frappe.qb.from_(Outbox)
+		.select(Min(Outbox.deliver_after))
+		.where(Outbox.status == "Queued")
+		.where(Outbox.deliver_after.isnotnull())
+	).run()
+	return result[0][0] if result else None
+
+
+def _claim_batch():
+	"""Mark the oldest due rows as "Sending" and return them.
+
+	Locked rows are skipped, so concurrent drains never pick up the same message.
+	"""
+	Outbox = frappe.qb.DocType("Google Chat Outbox")
+	rows = (
+		frappe.qb.from_(Outbox)
+		.select(*(Outbox[field] for field in ROW_FIELDS))
+		.where(Outbox.status == "Queued")
+		.where(Outbox.deliver_after.isnull() | (Outbox.deliver_after <= now_datetime()))
+		.orderby(Outbox.creation)
+		.limit(BATCH_SIZE)
+		.for_update(skip_locked=True)
+	).run(as_dict=True)
+
+	if rows:
+		(
+			frappe.qb.update(Outbox)
+			.set(Outbox.status, "Sending")
+			.set(Outbox.modified, now_datetime())
+			.where(Outbox.name.isin([row.name for row in rows]))
+		).run()
+
+	frappe.db.commit()
+	return rows
+
+
+def _get_target(row):
+	"""Return the webhook or space `row` is sent to."""
+	if row.google_chat_type == "Webhook":
+		return ("Webhook", row.webhook)
+	return ("Chatbot", get_space_name(row.space))
+
+
+def _group_by_target(rows):
+	"""Group rows per webhook or space, in claim order."""
+	groups = {}
+	for row in rows:
+		groups.setdefault(_get_target(row), []).append(row)
+
+	return groups.values()
+
+
+def _deliver_batch(rows):
+	"""Deliver a claimed batch.
+
+	Webhooks with a digest window are delivered per group. Other rows are sent in claim
+	order. A row carrying the same message as the next rows of other webhooks or spaces
+	(a Notification with several webhooks, or the same Chatbot message to several spaces)
+	is sent to all of them concurrently. Only the next row of a webhook or space can
+	join, so each keeps its order.
+	"""
+	queues = {}
+	for group in _group_by_target(rows):
+		window = group[0].google_chat_type == "Webhook" and _get_coalesce_window(group[0].webhook)
+		if window:
+			_deliver_group(group, window)
+		else:
+			queues[_get_target(group[0])] = deque(group)
+
+	for row in rows:
+		target = _get_target(row)
+		queue = queues.get(target)
+		if not queue or queue[0] is not row:
+			# Delivered with its group, or with an earlier row of another target
+			continue
+
+		fanout = [queue.popleft()]
+		if key := _get_fanout_key(row):
+			for other_target, other in queues.items():
+				if other and other_target != target and _get_fanout_key(other[0]) == key:
+					fanout.append(other.popleft())
+
+		if len(fanout) > 1:
+			_deliver_fanout(fanout)
+		else:
+			_deliver_rows(fanout)
+
+
+def _get_fanout_key(row):
+	"""Rows with the same key can be sent together, threaded messages (None) go one by one."""
+	if _is_plain(row):
+		return (row.google_chat_type, row.message, row.reference_doctype, row.reference_name)
+
+
+def _get_coalesce_window(webhook):
+	from gchat_integration.gchat_integration.doctype.google_chat_webhook.google_chat_webhook import (
+		get_webhook_config,
+	)
+
+	config = get_webhook_config(webhook)
+	return config and config.coalesce_window
+
+
+def _is_plain(row):
+	return not row.message_mode or row.message_mode == MODE_NEW
+
+
+def _deliver_group(rows, window):
+	"""Deliver the rows of a webhook with a digest window."""
+	# Leading edge: the first message in a quiet period goes out immediately,
+	# everything arriving while the window is open waits for the next digest
+	remaining = _open_digest_window(rows[0].webhook, window)
+	if remaining:
+		_defer(rows, remaining)
+		return
+
+	_deliver_rows(rows)
+
+
+def _open_digest_window(webhook, window):
+	"""Start a digest window for `webhook`.
+
+	Returns:
+		0 if the window was started, otherwise seconds until the open window closes
+	"""
+	cache = frappe.cache()
+	key = cache.make_key(f"gchat_digest_window:{webhook}")
+	if cache.set(key, 1, px=int(window * 1000), nx=True):
+		return 0
+
+	return max(cache.pttl(key), 0) / 1000
+
+
+def _defer(rows, delay, **updates):
+	"""Put rows back in the queue, to be picked up again once `delay` seconds have passed."""
+	Outbox = frappe.qb.DocType("Google Chat Outbox")
+	query = (
+		frappe.qb.update(Outbox)
+		.set(Outbox.status, "Queued")
+		.set(Outbox.deliver_after, add_to_date(now_datetime(), seconds=delay))
+		.where(Outbox.name.isin([row.name for row in rows]))
+	)
+	for field, value in updates.items():
+		query = query.set(Outbox[field], value)
+
+	query.run()
+	frappe.db.commit()
+
+	_schedule_wakeup()
+
+
+def _schedule_wakeup():
+	frappe.enqueue(
+		drain_deferred,
+		queue="long",
+		timeout=WAKEUP_MAX_RUNTIME + 300,
+		job_id=WAKEUP_JOB_ID,
+		deduplicate=True,
+	)
+
+
+def _deliver_rows(rows):
+	"""Send rows as one message (or one digest).
+
+	Delivered rows are removed. Transient failures are retried with backoff, everything
+	else, and rows that ran out of attempts, become dead letters.
+	"""
+	started = time.monotonic()
+	error = None
+	try:
+		_send(rows)
+	except (RateLimitExceeded, DeliveryError) as e:
+		error = e
+	except Exception as e:
+		frappe.log_error(
+			f"Outbox delivery failed for {', '.join(row.name for row in rows)}: {e!s}",
+			"Google Chat Integration",
+		)
+		error = DeliveryError(str(e))
+
+	if error:
+		_settle_failure(rows, error, time.monotonic() - started)
+		return
+
+	_log_rows(rows, "Success", time.monotonic() - started)
+	_remove(rows)
+
+
+def _deliver_fanout(rows):
+	"""Send one message to the webhooks or spaces of `rows` concurrently, then settle each row."""
+	from gchat_integration.api import deliver_bot_bulk
+	from gchat_integration.gchat_integration.doctype.google_chat_webhook.google_chat_webhook import (
+		deliver_bulk,
+	)
+
+	row = rows[0]
+	webhooks = row.google_chat_type == "Webhook"
+	deliver = deliver_bulk if webhooks else deliver_bot_bulk
+	targets = [row.webhook if webhooks else row.space for row in rows]
+	try:
+		outcomes = deliver(targets, row.message, row.reference_doctype, row.reference_name)
+	except DeliveryError as e:
+		# Nothing was sent, e.g. no access token for the Chat API
+		_settle_failure(rows, e, 0)
+		return
+	except Exception as e:
+		frappe.log_error(
+			f"Outbox delivery failed for {', '.join(row.name for row in rows)}: {e!s}",
+			"Google Chat Integration",
+		)
+		_settle_failure(rows, DeliveryError(str(e)), 0)
+		return
+
+	delivered = []
+	for row, target in zip(rows, targets, strict=True):
+		error, latency = outcomes[target]
+		if error:
+			_settle_failure([row], error, latency)
+		else:
+			_log_rows([row], "Success", latency)
+			delivered.append(row)
+
+	_remove(delivered)
+
+
+def _settle_failure(rows, error, latency):
+	if isinstance(error, RateLimitExceeded):
+		# The space is at its quota, wait for the bucket instead of failing
+		_defer(rows, error.retry_after)
+		return
+
+	if isinstance(error, CircuitOpen) and error.retryable:
+		# The webhook is failing for now, wait for its breaker without using up attempts
+		_defer(rows, error.retry_after)
+		return
+
+	_log_rows(rows, "Failed", latency, error)
+	_handle_failure(rows, error)
+
+
+def _remove(rows):
+	"""Delete delivered rows."""
+	if not rows:
+		return
+
+	Outbox = frappe.qb.DocType("Google Chat Outbox")
+	frappe.qb.from_(Outbox).delete().where(Outbox.name.isin([row.name for row in rows])).run()
+	frappe.db.commit()
+
+
+def _log_rows(rows, status, latency, error=None):
+	for row in rows:
+		log_delivery(
+			status,
+			reference_doctype=row.reference_doctype,
+			reference_name=row.reference_name,
+			webhook=row.webhook,
+			space=row.space,
+			latency=latency,
+			attempts=row.attempts + 1,
+			payload=row.message,
+			error=error,
+		)
+
+
+def _handle_failure(rows, error):
+	from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+		get_settings_snapshot,
+	)
+
+	settings = get_settings_snapshot()
+	attempts = max(row.attempts for row in rows) + 1
+	max_attempts = settings.max_delivery_attempts or DEFAULT_MAX_ATTEMPTS
+
+	if error.retryable and attempts < max_attempts:
+		delay = get_retry_delay(
+			attempts,
+			retry_after=error.retry_after,
+			backoff=settings.retry_backoff or DEFAULT_BACKOFF,
+			max_backoff=settings.max_retry_backoff or DEFAULT_MAX_BACKOFF,
+		)
+		_defer(rows, delay, attempts=attempts, last_error=str(error))
+		return
+
+	names = [row.name for row in rows]
+	Outbox = frappe.qb.DocType("Google Chat Outbox")
+	(
+		frappe.qb.update(Outbox)
+		.set(Outbox.status, "Dead Letter")
+		.set(Outbox.attempts, attempts)
+		.set(Outbox.last_error, str(error))
+		.where(Outbox.name.isin(names))
+	).run()
+	# An unhealthy webhook was logged once when its circuit breaker opened
+	if not isinstance(error, CircuitOpen):
+		frappe.log_error(
+			f"Moved to dead letters after {attempts} attempt(s): {', '.join(names)}\n{error!s}",
+			"Google Chat Integration",
+		)
+	frappe.db.commit()
+
+
+def _send(rows):
+	from gchat_integration.api import send_google_chat_bot_message
+	from gchat_integration.gchat_integration.doctype.google_chat_webhook.google_chat_webhook import (
+		send_google_chat_digest,
+		send_google_chat_message,
+	)
+
+	row = rows[0]
+	if len(rows) > 1:
+		send_google_chat_digest(webhook_url=row.webhook, entries=rows, raise_on_error=True)
+		return
+
+	if row.google_chat_type == "Chatbot":
+		send_google_chat_bot_message(
+			space_id=row.space,
+			message=row.message,
+			reference_doctype=row.reference_doctype,
+			reference_name=row.reference_name,
+			raise_on_error=True,
+			message_mode=row.message_mode,
+		)
+		return
+
+	send_google_chat_message(
+		webhook_url=row.webhook,
+		message=row.message,
+		reference_doctype=row.reference_doctype,
+		reference_name=row.reference_name,
+		raise_on_error=True,
+		message_mode=row.message_mode,
+	)
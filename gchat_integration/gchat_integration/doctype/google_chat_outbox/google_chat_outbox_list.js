@@ -0,0 +1,22 @@
+// Copyright (c) 2026, Frappe and contributors
+// For license information, please see license.txt
+
+frappe.listview_settings["Google Chat Outbox"] = {
+	get_indicator(doc) {
+		const colors = { Queued: "blue", Sending: "orange", "Dead Letter": "red" };
+		return [__(doc.status), colors[doc.status], "status,=," + doc.status];
+	},
+	onload(listview) {
+		listview.page.add_inner_button(__("Requeue Dead Letters"), () => {
+			frappe
+				.call({
+					method: "gchat_integration.gchat_integration.doctype.google_chat_outbox.google_chat_outbox.requeue_dead_letters",
+					args: { names: listview.get_checked_items(true) },
+				})
+				.then((r) => {
+					frappe.show_alert(__("{0} message(s) requeued", [r.message || 0]));
+					listview.refresh();
+				});
+		});
+	},
+};
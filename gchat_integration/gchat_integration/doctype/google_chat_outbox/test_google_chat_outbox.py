@@ -0,0 +1,248 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import time
+from unittest.mock import patch
+
+import frappe
+import requests
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import now_datetime
+
+from gchat_integration.gchat_integration import auth, circuit_breaker
+from gchat_integration.gchat_integration.doctype.google_chat_outbox.google_chat_outbox import (
+	drain_outbox,
+	enqueue_message,
+	requeue_dead_letters,
+)
+from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+	_settings_cache,
+)
+from gchat_integration.gchat_integration.retry import DeliveryError, get_retry_delay
+from gchat_integration.gchat_integration.testing.mock_chat_server import MockChatServer
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestGoogleChatOutbox(UnitTestCase):
+	"""
+	Unit tests for GoogleChatOutbox.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_retry_classification(self):
+		for status_code, retryable in ((400, False), (403, False), (404, False), (429, True), (503, True)):
+			response = requests.Response()
+			response.status_code = status_code
+			self.assertEqual(DeliveryError.from_response(response).retryable, retryable, status_code)
+
+		self.assertTrue(DeliveryError.from_exception(requests.Timeout()).retryable)
+
+	def test_retry_delay(self):
+		for attempt in range(1, 10):
+			delay = get_retry_delay(attempt, backoff=2, max_backoff=60)
+			expected = min(60, 2 * 2 ** (attempt - 1))
+			self.assertTrue(expected / 2 <= delay <= expected)
+
+		self.assertEqual(get_retry_delay(1, retry_after=30, backoff=2), 30)
+
+
+class IntegrationTestGoogleChatOutbox(IntegrationTestCase):
+	"""
+	Integration tests for GoogleChatOutbox.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def test_rollback_discards_queued_message(self):
+		name = enqueue_message("<p>Hello</p>", "User", "Administrator", webhook="_Test Webhook")
+		self.assertTrue(frappe.db.exists("Google Chat Outbox", name))
+
+		frappe.db.rollback()
+
+		self.assertFalse(frappe.db.exists("Google Chat Outbox", name))
+		self.assertFalse(frappe.flags.gchat_outbox_drain_scheduled)
+
+	def test_message_for_several_webhooks_is_sent_concurrently(self):
+		with MockChatServer(latency=0.2) as server:
+			names = []
+			for i in range(4):
+				webhook = server.create_webhook(f"_Test Fanout {i}", f"FANOUT{i}", show_document_link=0)
+				names.append(
+					enqueue_message("<b>Deployed</b>", "User", "Administrator", webhook=webhook.name)
+				)
+
+			started = time.monotonic()
+			drain_outbox()
+			elapsed = time.monotonic() - started
+
+		self.assertLess(elapsed, 4 * 0.2)
+		self.assertEqual(
+			sorted(request.path.split("/")[3] for request in server.requests),
+			[f"FANOUT{i}" for i in range(4)],
+		)
+		self.assertFalse(frappe.db.exists("Google Chat Outbox", {"name": ("in", names)}))
+
+	def test_chatbot_message_for_several_spaces_is_sent_concurrently(self):
+		with MockChatServer() as server:
+			server.configure_settings()
+			self.addCleanup(_settings_cache.invalidate_now)
+			self.addCleanup(auth._tokens.clear)
+			auth.get_access_token()
+			server.latency = 0.2
+
+			spaces = [f"_TEST{frappe.generate_hash(length=8)}" for _ in range(4)]
+			names = [
+				enqueue_message("<b>Deployed</b>", "User", "Administrator", space=f"spaces/{space}")
+				for space in spaces
+			]
+
+			started = time.monotonic()
+			drain_outbox()
+			elapsed = time.monotonic() - started
+
+		self.assertLess(elapsed, 4 * 0.2)
+		self.assertEqual(
+			sorted(request.path for request in server.requests if request.path.startswith("/v1/")),
+			sorted(f"/v1/spaces/{space}/messages" for space in spaces),
+		)
+		self.assertFalse(frappe.db.exists("Google Chat Outbox", {"name": ("in", names)}))
+
+	def test_fanout_keeps_the_order_of_each_webhook(self):
+		with MockChatServer() as server:
+			first, second = (
+				server.create_webhook(f"_Test Fanout Order {i}", f"ORDER{i}", show_document_link=0).name
+				for i in range(2)
+			)
+			for message, webhook in (
+				("<b>Deployed</b>", first),
+				("<b>Rolled back</b>", first),
+				("<b>Deployed</b>", first),
+				("<b>Deployed</b>", second),
+			):
+				enqueue_message(message, "User", "Administrator", webhook=webhook)
+
+			drain_outbox()
+
+		def received(space):
+			return [request.text for request in server.requests if f"/{space}/" in request.path]
+
+		self.assertEqual(received("ORDER0"), ["*Deployed*", "*Rolled back*", "*Deployed*"])
+		self.assertEqual(received("ORDER1"), ["*Deployed*"])
+
+	def test_single_webhook_and_chatbot_rows_are_delivered(self):
+		with MockChatServer() as server:
+			server.configure_settings()
+			self.addCleanup(_settings_cache.invalidate_now)
+			self.addCleanup(auth._tokens.clear)
+
+			webhook = server.create_webhook("_Test Single Delivery", "SINGLE", show_document_link=0)
+			space = f"_TEST{frappe.generate_hash(length=8)}"
+			names = [
+				enqueue_message("<b>Deployed</b>", "User", "Administrator", webhook=webhook.name),
+				enqueue_message("<b>Deployed</b>", "User", "Administrator", space=f"spaces/{space}"),
+			]
+
+			drain_outbox()
+
+		messages = [request for request in server.requests if request.path.startswith("/v1/")]
+		self.assertEqual(
+			[request.path for request in messages],
+			["/v1/spaces/SINGLE/messages", f"/v1/spaces/{space}/messages"],
+		)
+		self.assertEqual(messages[0].text, "*Deployed*")
+		self.assertEqual(messages[1].body["cardsV2"][0]["card"]["header"]["title"], "User: Administrator")
+		self.assertTrue(messages[1].headers["Authorization"].startswith("Bearer mock-token-"))
+		self.assertFalse(frappe.db.exists("Google Chat Outbox", {"name": ("in", names)}))
+
+	@patch(
+		"gchat_integration.gchat_integration.doctype.google_chat_outbox.google_chat_outbox._schedule_wakeup"
+	)
+	def test_messages_within_the_window_go_out_as_one_digest(self, schedule_wakeup):
+		with MockChatServer() as server:
+			webhook = server.create_webhook(
+				"_Test Digest", "DIGEST", show_document_link=0, coalesce_window=60
+			)
+			frappe.db.after_commit.run()
+			window_key = frappe.cache().make_key(f"gchat_digest_window:{webhook.name}")
+			frappe.cache().delete(window_key)
+			self.addCleanup(frappe.cache().delete, window_key)
+
+			# The first message of a quiet period goes out immediately
+			enqueue_message("<b>Deployed</b>", "User", "Administrator", webhook=webhook.name)
+			drain_outbox()
+			self.assertEqual([request.text for request in server.requests], ["*Deployed*"])
+
+			# Later ones wait for the window to close
+			names = [
+				enqueue_message("<b>Rolled back</b>", "User", "Administrator", webhook=webhook.name),
+				enqueue_message("<b>Deployed</b>", "User", "Guest", webhook=webhook.name),
+			]
+			drain_outbox()
+			self.assertEqual(len(server.requests), 1)
+			schedule_wakeup.assert_called()
+			for row in frappe.get_all(
+				"Google Chat Outbox", filters={"name": ("in", names)}, fields=["status", "deliver_after"]
+			):
+				self.assertEqual(row.status, "Queued")
+				self.assertGreater(row.deliver_after, now_datetime())
+
+			# Close the window and let the deferred rows fall due
+			frappe.cache().delete(window_key)
+			for name in names:
+				frappe.db.set_value("Google Chat Outbox", name, "deliver_after", None)
+			drain_outbox()
+
+		self.assertEqual(len(server.requests), 2)
+		digest = server.requests[1].text.split("\n")
+		self.assertEqual(digest[0], "*2 notifications*")
+		self.assertIn("User Administrator>: *Rolled back*", digest[1])
+		self.assertIn("User Guest>: *Deployed*", digest[2])
+		self.assertFalse(frappe.db.exists("Google Chat Outbox", {"name": ("in", names)}))
+
+	@patch(
+		"gchat_integration.gchat_integration.doctype.google_chat_outbox.google_chat_outbox._schedule_wakeup"
+	)
+	def test_failing_row_becomes_a_dead_letter_and_can_be_requeued(self, schedule_wakeup):
+		max_attempts = frappe.db.get_single_value("Google Chat Settings", "max_delivery_attempts")
+		self.addCleanup(_settings_cache.invalidate_now)
+		self.addCleanup(
+			frappe.db.set_single_value, "Google Chat Settings", "max_delivery_attempts", max_attempts or 0
+		)
+		frappe.db.set_single_value("Google Chat Settings", "max_delivery_attempts", 3)
+		_settings_cache.invalidate_now()
+
+		with MockChatServer() as server:
+			webhook = server.create_webhook("_Test Dead Letter", "DEADLETTER", show_document_link=0)
+			self.addCleanup(circuit_breaker.reset, webhook.name)
+			name = enqueue_message("<b>Deployed</b>", "User", "Administrator", webhook=webhook.name)
+
+			server.fail_next(3, 503)
+			for attempt in range(1, 4):
+				drain_outbox()
+				row = frappe.db.get_value("Google Chat Outbox", name, ["status", "attempts"], as_dict=True)
+				if attempt < 3:
+					# Retried with backoff
+					self.assertEqual((row.status, row.attempts), ("Queued", attempt))
+					frappe.db.set_value("Google Chat Outbox", name, "deliver_after", None)
+
+			self.assertEqual((row.status, row.attempts), ("Dead Letter", 3))
+			self.assertEqual(len(server.requests), 3)
+			self.assertTrue(
+				frappe.db.exists(
+					"Error Log", {"method": "Google Chat Integration", "error": ("like", f"%{name}%")}
+				)
+			)
+
+			self.assertEqual(requeue_dead_letters([name]), 1)
+			self.assertEqual(
+				frappe.db.get_value("Google Chat Outbox", name, ["status", "attempts"]), ("Queued", 0)
+			)
+			drain_outbox()
+
+		self.assertEqual([request.text for request in server.requests], ["*Deployed*"] * 4)
+		self.assertEqual(server.requests[-1].status, 200)
+		self.assertFalse(frappe.db.exists("Google Chat Outbox", name))
@@ -1,8 +1,13 @@
 # Copyright (c) 2025, Frappe and contributors
 # License: MIT. See LICENSE
 
+from dataclasses import dataclass, fields
+
 import frappe
 from frappe.model.document import Document
+from frappe.utils import cast, cint
+
+from gchat_integration.gchat_integration.shared_cache import SharedCache
 
 
 class GoogleChatSettings(Document):
@@ -15,24 +20,39 @@ class GoogleChatSettings(Document):
 		from frappe.types import DF
 
 		bot_name: DF.Data | None
+		chat_api_base_url: DF.Data | None
+		connect_timeout: DF.Float
+		conversion_cache_max_length: DF.Int
+		conversion_cache_size: DF.Int
 		default_notification_space: DF.Data | None
+		default_rate_limit: DF.Int
 		enable_bot: DF.Check
 		enable_system_notifications: DF.Check
 		enable_workflow_approvals: DF.Check
 		http_endpoint_url: DF.Data | None
+		max_delivery_attempts: DF.Int
+		max_rate_limit_wait: DF.Float
+		max_retry_backoff: DF.Float
+		process_events_in_background: DF.Check
+		project_number: DF.Data | None
+		rate_limit_burst: DF.Int
+		read_timeout: DF.Float
+		retry_backoff: DF.Float
 		service_account_creds: DF.Code | None
-		verification_token: DF.Data | None
+		token_uri: DF.Data | None
+		total_timeout: DF.Float
 	# end: auto-generated types
 
 	def validate(self):
 		"""Validate the settings."""
 		if self.enable_bot and not self.service_account_creds:
 			frappe.throw("Service Account JSON is required when Bot Integration is enabled")
-		
+
 		# Validate JSON format
 		if self.service_account_creds:
 			try:
 				import json
+
 				creds = json.loads(self.service_account_creds)
 				required_fields = ["type", "project_id", "private_key", "client_email"]
 				missing = [f for f in required_fields if f not in creds]
@@ -41,21 +61,95 @@ class GoogleChatSettings(Document):
 			except json.JSONDecodeError:
 				frappe.throw("Invalid JSON format in Service Account JSON field")
 
+		if self.total_timeout and self.total_timeout < (self.connect_timeout or 0):
+			frappe.throw("Total Deadline cannot be shorter than the Connect Timeout")
+
+	def on_update(self):
+		# Workers pick up the new values, including the conversion cache size, from the snapshot
+		_settings_cache.invalidate()
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+	"""Read-only copy of Google Chat Settings for hot paths (inbound events, sends).
+
+	Values that are not stored fall back to the DocType defaults, so a site that never
+	saved the settings, or has not stored a field added since, behaves the same.
+	"""
+
+	enable_bot: bool = False
+	bot_name: str | None = None
+	service_account_creds: str | None = None
+	project_number: str | None = None
+	token_uri: str | None = None
+	chat_api_base_url: str | None = None
+	enable_workflow_approvals: bool = False
+	process_events_in_background: bool = False
+	enable_system_notifications: bool = False
+	default_notification_space: str | None = None
+	connect_timeout: float | None = None
+	read_timeout: float | None = None
+	total_timeout: float | None = None
+	default_rate_limit: int | None = None
+	rate_limit_burst: int | None = None
+	max_rate_limit_wait: float | None = None
+	max_delivery_attempts: int | None = None
+	retry_backoff: float | None = None
+	max_retry_backoff: float | None = None
+	conversion_cache_size: int | None = None
+	conversion_cache_max_length: int | None = None
+
+	@classmethod
+	def from_doc(cls, doc):
+		meta = frappe.get_meta("Google Chat Settings")
+		values = {}
+		for field in fields(cls):
+			df = meta.get_field(field.name)
+			value = doc.get(field.name)
+			if value is None:
+				value = df.default
+			if value is not None:
+				values[field.name] = (
+					bool(cint(value)) if df.fieldtype == "Check" else cast(df.fieldtype, value)
+				)
+		return cls(**values)
+
+
+def _load_snapshot(key):
+	return SettingsSnapshot.from_doc(frappe.get_single("Google Chat Settings"))
+
+
+_settings_cache = SharedCache("gchat_settings", _load_snapshot)
+
 
 def get_settings():
 	"""Get Google Chat Settings singleton."""
-	if not frappe.db.exists("Google Chat Settings", "Google Chat Settings"):
-		settings = frappe.new_doc("Google Chat Settings")
-		settings.insert(ignore_permissions=True)
-		return settings
 	return frappe.get_cached_doc("Google Chat Settings", "Google Chat Settings")
 
 
+def get_settings_snapshot():
+	"""Return the cached `SettingsSnapshot`.
+
+	Served from a process-local cache backed by Redis, refreshed in all workers when the
+	settings are saved. A warm call does not query the database.
+	"""
+	return _settings_cache.get("Google Chat Settings")
+
+
+@frappe.whitelist()
+def get_conversion_cache_info():
+	"""Hit/miss counters of the message conversion cache in this worker process."""
+	frappe.only_for("System Manager")
+
+	from gchat_integration.gchat_integration.formatting import get_conversion_cache
+
+	return get_conversion_cache().info()
+
+
 def is_bot_enabled():
 	"""Check if bot integration is enabled."""
 	try:
-		settings = get_settings()
-		return settings.enable_bot
+		return get_settings_snapshot().enable_bot
 	except Exception:
 		return False
 
@@ -63,7 +157,15 @@ def is_bot_enabled():
 def is_workflow_approvals_enabled():
 	"""Check if workflow approvals are enabled."""
 	try:
-		settings = get_settings()
+		settings = get_settings_snapshot()
 		return settings.enable_bot and settings.enable_workflow_approvals
 	except Exception:
 		return False
+
+
+def is_event_verification_enabled():
+	"""Check if inbound events are verified, so the user an event names can be trusted."""
+	try:
+		return bool(get_settings_snapshot().project_number)
+	except Exception:
+		return False
@@ -1,9 +1,50 @@
 # Copyright (c) 2025, Frappe and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+	SettingsSnapshot,
+	_settings_cache,
+)
+from gchat_integration.gchat_integration.formatting import get_conversion_cache
+from gchat_integration.gchat_integration.install import create_settings
 
-# class TestGoogleChatSettings(FrappeTestCase):
-# 	pass
+
+class TestGoogleChatSettings(FrappeTestCase):
+	def test_snapshot_from_doc(self):
+		snapshot = SettingsSnapshot.from_doc(
+			frappe._dict(
+				enable_bot=1, max_rate_limit_wait=0, read_timeout=None, doctype="Google Chat Settings"
+			)
+		)
+		self.assertIs(snapshot.enable_bot, True)
+		self.assertEqual(snapshot.max_rate_limit_wait, 0)
+		# Missing values take the DocType default
+		self.assertEqual(snapshot.read_timeout, 10.0)
+		self.assertEqual(snapshot.default_rate_limit, 60)
+		self.assertIs(snapshot.process_events_in_background, False)
+
+		with self.assertRaises(AttributeError):
+			snapshot.enable_bot = False
+
+	def test_conversion_cache_follows_settings_saved_elsewhere(self):
+		size = frappe.db.get_single_value("Google Chat Settings", "conversion_cache_size")
+		self.addCleanup(_settings_cache.invalidate_now)
+		self.addCleanup(frappe.db.set_single_value, "Google Chat Settings", "conversion_cache_size", size)
+
+		# Saved by another worker: this process only sees the invalidated snapshot
+		frappe.db.set_single_value("Google Chat Settings", "conversion_cache_size", 2)
+		_settings_cache.invalidate_now()
+		self.assertEqual(get_conversion_cache().maxsize, 2)
+
+	def test_migrate_adds_defaults_of_new_fields(self):
+		create_settings()
+		frappe.db.set_single_value("Google Chat Settings", "max_delivery_attempts", 7)
+		# A field added after the settings were saved has no stored value
+		frappe.db.delete("Singles", {"doctype": "Google Chat Settings", "field": "rate_limit_burst"})
+
+		create_settings()
+		self.assertEqual(frappe.db.get_single_value("Google Chat Settings", "rate_limit_burst"), 10)
+		self.assertEqual(frappe.db.get_single_value("Google Chat Settings", "max_delivery_attempts"), 7)
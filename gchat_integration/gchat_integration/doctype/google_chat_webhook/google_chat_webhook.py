@@ -2,14 +2,39 @@
 # License: MIT. See LICENSE
 
 import json
-
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
 
 import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.utils import get_url_to_form
 
+from gchat_integration.gchat_integration import circuit_breaker
+from gchat_integration.gchat_integration.chat_api import (
+	MODE_REPLY,
+	MODE_UPDATE,
+	REPLY_IN_THREAD,
+	get_document_thread_key,
+	get_thread_key,
+)
+from gchat_integration.gchat_integration.circuit_breaker import CircuitOpen
+from gchat_integration.gchat_integration.doctype.google_chat_delivery_log.google_chat_delivery_log import (
+	log_delivery,
+)
+from gchat_integration.gchat_integration.formatting import (
+	MAX_MESSAGE_LENGTH,
+	convert_html_to_gchat_text,
+	iter_message_parts,
+	split_lines,
+)
+from gchat_integration.gchat_integration.http_client import POOL_MAXSIZE, get_timeouts, post_json
+from gchat_integration.gchat_integration.rate_limiter import RateLimitExceeded, acquire, reserve
+from gchat_integration.gchat_integration.retry import DeliveryError
+from gchat_integration.gchat_integration.shared_cache import SharedCache
+
 error_messages = {
 	400: "400: Invalid request or malformed webhook URL",
 	403: "403: Access forbidden",
@@ -17,6 +42,14 @@ error_messages = {
 	500: "500: Google Chat server error",
 }
 
+# Upper bound for the digest window, messages should never be held back for long
+MAX_COALESCE_WINDOW = 600
+DIGEST_LINE_LENGTH = 120
+MARKUP_CHARS = str.maketrans("", "", "*_~")
+# Concurrent sends of a bulk fan-out, bounded by the connection pool
+BULK_MAX_WORKERS = POOL_MAXSIZE
+CONFIG_FIELDS = ("webhook_url", "show_document_link", "coalesce_window", "rate_limit", "health")
+
 
 class GoogleChatWebhook(Document):
 	# begin: auto-generated types
@@ -27,137 +60,452 @@ class GoogleChatWebhook(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		coalesce_window: DF.Int
+		health: DF.Literal["Healthy", "Unhealthy"]
+		health_error: DF.SmallText | None
+		rate_limit: DF.Int
 		show_document_link: DF.Check
 		webhook_name: DF.Data
 		webhook_url: DF.Data
 	# end: auto-generated types
 
-	pass
-
-
-def convert_html_to_gchat_text(html_content):
-	"""Convert HTML content to Google Chat compatible text format."""
-	if not html_content:
-		return ""
-
-	import re
-
-	# Replace headers with bold text and newline
-	html_content = re.sub(r'<h[1-6]>(.*?)</h[1-6]>', r'*\1*\n', html_content, flags=re.IGNORECASE)
-	
-	# Replace paragraphs with double newline
-	html_content = re.sub(r'<p>(.*?)</p>', r'\1\n\n', html_content, flags=re.IGNORECASE)
-	
-	# Replace unordered lists
-	html_content = re.sub(r'<ul>(.*?)</ul>', r'\1', html_content, flags=re.IGNORECASE | re.DOTALL)
-	
-	# Replace list items with bullet points
-	html_content = re.sub(r'<li>(.*?)</li>', r'• \1\n', html_content, flags=re.IGNORECASE)
-	# Handle unclosed list items if any (common in some HTML)
-	html_content = re.sub(r'<li>(.*?)(?=<li>|</ul>)', r'• \1\n', html_content, flags=re.IGNORECASE | re.DOTALL)
-	
-	# Replace line breaks
-	html_content = re.sub(r'<br\s*/?>', r'\n', html_content, flags=re.IGNORECASE)
-	
-	# Replace bold tags
-	html_content = re.sub(r'<b>(.*?)</b>', r'*\1*', html_content, flags=re.IGNORECASE)
-	html_content = re.sub(r'<strong>(.*?)</strong>', r'*\1*', html_content, flags=re.IGNORECASE)
-	
-	# Replace italic tags
-	html_content = re.sub(r'<i>(.*?)</i>', r'_\1_', html_content, flags=re.IGNORECASE)
-	html_content = re.sub(r'<em>(.*?)</em>', r'_\1_', html_content, flags=re.IGNORECASE)
-	
-	# Replace strike tags
-	html_content = re.sub(r'<strike>(.*?)</strike>', r'~\1~', html_content, flags=re.IGNORECASE)
-	html_content = re.sub(r'<s>(.*?)</s>', r'~\1~', html_content, flags=re.IGNORECASE)
-	
-	# Remove other tags but keep content
-	html_content = re.sub(r'<[^>]+>', '', html_content)
-	
-	# Fix multiple newlines (max 2)
-	html_content = re.sub(r'\n{3,}', r'\n\n', html_content)
-	
-	return html_content.strip()
-
-
-def send_google_chat_message(webhook_url, message, reference_doctype, reference_name):
+	def validate(self):
+		if self.coalesce_window and self.coalesce_window > MAX_COALESCE_WINDOW:
+			frappe.throw(_("Digest Window cannot be longer than {0} seconds").format(MAX_COALESCE_WINDOW))
+
+		if not self.is_new() and self.has_value_changed("webhook_url"):
+			# A new URL gets a fresh start
+			self.health = "Healthy"
+			self.health_error = None
+
+	def on_update(self):
+		_config_cache.invalidate()
+		if self.has_value_changed("webhook_url"):
+			circuit_breaker.reset(self.name)
+
+	def on_trash(self):
+		_config_cache.invalidate()
+
+
+@dataclass(frozen=True)
+class WebhookConfig:
+	"""Delivery settings of a Google Chat Webhook, as read on every send."""
+
+	name: str
+	webhook_url: str
+	show_document_link: int = 0
+	coalesce_window: int = 0
+	rate_limit: int = 0
+	health: str = "Healthy"
+
+
+def _load_config(name):
+	values = frappe.db.get_value("Google Chat Webhook", name, CONFIG_FIELDS, as_dict=True)
+	if not values or not values.webhook_url:
+		return None
+	return WebhookConfig(name=name, **values)
+
+
+_config_cache = SharedCache("gchat_webhook_config", _load_config)
+
+
+def get_webhook_config(webhook_name):
+	"""Return the `WebhookConfig` of a Google Chat Webhook, or None if it has no URL.
+
+	Served from a process-local cache backed by Redis, so a warm send does not query the
+	database. Saving or deleting any webhook invalidates the cache in all workers.
+	"""
+	if not webhook_name:
+		return None
+	return _config_cache.get(webhook_name)
+
+
+def invalidate_webhook_config():
+	"""Drop the cached `WebhookConfig`s in all workers once the transaction commits.
+
+	For changes written without saving the document, like the health set by the circuit breaker.
+	"""
+	_config_cache.invalidate()
+
+
+def send_google_chat_message(
+	webhook_url, message, reference_doctype, reference_name, raise_on_error=False, message_mode=None
+):
 	"""Send a message to Google Chat using webhook URL.
-	
+
 	Args:
 		webhook_url: Name of the Google Chat Webhook document
 		message: Text message to send
 		reference_doctype: DocType of the reference document
 		reference_name: Name of the reference document
-		
+		raise_on_error: Raise `DeliveryError` instead of logging failures
+		message_mode: "Reply in Thread" or "Update Message" post all messages about the
+			reference document into one thread. Webhooks cannot edit their messages, so
+			"Update Message" replies in the thread too
+
 	Returns:
 		"success" if message sent successfully, "error" otherwise
 	"""
-	gchat_url, show_link = frappe.db.get_value(
-		"Google Chat Webhook", webhook_url, ["webhook_url", "show_document_link"]
+	config = get_webhook_config(webhook_url)
+	if not config:
+		return _webhook_not_found(webhook_url, raise_on_error)
+
+	# Convert HTML message to Google Chat text format, in parts if it is too long for one message
+	parts = iter_message_parts(message)
+	formatted_message = next(parts, "")
+	next_part = next(parts, None)
+
+	document_thread = message_mode in (MODE_REPLY, MODE_UPDATE) and reference_doctype and reference_name
+	if next_part is None:
+		data = build_message_payload(
+			formatted_message, config.show_document_link, reference_doctype, reference_name
+		)
+		gchat_url = config.webhook_url
+		if document_thread:
+			gchat_url = get_thread_url(gchat_url, get_document_thread_key(reference_doctype, reference_name))
+		return post_to_webhook(webhook_url, gchat_url, data, config.rate_limit, raise_on_error)
+
+	if document_thread:
+		thread_key = get_document_thread_key(reference_doctype, reference_name)
+	else:
+		thread_key = get_thread_key(reference_doctype, reference_name, message)
+	return post_parts_to_webhook(
+		config,
+		chain((formatted_message, next_part), parts),
+		thread_key,
+		reference_doctype,
+		reference_name,
+		raise_on_error,
 	)
 
-	if not gchat_url:
-		frappe.log_error(f"Webhook URL not found for: {webhook_url}", _("Google Chat Webhook Error"))
-		return "error"
 
-	# Convert HTML message to Google Chat text format
-	formatted_message = convert_html_to_gchat_text(message)
+def send_google_chat_digest(webhook_url, entries, raise_on_error=False):
+	"""Send several messages to Google Chat as a single digest message.
+
+	Args:
+		webhook_url: Name of the Google Chat Webhook document
+		entries: List of dicts with `message`, `reference_doctype` and `reference_name`
+		raise_on_error: Raise `DeliveryError` instead of logging failures
+
+	Returns:
+		"success" if message sent successfully, "error" otherwise
+	"""
+	config = get_webhook_config(webhook_url)
+	if not config:
+		return _webhook_not_found(webhook_url, raise_on_error)
+
+	text = build_digest_text(entries)
+	if len(text) <= MAX_MESSAGE_LENGTH:
+		return post_to_webhook(
+			webhook_url, config.webhook_url, {"text": text}, config.rate_limit, raise_on_error
+		)
+
+	thread_key = get_thread_key(webhook_url, text)
+	return post_parts_to_webhook(
+		config, split_lines(text.split("\n")), thread_key, raise_on_error=raise_on_error
+	)
+
+
+def post_parts_to_webhook(
+	config, parts, thread_key, reference_doctype=None, reference_name=None, raise_on_error=False
+):
+	"""POST the parts of a split message one after another, as replies in one thread.
+
+	The document link, if enabled, goes on the last part. Stops at the first part that
+	fails, a retry sends all parts again.
+
+	Returns:
+		"success" if all parts were sent, "error" otherwise
+	"""
+	gchat_url = get_thread_url(config.webhook_url, thread_key)
+	show_link = config.show_document_link and reference_doctype and reference_name
+
+	part = next(parts, None)
+	while part is not None:
+		following = next(parts, None)
+		data = build_message_payload(part, show_link and following is None, reference_doctype, reference_name)
+		if post_to_webhook(config.name, gchat_url, data, config.rate_limit, raise_on_error) != "success":
+			return "error"
+		part = following
+
+	return "success"
+
+
+def get_thread_url(gchat_url, thread_key):
+	"""Return the webhook URL posting into the thread `thread_key`, starting it if needed."""
+	separator = "&" if "?" in gchat_url else "?"
+	return f"{gchat_url}{separator}threadKey={thread_key}&messageReplyOption={REPLY_IN_THREAD}"
+
+
+def send_google_chat_bulk(webhooks, message, reference_doctype=None, reference_name=None, max_workers=None):
+	"""Send one message to several webhooks concurrently.
+
+	Args:
+		webhooks: Names of Google Chat Webhook documents
+		message: HTML message to send
+		reference_doctype: DocType of the reference document, for the document link
+		reference_name: Name of the reference document, for the document link
+		max_workers: Concurrent sends, at most `BULK_MAX_WORKERS`
+
+	Returns:
+		Dict of webhook name to "success" or "error", each send is recorded in the
+		Google Chat Delivery Log
+	"""
+	results = {}
+	outcomes = deliver_bulk(webhooks, message, reference_doctype, reference_name, max_workers)
+	for webhook, (error, latency) in outcomes.items():
+		if isinstance(error, RateLimitExceeded):
+			frappe.log_error(f"Webhook: {webhook}\n{error!s}", _("Google Chat Webhook Error"))
+			results[webhook] = "error"
+			continue
+
+		log_delivery(
+			"Failed" if error else "Success",
+			reference_doctype=reference_doctype,
+			reference_name=reference_name,
+			webhook=webhook,
+			latency=latency,
+			payload=message,
+			error=error,
+		)
+		results[webhook] = "error" if error else "success"
 
-	# Build the Google Chat message
+	return results
+
+
+def deliver_bulk(webhooks, message, reference_doctype=None, reference_name=None, max_workers=None):
+	"""Send one message to several webhooks concurrently, without logging.
+
+	The message is converted once. A message too long for one message is split into
+	parts, posted one after another into one thread of each space. Configuration,
+	circuit breakers and rate limit slots are resolved up front, only the HTTP requests
+	run in the thread pool, so the total time is close to that of the slowest single send.
+
+	Returns:
+		Dict of webhook name to `(error, latency in seconds)`. The error is None for a
+		delivered message, otherwise a `DeliveryError` (`CircuitOpen` if the send was
+		skipped) or `RateLimitExceeded`
+	"""
+	webhooks = list(dict.fromkeys(webhooks))
+	parts = list(iter_message_parts(message)) or [""]
+	thread_key = get_thread_key(reference_doctype, reference_name, message) if len(parts) > 1 else None
+	timeouts = get_timeouts()
+	results = {}
+	sends = []
+
+	for webhook in webhooks:
+		config = get_webhook_config(webhook)
+		if not config:
+			results[webhook] = (DeliveryError(f"Webhook URL not found for: {webhook}"), 0)
+			continue
+
+		try:
+			tracked = circuit_breaker.allow(webhook)
+			send_at = [time.monotonic() + reserve(config.webhook_url, config.rate_limit) for _part in parts]
+		except (CircuitOpen, RateLimitExceeded) as e:
+			results[webhook] = (e, 0)
+			continue
+
+		gchat_url = get_thread_url(config.webhook_url, thread_key) if thread_key else config.webhook_url
+		show_link = config.show_document_link and reference_doctype and reference_name
+		# The document link goes on the last part
+		last = len(parts) - 1
+		posts = []
+		for i, (part, at) in enumerate(zip(parts, send_at, strict=True)):
+			data = build_message_payload(part, show_link and i == last, reference_doctype, reference_name)
+			posts.append((gchat_url, data, at))
+		sends.append((webhook, tracked, posts))
+
+	if sends:
+		workers = min(max_workers or BULK_MAX_WORKERS, BULK_MAX_WORKERS, len(sends))
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gchat-bulk") as executor:
+			outcomes = executor.map(lambda send: _post_in_thread(send[2], timeouts), sends)
+			for (webhook, tracked, _posts), (error, latency) in zip(sends, outcomes, strict=True):
+				if error:
+					circuit_breaker.record_failure(webhook, error.status_code)
+				else:
+					circuit_breaker.record_success(webhook, tracked)
+				results[webhook] = (error, latency)
+
+	return results
+
+
+def _post_in_thread(posts, timeouts):
+	"""POST the parts of a message from a pool thread, stopping at the first that fails.
+
+	Runs without frappe.local, so only HTTP happens here.
+
+	Args:
+		posts: List of `(url, payload, send_at)`, `send_at` being the `time.monotonic()`
+			of the part's rate limit slot
+
+	Returns:
+		`(error, latency in seconds)`, the latency adds up the requests
+	"""
+	latency = 0
+	for gchat_url, data, send_at in posts:
+		if (wait := send_at - time.monotonic()) > 0:
+			time.sleep(wait)
+		started = time.monotonic()
+		try:
+			response = post_json(gchat_url, data, timeouts=timeouts)
+		except Exception as e:
+			return DeliveryError.from_exception(e), latency + time.monotonic() - started
+
+		latency += time.monotonic() - started
+		if not response.ok:
+			message = f"Status: {response.status_code}\nResponse: {response.text}"
+			return DeliveryError.from_response(response, message), latency
+	return None, latency
+
+
+@frappe.whitelist()
+def bulk_send(webhooks, message, reference_doctype=None, reference_name=None):
+	"""Broadcast a message to several Google Chat Webhooks.
+
+	Only for System Managers: a broadcast reaches every space it names.
+
+	Args:
+		webhooks: List (or JSON list) of Google Chat Webhook names
+		message: HTML message to send
+	"""
+	frappe.only_for("System Manager")
+	if reference_doctype and reference_name:
+		frappe.has_permission(reference_doctype, "read", reference_name, throw=True)
+
+	return send_google_chat_bulk(frappe.parse_json(webhooks), message, reference_doctype, reference_name)
+
+
+def _webhook_not_found(webhook_url, raise_on_error):
+	if raise_on_error:
+		raise DeliveryError(f"Webhook URL not found for: {webhook_url}")
+
+	frappe.log_error(f"Webhook URL not found for: {webhook_url}", _("Google Chat Webhook Error"))
+	return "error"
+
+
+def build_digest_text(entries):
+	"""Build the digest text: a heading followed by one linked line per document."""
+	lines = [f"*{len(entries)} notifications*"]
+	for entry in entries:
+		doc_url = get_url_to_form(entry["reference_doctype"], entry["reference_name"])
+		summary = _summarize(convert_html_to_gchat_text(entry["message"]))
+		lines.append(f"• <{doc_url}|{entry['reference_doctype']} {entry['reference_name']}>: {summary}")
+
+	return "\n".join(lines)
+
+
+def _summarize(text, max_length=DIGEST_LINE_LENGTH):
+	"""Return the first non-empty line of `text`, shortened to `max_length` characters."""
+	summary = next((line.strip() for line in text.splitlines() if line.strip()), "")
+	if len(summary) <= max_length:
+		return summary
+
+	# A cut may split a *bold* or _italic_ span, so shortened lines are plain text
+	summary = summary[:max_length].rsplit(" ", 1)[0]
+	return summary.translate(MARKUP_CHARS) + "…"
+
+
+def build_message_payload(formatted_message, show_link, reference_doctype, reference_name):
+	"""Build the webhook payload, with a button linking to the document if `show_link` is set."""
 	# Google Chat webhooks support simple text or card format
 	# Using the simpler card v2 format for better compatibility
-	
-	if show_link:
-		doc_url = get_url_to_form(reference_doctype, reference_name)
-		
-		# Google Chat Card v2 format (simpler and more reliable)
-		data = {
-			"text": formatted_message,
-			"cardsV2": [
-				{
-					"cardId": "document-link",
-					"card": {
-						"sections": [
-							{
-								"widgets": [
-									{
-										"buttonList": {
-											"buttons": [
-												{
-													"text": reference_name,
-													"onClick": {
-														"openLink": {
-															"url": doc_url
-														}
-													}
-												}
-											]
-										}
-									}
-								]
-							}
-						]
-					}
-				}
-			]
-		}
-	else:
+	if not show_link:
 		# Simple text message
-		data = {"text": formatted_message}
+		return {"text": formatted_message}
+
+	doc_url = get_url_to_form(reference_doctype, reference_name)
+
+	# Google Chat Card v2 format (simpler and more reliable)
+	return {
+		"text": formatted_message,
+		"cardsV2": [
+			{
+				"cardId": "document-link",
+				"card": {
+					"sections": [
+						{
+							"widgets": [
+								{
+									"buttonList": {
+										"buttons": [
+											{
+												"text": reference_name,
+												"onClick": {"openLink": {"url": doc_url}},
+											}
+										]
+									}
+								}
+							]
+						}
+					]
+				},
+			}
+		],
+	}
+
+
+def post_to_webhook(webhook_name, gchat_url, data, rate_limit=None, raise_on_error=False):
+	"""POST a prepared payload to a Google Chat webhook URL.
+
+	Skips webhooks whose circuit breaker is open, then waits for a slot in the space's
+	rate limit.
+
+	Returns:
+		"success" if message sent successfully, "error" otherwise
+
+	Raises:
+		RateLimitExceeded: if no slot is available within the configured maximum wait
+			and `raise_on_error` is set
+		DeliveryError: if the send failed and `raise_on_error` is set, `CircuitOpen` if
+			it was skipped
+	"""
+	try:
+		tracked = circuit_breaker.allow(webhook_name)
+	except CircuitOpen as e:
+		if raise_on_error:
+			raise
+		# Logged once when the breaker opened, not for every skipped send
+		frappe.logger().warning(str(e))
+		return "error"
+
+	try:
+		acquire(gchat_url, rate_limit)
+	except RateLimitExceeded as e:
+		if raise_on_error:
+			raise
+		frappe.log_error(f"Webhook: {webhook_name}\n{e!s}", _("Google Chat Webhook Error"))
+		return "error"
 
 	try:
 		frappe.logger().debug(f"Sending Google Chat message to: {gchat_url[:50]}...")
 		frappe.logger().debug(f"Payload: {json.dumps(data)}")
-		
-		r = requests.post(gchat_url, json=data, headers={"Content-Type": "application/json; charset=UTF-8"})
+
+		r = post_json(gchat_url, data)
 
 		if not r.ok:
-			error_msg = error_messages.get(r.status_code, f"{r.status_code}: {r.text}")
-			frappe.log_error(f"Status: {r.status_code}\nResponse: {r.text}\nPayload: {json.dumps(data)}", _("Google Chat Webhook Error"))
+			circuit_breaker.record_failure(webhook_name, r.status_code)
+			if raise_on_error:
+				raise DeliveryError.from_response(r, f"Status: {r.status_code}\nResponse: {r.text}")
+
+			frappe.log_error(
+				f"Status: {r.status_code}\nResponse: {r.text}\nPayload: {json.dumps(data)}",
+				_("Google Chat Webhook Error"),
+			)
 			return "error"
 
-		frappe.logger().info(f"Google Chat message sent successfully to webhook: {webhook_url}")
+		circuit_breaker.record_success(webhook_name, tracked)
+		frappe.logger().info(f"Google Chat message sent successfully to webhook: {webhook_name}")
 		return "success"
+	except DeliveryError:
+		raise
 	except Exception as e:
-		frappe.log_error(f"Exception: {str(e)}\nWebhook: {webhook_url}\nPayload: {json.dumps(data)}", _("Google Chat Webhook Error"))
+		circuit_breaker.record_failure(webhook_name)
+		if raise_on_error:
+			raise DeliveryError.from_exception(e)
+
+		frappe.log_error(
+			f"Exception: {e!s}\nWebhook: {webhook_name}\nPayload: {json.dumps(data)}",
+			_("Google Chat Webhook Error"),
+		)
 		return "error"
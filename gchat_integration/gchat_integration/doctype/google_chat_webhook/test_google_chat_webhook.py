@@ -1,9 +1,27 @@
 # Copyright (c) 2025, Frappe and Contributors
 # See license.txt
 
-# import frappe
+import time
+
+import frappe
 from frappe.tests import IntegrationTestCase, UnitTestCase
 
+from gchat_integration.gchat_integration import circuit_breaker
+from gchat_integration.gchat_integration.chat_api import MODE_REPLY
+from gchat_integration.gchat_integration.circuit_breaker import CircuitOpen
+from gchat_integration.gchat_integration.doctype.google_chat_webhook.google_chat_webhook import (
+	bulk_send,
+	convert_html_to_gchat_text,
+	get_webhook_config,
+	post_to_webhook,
+	send_google_chat_bulk,
+	send_google_chat_digest,
+	send_google_chat_message,
+)
+from gchat_integration.gchat_integration.formatting import MAX_MESSAGE_LENGTH, ConversionCache
+from gchat_integration.gchat_integration.rate_limiter import RateLimitExceeded, get_bucket_key, reserve
+from gchat_integration.gchat_integration.retry import DeliveryError
+from gchat_integration.gchat_integration.testing.mock_chat_server import MockChatServer
 
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
@@ -18,7 +36,58 @@ class UnitTestGoogleChatWebhook(UnitTestCase):
 	Use this class for testing individual functions and methods.
 	"""
 
-	pass
+	def test_convert_documented_tags(self):
+		html = """
+<h3>Order Overdue</h3>
+
+<p>Transaction SO-0001 has exceeded Due Date. <b>Please</b> take <i>necessary</i> <s>action</s>.</p>
+
+<!-- show last comment -->
+<h4>Details</h4>
+
+<ul>
+<li>Customer: ACME</li>
+<li>Amount: 100</li>
+</ul>
+"""
+		self.assertEqual(
+			convert_html_to_gchat_text(html),
+			"*Order Overdue*\n\nTransaction SO-0001 has exceeded Due Date. *Please* take _necessary_ ~action~.\n\n"
+			"*Details*\n\n• Customer: ACME\n\n• Amount: 100",
+		)
+
+	def test_convert_unclosed_list_items(self):
+		self.assertEqual(convert_html_to_gchat_text("<ul><li>One<li>Two</ul>"), "• One\n• Two")
+
+	def test_convert_tags_with_attributes(self):
+		self.assertEqual(
+			convert_html_to_gchat_text('<P class="lead">Hello <STRONG style="x">you</STRONG></P><br/>'),
+			"Hello *you*",
+		)
+
+	def test_convert_nested_lists(self):
+		self.assertEqual(
+			convert_html_to_gchat_text("<ul><li>A<ul><li>B</li></ul></li><li>C</li></ul>"),
+			"• A\n    • B\n• C",
+		)
+
+	def test_conversion_cache_evicts_least_recently_used(self):
+		cache = ConversionCache(maxsize=2)
+
+		for html in ("a", "b", "a", "c", "a"):  # "c" evicts "b"
+			cache.get_or_convert(html, str.upper)
+
+		self.assertEqual(cache.info()["hits"], 2)
+		self.assertEqual(cache.info()["misses"], 3)
+		self.assertEqual(cache.info()["evictions"], 1)
+		self.assertEqual(cache.get_or_convert("b", str.upper), "B")
+		self.assertEqual(cache.info()["misses"], 4)
+
+	def test_convert_drops_comments_and_unknown_tags(self):
+		self.assertEqual(
+			convert_html_to_gchat_text("<!-- <b>hidden</b> --><table><tr><td>Cell</td></tr></table>"),
+			"Cell",
+		)
 
 
 class IntegrationTestGoogleChatWebhook(IntegrationTestCase):
@@ -27,4 +96,233 @@ class IntegrationTestGoogleChatWebhook(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def test_config_cache_invalidated_on_save(self):
+		webhook = frappe.get_doc(
+			{
+				"doctype": "Google Chat Webhook",
+				"webhook_name": "_Test Config Cache",
+				"webhook_url": "https://chat.googleapis.com/v1/spaces/TEST/messages?key=1",
+			}
+		).insert()
+		frappe.db.after_commit.run()
+		self.assertEqual(get_webhook_config(webhook.name).webhook_url, webhook.webhook_url)
+
+		webhook.webhook_url = "https://chat.googleapis.com/v1/spaces/TEST/messages?key=2"
+		webhook.rate_limit = 30
+		webhook.save()
+		# Invalidation waits for the commit, until then the cached config is served
+		self.assertNotEqual(get_webhook_config(webhook.name).webhook_url, webhook.webhook_url)
+
+		frappe.db.after_commit.run()
+		config = get_webhook_config(webhook.name)
+		self.assertEqual(config.webhook_url, webhook.webhook_url)
+		self.assertEqual(config.rate_limit, 30)
+
+	def test_post_to_webhook(self):
+		with MockChatServer() as server:
+			self.assertEqual(post_to_webhook("_Test", server.webhook_url(), {"text": "Hello"}), "success")
+			self.assertEqual(server.requests[0].body, {"text": "Hello"})
+
+			server.fail_next(1, 429)
+			with self.assertRaises(DeliveryError) as error:
+				post_to_webhook("_Test", server.webhook_url(), {"text": "Hello"}, raise_on_error=True)
+			self.assertTrue(error.exception.retryable)
+			self.assertEqual(error.exception.retry_after, 1)
+
+			server.fail_next(1, 400)
+			with self.assertRaises(DeliveryError) as error:
+				post_to_webhook("_Test", server.webhook_url(), {"text": "Hello"}, raise_on_error=True)
+			self.assertFalse(error.exception.retryable)
+
+	def test_rate_limited_send_is_an_error(self):
+		with MockChatServer() as server:
+			url = server.webhook_url("RATE_LIMITED")
+			self.addCleanup(
+				frappe.cache().delete, frappe.cache().make_key(f"gchat_rate_limit:{get_bucket_key(url)}")
+			)
+			# Use up the space's only token, the next one is a minute away
+			reserve(url, rate_limit=1, burst=1, max_wait=0)
+
+			self.assertEqual(post_to_webhook("_Test", url, {"text": "Hello"}, rate_limit=1), "error")
+			with self.assertRaises(RateLimitExceeded):
+				post_to_webhook("_Test", url, {"text": "Hello"}, rate_limit=1, raise_on_error=True)
+			self.assertEqual(server.requests, [])
+
+	def test_bulk_send_is_concurrent(self):
+		with MockChatServer(latency=0.2) as server:
+			webhooks = [server.create_webhook(f"_Test Bulk {i}", f"BULK{i}").name for i in range(6)]
+			server.fail_next(1, 500)
+
+			started = time.monotonic()
+			results = send_google_chat_bulk(
+				[*webhooks, "_Test Missing Webhook"], "<b>Maintenance</b> tonight"
+			)
+			elapsed = time.monotonic() - started
+
+		self.assertLess(elapsed, 6 * 0.2)
+		self.assertEqual(list(results.values()).count("success"), 5)
+		self.assertEqual(results["_Test Missing Webhook"], "error")
+		self.assertTrue(all(request.text == "*Maintenance* tonight" for request in server.requests))
+
+	def test_bulk_send_is_only_for_system_managers(self):
+		user = frappe.get_doc(
+			{
+				"doctype": "User",
+				"email": "gchat-broadcast@example.com",
+				"first_name": "Broadcast",
+				"send_welcome_email": 0,
+			}
+		).insert(ignore_permissions=True, ignore_if_duplicate=True)
+		self.addCleanup(frappe.set_user, frappe.session.user)
+
+		frappe.set_user(user.name)
+		with self.assertRaises(frappe.PermissionError):
+			bulk_send(["_Test Missing Webhook"], "Hello")
+
+		frappe.set_user("Administrator")
+		self.assertEqual(bulk_send('["_Test Missing Webhook"]', "Hello"), {"_Test Missing Webhook": "error"})
+
+	def test_long_bulk_message_is_split_into_one_thread_per_space(self):
+		with MockChatServer() as server:
+			webhooks = [
+				server.create_webhook(f"_Test Bulk Split {i}", f"BULKSPLIT{i}").name for i in range(2)
+			]
+			rows = "".join(f"<li>Item <b>{i}</b> is below its reorder level</li>" for i in range(500))
+			message = f"<h4>Stock report</h4><ul>{rows}</ul>"
+
+			results = send_google_chat_bulk(webhooks, message)
+
+		self.assertEqual(results, dict.fromkeys(webhooks, "success"))
+		self.assertTrue(all(len(request.text) <= MAX_MESSAGE_LENGTH for request in server.requests))
+		for i in range(2):
+			requests = [request for request in server.requests if f"BULKSPLIT{i}" in request.path]
+			self.assertGreater(len(requests), 1)
+			self.assertEqual(
+				" ".join(request.text for request in requests).split(),
+				convert_html_to_gchat_text(message).split(),
+			)
+			threads = {m["thread"]["name"] for m in server.messages.values() if f"BULKSPLIT{i}" in m["name"]}
+			self.assertEqual(len(threads), 1)
+
+	def test_long_message_is_split_into_one_thread(self):
+		with MockChatServer() as server:
+			webhook = server.create_webhook("_Test Split Message", "SPLIT", show_document_link=1)
+			rows = "".join(f"<li>Item <b>{i}</b> is below its reorder level</li>" for i in range(500))
+			message = f"<h4>Stock report</h4><ul>{rows}</ul>"
+
+			self.assertEqual(send_google_chat_message(webhook.name, message, "ToDo", "_Test ToDo"), "success")
+
+		self.assertGreater(len(server.requests), 1)
+		self.assertEqual(len({message["thread"]["name"] for message in server.messages.values()}), 1)
+		self.assertTrue(all(len(request.text) <= MAX_MESSAGE_LENGTH for request in server.requests))
+		# The document link is only on the last part
+		self.assertEqual(
+			[bool(request.body.get("cardsV2")) for request in server.requests][-2:], [False, True]
+		)
+		self.assertEqual(
+			" ".join(request.text for request in server.requests).split(),
+			convert_html_to_gchat_text(message).split(),
+		)
+
+	def test_long_digest_is_split_into_one_thread(self):
+		with MockChatServer() as server:
+			webhook = server.create_webhook("_Test Split Digest", "SPLITDIGEST")
+			entries = [
+				{
+					"message": f"<p>Item <b>{i}</b> is below its reorder level at every warehouse of the company</p>",
+					"reference_doctype": "ToDo",
+					"reference_name": f"_Test ToDo {i}",
+				}
+				for i in range(100)
+			]
+
+			self.assertEqual(send_google_chat_digest(webhook.name, entries, raise_on_error=True), "success")
+
+		self.assertGreater(len(server.requests), 1)
+		self.assertTrue(all(len(request.text) <= MAX_MESSAGE_LENGTH for request in server.requests))
+		self.assertEqual(len({message["thread"]["name"] for message in server.messages.values()}), 1)
+		lines = "\n".join(request.text for request in server.requests).splitlines()
+		self.assertEqual(lines[0], "*100 notifications*")
+		self.assertEqual(len([line for line in lines if line.startswith("• ")]), 100)
+
+	def test_reply_mode_keeps_a_document_in_one_thread(self):
+		with MockChatServer() as server:
+			webhook = server.create_webhook("_Test Reply Mode", "REPLY")
+
+			for status in ("Open", "Closed"):
+				self.assertEqual(
+					send_google_chat_message(
+						webhook.name, f"Status: {status}", "ToDo", "_Test ToDo", message_mode=MODE_REPLY
+					),
+					"success",
+				)
+			send_google_chat_message(
+				webhook.name, "Status: Open", "ToDo", "_Test ToDo 2", message_mode=MODE_REPLY
+			)
+
+		threads = [message["thread"]["name"] for message in server.messages.values()]
+		self.assertEqual(len(threads), 3)
+		self.assertEqual(threads[0], threads[1])
+		self.assertNotEqual(threads[1], threads[2])
+
+	def test_circuit_breaker_skips_deleted_webhook(self):
+		with MockChatServer() as server:
+			webhook = server.create_webhook("_Test Circuit Breaker", "DELETED")
+			self.addCleanup(circuit_breaker.reset, webhook.name)
+
+			server.fail_next(circuit_breaker.PERMANENT_FAILURE_THRESHOLD, 404)
+			for _ in range(circuit_breaker.PERMANENT_FAILURE_THRESHOLD):
+				with self.assertRaises(DeliveryError):
+					post_to_webhook(webhook.name, webhook.webhook_url, {"text": "Hello"}, raise_on_error=True)
+
+			# Open: no request is made and the send is not retried
+			with self.assertRaises(CircuitOpen) as error:
+				post_to_webhook(webhook.name, webhook.webhook_url, {"text": "Hello"}, raise_on_error=True)
+			self.assertFalse(error.exception.retryable)
+			self.assertEqual(post_to_webhook(webhook.name, webhook.webhook_url, {"text": "Hello"}), "error")
+			self.assertEqual(len(server.requests), circuit_breaker.PERMANENT_FAILURE_THRESHOLD)
+			self.assertEqual(frappe.db.get_value("Google Chat Webhook", webhook.name, "health"), "Unhealthy")
+
+			# A new URL closes the breaker again
+			webhook.reload()
+			webhook.webhook_url = server.webhook_url("NEW")
+			webhook.save()
+			self.assertEqual(webhook.health, "Healthy")
+			self.assertEqual(post_to_webhook(webhook.name, webhook.webhook_url, {"text": "Hello"}), "success")
+
+	def test_success_after_expired_breaker_state_resets_health(self):
+		with MockChatServer() as server:
+			webhook = server.create_webhook("_Test Expired Breaker")
+			self.addCleanup(circuit_breaker.reset, webhook.name)
+			frappe.db.after_commit.run()
+
+			server.fail_next(circuit_breaker.PERMANENT_FAILURE_THRESHOLD, 404)
+			for _ in range(circuit_breaker.PERMANENT_FAILURE_THRESHOLD):
+				post_to_webhook(webhook.name, webhook.webhook_url, {"text": "Hello"})
+			frappe.db.after_commit.run()
+			self.assertEqual(get_webhook_config(webhook.name).health, "Unhealthy")
+
+			# The Redis state outlived STATE_TTL, the stored health did not
+			circuit_breaker.reset(webhook.name)
+			self.assertEqual(post_to_webhook(webhook.name, webhook.webhook_url, {"text": "Hello"}), "success")
+			self.assertEqual(frappe.db.get_value("Google Chat Webhook", webhook.name, "health"), "Healthy")
+
+			frappe.db.after_commit.run()
+			self.assertEqual(get_webhook_config(webhook.name).health, "Healthy")
+
+	def test_circuit_breaker_opens_temporarily_on_server_errors(self):
+		with MockChatServer() as server:
+			self.addCleanup(circuit_breaker.reset, "_Test Failing Webhook")
+			server.fail_next(circuit_breaker.FAILURE_THRESHOLD, 503)
+			for _ in range(circuit_breaker.FAILURE_THRESHOLD):
+				self.assertEqual(
+					post_to_webhook("_Test Failing Webhook", server.webhook_url(), {"text": "Hi"}), "error"
+				)
+
+			with self.assertRaises(CircuitOpen) as error:
+				post_to_webhook(
+					"_Test Failing Webhook", server.webhook_url(), {"text": "Hi"}, raise_on_error=True
+				)
+			self.assertTrue(error.exception.retryable)
+			self.assertLessEqual(error.exception.retry_after, circuit_breaker.OPEN_DURATION)
+			self.assertEqual(len(server.requests), circuit_breaker.FAILURE_THRESHOLD)
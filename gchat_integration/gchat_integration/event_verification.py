@@ -0,0 +1,104 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Verification of inbound Google Chat events.
+
+Google Chat sends every request to the app's HTTP endpoint with an `Authorization:
+Bearer` JWT, signed by `chat@system.gserviceaccount.com` for the project number of the
+Google Cloud project that owns the Chat app. The public certificates of that account
+are fetched once and kept in process memory until they expire.
+"""
+
+import re
+import threading
+import time
+
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
+
+from gchat_integration.gchat_integration.http_client import request
+
+CHAT_ISSUER = "chat@system.gserviceaccount.com"
+CHAT_CERTS_URL = f"https://www.googleapis.com/service_accounts/v1/metadata/x509/{CHAT_ISSUER}"
+DEFAULT_CERTS_TTL = 3600  # seconds, when the response has no max-age
+# Unknown key IDs refetch the certificates (Google rotates them), at most this often
+MIN_REFETCH_INTERVAL = 60  # seconds
+CLOCK_SKEW = 30  # seconds of leeway for iat/exp
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+# (fetched at, expires at, {key ID: public key})
+_keys = (0, 0, {})
+_lock = threading.Lock()
+
+
+class InvalidEvent(Exception):
+	"""Raised for a request that was not sent by Google Chat for this app."""
+
+
+def verify_event_token(authorization, project_number):
+	"""Check the `Authorization` header of a Google Chat request.
+
+	Args:
+		authorization: Value of the `Authorization` header
+		project_number: Google Cloud project number of the Chat app, the token's audience
+
+	Raises:
+		InvalidEvent: if the bearer token is missing, invalid, expired, or not issued
+			by Google Chat for `project_number`
+	"""
+	scheme, _, token = (authorization or "").partition(" ")
+	if scheme.lower() != "bearer" or not token.strip():
+		raise InvalidEvent("Missing bearer token")
+
+	try:
+		key_id = jwt.get_unverified_header(token.strip()).get("kid")
+	except jwt.PyJWTError as e:
+		raise InvalidEvent(f"Malformed bearer token: {e}")
+
+	try:
+		jwt.decode(
+			token.strip(),
+			_get_public_key(key_id),
+			algorithms=["RS256"],
+			audience=str(project_number).strip(),
+			issuer=CHAT_ISSUER,
+			leeway=CLOCK_SKEW,
+			options={"require": ["exp", "iat", "iss", "aud"]},
+		)
+	except jwt.PyJWTError as e:
+		raise InvalidEvent(f"Invalid bearer token: {e}")
+
+
+def _get_public_key(key_id):
+	global _keys
+
+	fetched_at, expires_at, keys = _keys
+	now = time.time()
+	if now >= expires_at or (key_id not in keys and now - fetched_at >= MIN_REFETCH_INTERVAL):
+		with _lock:
+			if _keys[0] == fetched_at:
+				_keys = _fetch_keys()
+		keys = _keys[2]
+
+	try:
+		return keys[key_id]
+	except KeyError:
+		raise InvalidEvent(f"Unknown signing key: {key_id}")
+
+
+def _fetch_keys():
+	"""Return `(fetched at, expires at, keys)` from Google Chat's certificates."""
+	try:
+		response = request("GET", CHAT_CERTS_URL)
+		response.raise_for_status()
+		certificates = response.json()
+	except Exception as e:
+		raise InvalidEvent(f"Could not fetch the Google Chat certificates: {e}")
+
+	keys = {
+		key_id: load_pem_x509_certificate(pem.encode()).public_key() for key_id, pem in certificates.items()
+	}
+	match = MAX_AGE_PATTERN.search(response.headers.get("Cache-Control") or "")
+	now = time.time()
+	return now, now + (int(match.group(1)) if match else DEFAULT_CERTS_TTL), keys
@@ -0,0 +1,495 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Conversion of rendered HTML messages to Google Chat text markup.
+
+The converter tokenizes the message in a single linear scan: one precompiled pattern
+splits it into text and tags, text is copied as is and a small state machine emits
+Google Chat markup for each tag. Tags may carry attributes and may be nested.
+
+Converted messages are memoized in a bounded LRU cache keyed by a hash of the HTML,
+so the same rendered message (repeated events, one message sent to several spaces)
+is only converted once per process.
+
+Messages longer than Google Chat accepts are split into parts at line boundaries by
+`iter_message_parts`. Large ones are converted in streaming mode, chunk by chunk, so
+memory stays bounded by the part size rather than the message size.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+
+# Tags never contain "<", so an unterminated tag cannot make the scan quadratic
+TOKEN_PATTERN = re.compile(r"(<[^<>]+>)")
+TAG_PATTERN = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)")
+EXCESS_NEWLINES_PATTERN = re.compile(r"\n{3,}")
+
+INLINE_MARKERS = {
+	"b": "*",
+	"strong": "*",
+	"i": "_",
+	"em": "_",
+	"s": "~",
+	"strike": "~",
+}
+HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+BULLET = "• "
+NESTED_LIST_INDENT = "    "
+
+# Stateful actions, everything else maps straight to the text it emits
+OPEN_ITEM, CLOSE_ITEM, OPEN_LIST, CLOSE_LIST = range(4)
+
+# Tokens with attributes are cached as they are seen, up to this many
+MAX_CACHED_TOKENS = 4096
+
+# Google Chat's limit for the text of a message
+MAX_MESSAGE_LENGTH = 4096  # characters
+# HTML longer than this is converted in chunks of this size when splitting
+STREAM_CHUNK_SIZE = 64 * 1024  # characters
+MARKUP_CHARS = "*_~"
+
+DEFAULT_CACHE_SIZE = 256  # converted messages
+DEFAULT_MAX_CACHED_LENGTH = 256 * 1024  # characters, larger messages are not cached
+
+
+def _build_token_actions():
+	actions = {}
+	for tag, marker in INLINE_MARKERS.items():
+		actions[f"<{tag}>"] = actions[f"</{tag}>"] = marker
+	for tag in HEADINGS:
+		actions[f"<{tag}>"] = "*"
+		actions[f"</{tag}>"] = "*\n"
+	for tag in ("ul", "ol"):
+		actions[f"<{tag}>"] = OPEN_LIST
+		actions[f"</{tag}>"] = CLOSE_LIST
+	actions.update(
+		{
+			"<p>": "",
+			"</p>": "\n\n",
+			"<br>": "\n",
+			"<br/>": "\n",
+			"<br />": "\n",
+			"<li>": OPEN_ITEM,
+			"</li>": CLOSE_ITEM,
+		}
+	)
+	return actions
+
+
+_token_actions = _build_token_actions()
+
+
+def convert_html_to_gchat_text(html_content, use_cache=True):
+	"""Convert HTML content to Google Chat compatible text format."""
+	if not html_content:
+		return ""
+
+	if use_cache:
+		return get_conversion_cache().get_or_convert(html_content, _convert)
+
+	return _convert(html_content)
+
+
+def _convert(html_content):
+	converter = HTMLToGChatConverter()
+	converter.feed(html_content)
+	return EXCESS_NEWLINES_PATTERN.sub("\n\n", "".join(converter.output)).strip()
+
+
+class ConversionCache:
+	"""Bounded LRU cache of converted messages, keyed by a hash of the HTML.
+
+	The least recently used entry is evicted once `maxsize` entries are stored.
+	Messages longer than `max_length` characters are converted but not cached.
+	"""
+
+	def __init__(self, maxsize=DEFAULT_CACHE_SIZE, max_length=DEFAULT_MAX_CACHED_LENGTH):
+		self.maxsize = maxsize
+		self.max_length = max_length
+		self.hits = self.misses = self.evictions = 0
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get_or_convert(self, html, convert):
+		if not self.maxsize or len(html) > self.max_length:
+			with self._lock:
+				self.misses += 1
+			return convert(html)
+
+		key = blake2b(html.encode(), digest_size=16).digest()
+		with self._lock:
+			text = self._entries.get(key)
+			if text is not None:
+				self._entries.move_to_end(key)
+				self.hits += 1
+				return text
+
+		text = convert(html)
+		with self._lock:
+			self.misses += 1
+			self._entries[key] = text
+			self._evict()
+		return text
+
+	def configure(self, maxsize=None, max_length=None):
+		with self._lock:
+			if maxsize is not None:
+				self.maxsize = maxsize
+			if max_length is not None:
+				self.max_length = max_length
+			self._evict()
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self.hits = self.misses = self.evictions = 0
+
+	def info(self):
+		return {
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"size": len(self._entries),
+			"maxsize": self.maxsize,
+			"max_length": self.max_length,
+		}
+
+	def _evict(self):
+		while len(self._entries) > self.maxsize:
+			self._entries.popitem(last=False)
+			self.evictions += 1
+
+
+_conversion_cache = None
+
+
+def get_conversion_cache():
+	"""Return this process's conversion cache, sized from Google Chat Settings.
+
+	The size is read from the settings snapshot on every call, so settings saved in any
+	worker resize the cache in all of them.
+	"""
+	global _conversion_cache
+	if _conversion_cache is None:
+		_conversion_cache = ConversionCache()
+
+	options = _get_settings_cache_options()
+	if options and (options["maxsize"], options["max_length"]) != (
+		_conversion_cache.maxsize,
+		_conversion_cache.max_length,
+	):
+		_conversion_cache.configure(**options)
+
+	return _conversion_cache
+
+
+def _get_settings_cache_options():
+	"""Return the cache options of the current site, None without a site (e.g. benchmarks)."""
+	try:
+		import frappe
+	except ImportError:
+		return None
+
+	if not getattr(frappe.local, "site", None):
+		return None
+
+	from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+		get_settings_snapshot,
+	)
+
+	return _get_cache_options(get_settings_snapshot())
+
+
+def _get_cache_options(settings):
+	return {
+		"maxsize": settings.conversion_cache_size or DEFAULT_CACHE_SIZE,
+		"max_length": (settings.conversion_cache_max_length or 0) * 1024 or DEFAULT_MAX_CACHED_LENGTH,
+	}
+
+
+def get_token_action(token):
+	"""Return what to emit for a tag token: text, or one of the stateful list actions."""
+	action = _token_actions.get(token)
+	if action is not None:
+		return action
+
+	match = TAG_PATTERN.match(token)
+	if not match:
+		# Comments, doctypes and other markup are dropped
+		return ""
+
+	closing, tag = match.groups()
+	action = _token_actions.get(f"<{closing}{tag.lower()}>", "")
+	if len(_token_actions) < MAX_CACHED_TOKENS:
+		_token_actions[token] = action
+	return action
+
+
+class HTMLToGChatConverter:
+	"""Single pass HTML to Google Chat markup converter.
+
+	- `<h1>`..`<h6>` become bold text followed by a newline
+	- `<p>` is followed by a blank line
+	- `<li>` becomes a bullet, also when it is not explicitly closed
+	- `<b>`/`<strong>`, `<i>`/`<em>` and `<s>`/`<strike>` become `*`, `_` and `~`
+	- `<br>` becomes a newline
+	- comments and all other tags are dropped, keeping their content
+	"""
+
+	def __init__(self):
+		self.output = []
+		# One entry per open list, True while the list has an unterminated item
+		self.lists = []
+
+	def feed(self, html):
+		if "<!--" in html:
+			html = strip_comments(html)
+
+		parts = TOKEN_PATTERN.split(html)
+		output = self.output
+		append = output.append
+		actions = _token_actions
+
+		# Text and tags alternate: text, tag, text, ..., text
+		for i in range(1, len(parts), 2):
+			append(parts[i - 1])
+
+			token = parts[i]
+			action = actions.get(token)
+			if action is None:
+				action = get_token_action(token)
+
+			if action.__class__ is str:
+				append(action)
+			else:
+				self.handle_list_action(action)
+
+		append(parts[-1])
+
+	def handle_list_action(self, action):
+		lists = self.lists
+		append = self.output.append
+
+		if action == OPEN_ITEM:
+			if not lists:
+				# Items without an enclosing list
+				lists.append(False)
+			elif lists[-1]:
+				# Previous item was not closed
+				append("\n")
+			append(NESTED_LIST_INDENT * (len(lists) - 1) + BULLET)
+			lists[-1] = True
+
+		elif action == CLOSE_ITEM:
+			if lists and lists[-1]:
+				append("\n")
+				lists[-1] = False
+
+		elif action == OPEN_LIST:
+			if lists and lists[-1]:
+				# Nested list: finish the parent item's line, its closing tag adds nothing
+				append("\n")
+				lists[-1] = False
+			lists.append(False)
+
+		elif action == CLOSE_LIST:
+			if lists and lists.pop():
+				append("\n")
+
+
+def strip_comments(html):
+	"""Remove terminated `<!-- -->` comments, unterminated ones are left to the tokenizer."""
+	parts = []
+	pos = 0
+	while (start := html.find("<!--", pos)) != -1:
+		end = html.find("-->", start + 4)
+		if end == -1:
+			break
+		parts.append(html[pos:start])
+		pos = end + 3
+
+	parts.append(html[pos:])
+	return "".join(parts)
+
+
+def iter_message_parts(html_content, max_length=MAX_MESSAGE_LENGTH):
+	"""Yield the converted message in parts of at most `max_length` characters.
+
+	Parts end at line breaks, so bullets and formatting stay intact. A single line that
+	is too long is split between words where no `*bold*`, `_italic_` or `~strike~` span
+	is open. Joined with newlines, the parts equal `convert_html_to_gchat_text`, apart
+	from blank lines at the part boundaries.
+	"""
+	if not html_content:
+		return
+
+	if len(html_content) <= STREAM_CHUNK_SIZE:
+		text = convert_html_to_gchat_text(html_content)
+		if len(text) <= max_length:
+			if text:
+				yield text
+			return
+		lines = text.split("\n")
+	else:
+		lines = iter_gchat_lines(_iter_chunks(html_content))
+
+	yield from split_lines(lines, max_length)
+
+
+def iter_gchat_lines(chunks):
+	"""Convert HTML arriving in chunks, yielding lines of text as soon as they are complete.
+
+	Joined with newlines, the lines equal the output of the whole-string converter.
+	"""
+	converter = HTMLToGChatConverter()
+	output = converter.output
+	pending_html = ""
+	partial_line = ""
+	# Whitespace-only lines and the last content line, held back until it is known
+	# whether more content follows (for collapsing blank lines and the final strip)
+	held = []
+	started = False
+
+	def emit(lines):
+		nonlocal started
+		for line in lines:
+			if not started:
+				if not line.strip():
+					continue
+				line = line.lstrip()
+				started = True
+			elif not line and held and not held[-1]:
+				# Collapse runs of blank lines to a single one
+				continue
+
+			if line.strip():
+				yield from held
+				held.clear()
+			held.append(line)
+
+	for chunk in chunks:
+		html = pending_html + chunk
+		cut = _find_safe_cut(html)
+		pending_html = html[cut:]
+		converter.feed(html[:cut])
+
+		lines = (partial_line + "".join(output)).split("\n")
+		output.clear()
+		partial_line = lines.pop()
+		yield from emit(lines)
+
+	converter.feed(pending_html)
+	lines = (partial_line + "".join(output)).split("\n")
+	yield from emit(lines)
+
+	# Drop trailing whitespace-only lines and strip the last content line
+	while held and not held[-1].strip():
+		held.pop()
+	if held:
+		held[-1] = held[-1].rstrip()
+		yield from held
+
+
+def _iter_chunks(html, chunk_size=STREAM_CHUNK_SIZE):
+	for start in range(0, len(html), chunk_size):
+		yield html[start : start + chunk_size]
+
+
+def _find_safe_cut(html):
+	"""Return how much of `html` converts the same on its own as within the whole message.
+
+	The cut may not fall inside a comment, nor inside a tag of the text outside comments
+	(a tag can span a comment, since comments are removed before tokenizing).
+	"""
+	# Text outside comments, matched from the start like `strip_comments` does
+	segments = []
+	pos = 0
+	limit = len(html)
+	while (start := html.find("<!--", pos)) != -1:
+		segments.append((pos, start))
+		end = html.find("-->", start + 4)
+		if end == -1:
+			limit = start
+			break
+		pos = end + 3
+	else:
+		segments.append((pos, limit))
+
+	# Any "<" after the last ">" may still become a tag (the next chunk can turn a
+	# later "<" into a comment, joining the text around it), cut before the first one
+	cut = limit
+	for start, end in reversed(segments):
+		tag_end = html.rfind(">", start, end)
+		tag_start = html.find("<", max(tag_end, start), end)
+		if tag_start != -1:
+			cut = tag_start
+		if tag_end != -1:
+			break
+
+	return cut
+
+
+def split_lines(lines, max_length=MAX_MESSAGE_LENGTH):
+	"""Group lines into parts of at most `max_length` characters, splitting overlong lines."""
+	part = []
+	length = 0
+	for line in lines:
+		if len(line) > max_length:
+			if part:
+				yield _join_part(part)
+				part, length = [], 0
+			*pieces, line = split_long_line(line, max_length)
+			yield from pieces
+
+		added = len(line) + (1 if part else 0)
+		if part and length + added > max_length:
+			if text := _join_part(part):
+				yield text
+			part, length, added = [], 0, len(line)
+
+		part.append(line)
+		length += added
+
+	if part and (text := _join_part(part)):
+		yield text
+
+
+def _join_part(lines):
+	return "\n".join(lines).strip("\n")
+
+
+def split_long_line(line, max_length=MAX_MESSAGE_LENGTH):
+	"""Split a line longer than `max_length` between words, never inside a formatting span."""
+	pieces = []
+	while len(line) > max_length:
+		cut = _find_balanced_cut(line, max_length)
+		if cut is None:
+			# No word boundary outside of a span: drop the markup rather than break it
+			line = line.translate(_STRIP_MARKUP)
+			cut = line.rfind(" ", 1, max_length + 1)
+			if cut <= 0:
+				cut = max_length
+
+		pieces.append(line[:cut].rstrip())
+		line = line[cut:].lstrip()
+
+	pieces.append(line)
+	return pieces
+
+
+_STRIP_MARKUP = str.maketrans("", "", MARKUP_CHARS)
+
+
+def _find_balanced_cut(line, max_length):
+	"""Return the last space within `max_length` with every formatting marker before it closed."""
+	counts = dict.fromkeys(MARKUP_CHARS, 0)
+	best = None
+	for i, char in enumerate(line[: max_length + 1]):
+		if char in counts:
+			counts[char] += 1
+		elif char == " " and i and not any(count % 2 for count in counts.values()):
+			best = i
+	return best
@@ -0,0 +1,208 @@
+# Copyright (c) 2025, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Pooled HTTP sessions for talking to Google Chat.
+
+Sessions are kept per process and per host, so consecutive sends reuse an
+already established TLS connection instead of paying a new handshake each time.
+Every request is bounded by a connect timeout, a read timeout and a total deadline.
+The deadline is enforced by a timer that shuts down the request's socket, so neither
+a slow response nor a trickling body can hold a worker past it.
+"""
+
+import os
+import socket
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_CONNECT_TIMEOUT = 3.0
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_TOTAL_TIMEOUT = 15.0
+POOL_MAXSIZE = 10
+
+_sessions = {}
+_sessions_pid = None
+_lock = threading.Lock()
+# Deadline of the request running in the current thread, see `_Deadline`
+_local = threading.local()
+
+
+class DeadlineExceeded(requests.Timeout):
+	"""Raised when a request does not complete within its total deadline."""
+
+
+def get_session(url):
+	"""Return the keep-alive session for the host of `url`, creating it on first use."""
+	global _sessions_pid
+
+	parts = urlsplit(url)
+	key = f"{parts.scheme}://{parts.netloc}"
+
+	# Sockets must never be shared with a forked child (e.g. gunicorn --preload)
+	if _sessions_pid != os.getpid():
+		with _lock:
+			if _sessions_pid != os.getpid():
+				_sessions.clear()
+				_sessions_pid = os.getpid()
+
+	session = _sessions.get(key)
+	if session is None:
+		with _lock:
+			session = _sessions.get(key)
+			if session is None:
+				session = _make_session()
+				_sessions[key] = session
+
+	return session
+
+
+class _Deadline:
+	"""Timer shutting down the socket of a request once its total deadline has passed."""
+
+	# Seconds between attempts while the connection has no socket yet
+	CONNECT_POLL_INTERVAL = 0.05
+
+	def __init__(self, seconds):
+		self.expired = False
+		self._connection = None
+		self._done = False
+		self._lock = threading.Lock()
+		self._start(seconds)
+
+	def _start(self, seconds):
+		self._timer = threading.Timer(seconds, self._expire)
+		self._timer.daemon = True
+		self._timer.start()
+
+	def attach(self, connection):
+		with self._lock:
+			self._connection = connection
+
+	def cancel(self):
+		with self._lock:
+			self._done = True
+			self._timer.cancel()
+
+	def _expire(self):
+		with self._lock:
+			if self._done:
+				return
+			self.expired = True
+			sock = self._connection and self._connection.sock
+			if sock is None:
+				# Still connecting, the connect timeout bounds that
+				self._start(self.CONNECT_POLL_INTERVAL)
+				return
+
+		try:
+			sock.shutdown(socket.SHUT_RDWR)
+		except OSError:
+			pass
+
+
+class _DeadlineMixin:
+	def _make_request(self, conn, *args, **kwargs):
+		if deadline := getattr(_local, "deadline", None):
+			deadline.attach(conn)
+		return super()._make_request(conn, *args, **kwargs)
+
+
+class _HTTPConnectionPool(_DeadlineMixin, HTTPConnectionPool):
+	pass
+
+
+class _HTTPSConnectionPool(_DeadlineMixin, HTTPSConnectionPool):
+	pass
+
+
+class _DeadlineAdapter(HTTPAdapter):
+	"""Adapter whose pools hand each request's connection to its deadline timer."""
+
+	def init_poolmanager(self, *args, **kwargs):
+		super().init_poolmanager(*args, **kwargs)
+		self.poolmanager.pool_classes_by_scheme = {"http": _HTTPConnectionPool, "https": _HTTPSConnectionPool}
+
+
+def _make_session():
+	session = requests.Session()
+	# Retries are handled by the caller, the adapter only pools connections
+	adapter = _DeadlineAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+	return session
+
+
+def get_timeouts():
+	"""Return `(connect, read, total)` timeouts in seconds from Google Chat Settings."""
+	from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+		get_settings_snapshot,
+	)
+
+	try:
+		settings = get_settings_snapshot()
+	except Exception:
+		return DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_TOTAL_TIMEOUT
+
+	return (
+		settings.connect_timeout or DEFAULT_CONNECT_TIMEOUT,
+		settings.read_timeout or DEFAULT_READ_TIMEOUT,
+		settings.total_timeout or DEFAULT_TOTAL_TIMEOUT,
+	)
+
+
+def request(method, url, timeouts=None, **kwargs):
+	"""Send a request over the pooled session for `url`, enforcing the total deadline.
+
+	Args:
+		method: HTTP method
+		url: Absolute URL
+		timeouts: Optional `(connect, read, total)` tuple, defaults to `get_timeouts()`
+		**kwargs: Passed through to `requests.Session.request`
+
+	Returns:
+		`requests.Response` with its body already read
+	"""
+	connect_timeout, read_timeout, total_timeout = timeouts or get_timeouts()
+
+	# The read timeout applies per socket read, the deadline to the whole request
+	deadline = _local.deadline = _Deadline(total_timeout)
+	response = None
+	try:
+		response = get_session(url).request(
+			method,
+			url,
+			timeout=(connect_timeout, min(read_timeout, total_timeout)),
+			stream=True,
+			**kwargs,
+		)
+		response._content = b"".join(response.iter_content(chunk_size=8192))
+		if deadline.expired:
+			# A body without Content-Length just ends when the socket is shut down
+			raise DeadlineExceeded
+	except Exception as e:
+		if response is not None:
+			response.close()
+		if deadline.expired:
+			raise DeadlineExceeded(f"Request to {urlsplit(url).netloc} exceeded {total_timeout}s") from e
+		raise
+	finally:
+		deadline.cancel()
+		_local.deadline = None
+
+	return response
+
+
+def post_json(url, data, timeouts=None, headers=None):
+	"""POST `data` as JSON to `url` over the pooled session."""
+	return request(
+		"POST",
+		url,
+		timeouts=timeouts,
+		json=data,
+		headers=headers or {"Content-Type": "application/json; charset=UTF-8"},
+	)
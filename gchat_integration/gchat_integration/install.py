@@ -12,6 +12,7 @@ from frappe.custom.doctype.property_setter.property_setter import make_property_
 
 def after_install():
 	"""Called after app installation to set up custom fields and configurations."""
+	create_settings()
 	create_notification_custom_fields()
 	update_notification_channel_options()
 	create_notification_property_setters()
@@ -19,8 +20,36 @@ def after_install():
 	frappe.db.commit()
 
 
+def create_settings():
+	"""Save Google Chat Settings with their defaults, so they never need to be created on demand.
+
+	Also run after migrate: sites installed earlier get the settings, and the defaults of
+	fields added since, without touching values already stored.
+	"""
+	stored = frappe.db.get_singles_dict("Google Chat Settings")
+	if not stored:
+		settings = frappe.get_single("Google Chat Settings")
+		settings.flags.ignore_permissions = True
+		settings.flags.ignore_mandatory = True
+		settings.save()
+		return
+
+	missing = {
+		df.fieldname: df.default
+		for df in frappe.get_meta("Google Chat Settings").fields
+		if df.default is not None and df.fieldname not in stored
+	}
+	if missing:
+		from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+			_settings_cache,
+		)
+
+		frappe.db.set_single_value("Google Chat Settings", missing)
+		_settings_cache.invalidate()
+
+
 def create_notification_custom_fields():
-	"""Create custom field for Google Chat Webhook in Notification DocType."""
+	"""Create the Google Chat fields in Notification DocType (also run after migrate)."""
 	custom_fields = {
 		"Notification": [
 			{
@@ -31,7 +60,7 @@ def create_notification_custom_fields():
 				"default": "Webhook",
 				"insert_after": "channel",
 				"depends_on": 'eval:doc.channel=="Google Chat"',
-				"description": "Choose how to send the notification"
+				"description": "Choose how to send the notification",
 			},
 			{
 				"fieldname": "google_chat_webhook",
@@ -41,8 +70,27 @@ def create_notification_custom_fields():
 				"insert_after": "google_chat_type",
 				"depends_on": 'eval:doc.channel=="Google Chat" && doc.google_chat_type=="Webhook"',
 				"description": "Select the Google Chat Webhook to send notifications to",
-				"mandatory_depends_on": 'eval:doc.channel=="Google Chat" && doc.google_chat_type=="Webhook"'
-			}
+				"mandatory_depends_on": 'eval:doc.channel=="Google Chat" && doc.google_chat_type=="Webhook" && !(doc.google_chat_webhooks || []).length',
+			},
+			{
+				"fieldname": "google_chat_webhooks",
+				"label": "More Google Chat Webhooks",
+				"fieldtype": "Table",
+				"options": "Google Chat Notification Webhook",
+				"insert_after": "google_chat_webhook",
+				"depends_on": 'eval:doc.channel=="Google Chat" && doc.google_chat_type=="Webhook"',
+				"description": "The message is rendered once and sent to all of these webhooks at the same time",
+			},
+			{
+				"fieldname": "google_chat_message_mode",
+				"label": "Google Chat Message Mode",
+				"fieldtype": "Select",
+				"options": "New Message\nReply in Thread\nUpdate Message",
+				"default": "New Message",
+				"insert_after": "google_chat_webhooks",
+				"depends_on": 'eval:doc.channel=="Google Chat"',
+				"description": "For documents notified repeatedly: keep all messages about a document in one thread, or update the Chatbot's message in place. Webhooks cannot edit their messages, they reply in the thread instead",
+			},
 		]
 	}
 	create_custom_fields(custom_fields, update=True)
@@ -53,48 +101,36 @@ def create_notification_property_setters():
 	# Hide Recipients section and table for Google Chat
 	# Current depends_on: eval:doc.channel !="Slack"
 	# New depends_on: eval:doc.channel !="Slack" && doc.channel !="Google Chat"
-	
+
 	make_property_setter(
 		"Notification",
 		"column_break_5",
 		"depends_on",
 		'eval:doc.channel !="Slack" && doc.channel !="Google Chat"',
-		"Data"
+		"Data",
 	)
-	
+
 	make_property_setter(
 		"Notification",
 		"recipients",
 		"mandatory_depends_on",
 		'eval:doc.channel!=="Slack" && doc.channel!=="Google Chat" && !doc.send_to_all_assignees',
-		"Data"
+		"Data",
 	)
-	
+
 	# Hide attachment section for Google Chat (webhooks don't support file attachments)
 	make_property_setter(
-		"Notification",
-		"column_break_25",
-		"depends_on",
-		'eval:doc.channel!=="Google Chat"',
-		"Data"
+		"Notification", "column_break_25", "depends_on", 'eval:doc.channel!=="Google Chat"', "Data"
 	)
-	
+
 	# Hide attach_print field for Google Chat
 	make_property_setter(
-		"Notification",
-		"attach_print",
-		"depends_on",
-		'eval:doc.channel!=="Google Chat"',
-		"Data"
+		"Notification", "attach_print", "depends_on", 'eval:doc.channel!=="Google Chat"', "Data"
 	)
-	
+
 	# Hide attach_files field for Google Chat
 	make_property_setter(
-		"Notification",
-		"attach_files",
-		"depends_on",
-		'eval:doc.channel!=="Google Chat"',
-		"Data"
+		"Notification", "attach_files", "depends_on", 'eval:doc.channel!=="Google Chat"', "Data"
 	)
 
 
@@ -104,11 +140,11 @@ def update_notification_channel_options():
 		# Get current options
 		meta = frappe.get_meta("Notification")
 		channel_field = meta.get_field("channel")
-		
+
 		if channel_field:
 			current_options = channel_field.options or ""
 			options_list = [opt.strip() for opt in current_options.split("\n") if opt.strip()]
-			
+
 			# Add Google Chat if not already present
 			if "Google Chat" not in options_list:
 				# Insert after Slack
@@ -117,28 +153,22 @@ def update_notification_channel_options():
 					options_list.insert(slack_index + 1, "Google Chat")
 				else:
 					options_list.append("Google Chat")
-				
+
 				new_options = "\n".join(options_list)
-				
+
 				# Use Property Setter to update the options
-				make_property_setter(
-					"Notification",
-					"channel",
-					"options",
-					new_options,
-					"Text"
-				)
-				
+				make_property_setter("Notification", "channel", "options", new_options, "Text")
+
 				frappe.clear_cache(doctype="Notification")
 	except Exception as e:
-		frappe.log_error(f"Error updating Notification channel options: {str(e)}")
+		frappe.log_error(f"Error updating Notification channel options: {e!s}")
 
 
 def setup_notification_extension():
 	"""Set up the notification extension to enable Google Chat functionality."""
 	try:
 		from gchat_integration.gchat_integration.notification_extension import extend_notification
+
 		extend_notification()
 	except Exception as e:
-		frappe.log_error(f"Error setting up notification extension: {str(e)}")
-
+		frappe.log_error(f"Error setting up notification extension: {e!s}")
@@ -9,12 +9,19 @@ This module monkey patches the Notification class to add Google Chat functionali
 import frappe
 from frappe import _
 
+# Markers of Jinja syntax, messages without any of them are sent as they are
+TEMPLATE_MARKERS = ("{{", "{%", "{#")
+
+# Compiled message templates per Notification: (site, name) -> (modified, code)
+_template_cache = {}
+
 
 def extend_notification():
 	"""Extend the Notification DocType with Google Chat functionality."""
 	from frappe.email.doctype.notification.notification import Notification
-	from gchat_integration.gchat_integration.doctype.google_chat_webhook.google_chat_webhook import (
-		send_google_chat_message,
+
+	from gchat_integration.gchat_integration.doctype.google_chat_outbox.google_chat_outbox import (
+		enqueue_message,
 	)
 
 	# Store original method
@@ -27,7 +34,7 @@ def extend_notification():
 			if self.channel == "Google Chat":
 				frappe.logger().info(f"Processing Google Chat notification for: {self.name}")
 				self.send_a_google_chat_msg(doc, context)
-				
+
 				# Additionally, if explicitly enabled, create a system notification
 				if self.send_system_notification:
 					self.create_system_notification(doc, context)
@@ -35,10 +42,10 @@ def extend_notification():
 				# Call original method for other channels
 				original_send_notification_by_channel(self, doc, context)
 		except Exception as e:
-			frappe.log_error(f"Failed to send Notification: {str(e)}")
+			frappe.log_error(f"Failed to send Notification: {e!s}")
 
 	def send_a_google_chat_msg(self, doc, context):
-		"""Send a message to Google Chat."""
+		"""Queue a message to Google Chat, delivered in the background after commit."""
 		from frappe.email.doctype.notification.notification import (
 			get_reference_doctype,
 			get_reference_name,
@@ -47,44 +54,114 @@ def extend_notification():
 
 		# Check Google Chat Type
 		if self.google_chat_type == "Chatbot":
-			from gchat_integration.gchat_integration.api import send_google_chat_bot_message
-			
 			space_id = self.google_chat_space
 			if not space_id:
-				frappe.log_error(f"No Space ID configured for notification: {self.name}", "Google Chat Integration")
+				frappe.log_error(
+					f"No Space ID configured for notification: {self.name}", "Google Chat Integration"
+				)
 				return
 
-			message = frappe.render_template(self.message, context)
-			
-			send_google_chat_bot_message(
-				space_id=space_id,
+			message = render_message(self, context)
+
+			enqueue_message(
 				message=message,
 				reference_doctype=get_reference_doctype(doc),
 				reference_name=get_reference_name(doc),
+				space=space_id,
+				notification=self.name,
+				message_mode=self.get("google_chat_message_mode"),
 			)
 			return
 
-		webhook = self.google_chat_webhook
-		frappe.logger().info(f"Sending Google Chat message using webhook: {webhook}")
-		
-		if not webhook:
-			frappe.log_error(f"No webhook configured for notification: {self.name}", "Google Chat Integration")
+		webhooks = get_target_webhooks(self)
+		frappe.logger().info(f"Queueing Google Chat message for webhooks: {', '.join(webhooks)}")
+
+		if not webhooks:
+			frappe.log_error(
+				f"No webhook configured for notification: {self.name}", "Google Chat Integration"
+			)
 			return
 
-		# Prepare message
-		message = frappe.render_template(self.message, context)
+		# Prepare message once, the outbox sends it to all webhooks concurrently
+		message = render_message(self, context)
 
-		send_google_chat_message(
-			webhook_url=webhook,
-			message=message,
-			reference_doctype=get_reference_doctype(doc),
-			reference_name=get_reference_name(doc),
-		)
+		for webhook in webhooks:
+			enqueue_message(
+				message=message,
+				reference_doctype=get_reference_doctype(doc),
+				reference_name=get_reference_name(doc),
+				webhook=webhook,
+				notification=self.name,
+				message_mode=self.get("google_chat_message_mode"),
+			)
 
 	# Monkey patch the methods
 	Notification.send_notification_by_channel = send_notification_by_channel_extended
 	Notification.send_a_google_chat_msg = send_a_google_chat_msg
 
+	# Decide Google Chat Notifications from the precomputed index,
+	# Document.run_notifications looks evaluate_alert up on every call
+	from frappe.email.doctype.notification import notification as notification_module
+
+	if not getattr(notification_module.evaluate_alert, "gchat_indexed", False):
+		notification_module.evaluate_alert = _make_indexed_evaluate_alert(notification_module.evaluate_alert)
+
+
+def _make_indexed_evaluate_alert(original):
+	from gchat_integration.gchat_integration.notification_index import evaluate_alert
+
+	def evaluate_alert_indexed(doc, alert, event):
+		return evaluate_alert(original, doc, alert, event)
+
+	evaluate_alert_indexed.gchat_indexed = True
+	return evaluate_alert_indexed
+
+
+def get_target_webhooks(notification):
+	"""Return the webhooks of a Notification: its Google Chat Webhook and the ones in its table."""
+	webhooks = [notification.get("google_chat_webhook")]
+	webhooks += [row.webhook for row in notification.get("google_chat_webhooks") or ()]
+	return list(dict.fromkeys(webhook for webhook in webhooks if webhook))
+
+
+def render_message(notification, context):
+	"""Render a Notification's message, compiling its template once per modification.
+
+	Compiled code is cached rather than the template object, because the Jinja
+	environment (with the session's globals) is created per request.
+	"""
+	message = notification.message
+	if not message or not any(marker in message for marker in TEMPLATE_MARKERS):
+		return message or ""
+
+	from frappe.utils.jinja import get_jenv
+	from jinja2 import TemplateError
+
+	jenv = get_jenv()
+	# A worker can serve several sites, whose Notifications may share names
+	key = (frappe.local.site, notification.name)
+	cached = _template_cache.get(key)
+	try:
+		if cached and cached[0] == notification.modified:
+			code = cached[1]
+		else:
+			if ".__" in message:
+				# Let frappe.render_template reject it as usual
+				raise TemplateError("Illegal template")
+			code = jenv.compile(message)
+			_template_cache[key] = (notification.modified, code)
+
+		template = jenv.template_class.from_code(jenv, code, jenv.make_globals(None))
+		return template.render(context)
+	except TemplateError:
+		# Report errors exactly like an uncached render
+		return frappe.render_template(message, context)
+
+
+def clear_template_cache(doc, method=None):
+	"""Drop the compiled message template of a Notification (doc_events hook)."""
+	_template_cache.pop((frappe.local.site, doc.name), None)
+
 
 def get_notification_context():
 	"""Hook to be called on app startup to extend Notification."""
@@ -0,0 +1,141 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Precomputed index of enabled Google Chat Notifications per DocType and event.
+
+For every document event Frappe calls `evaluate_alert` once per matching Notification,
+which loads the Notification from the database and compiles its condition before it
+knows whether anything is sent. For Google Chat Notifications the index answers from
+memory instead: conditions are compiled once per process, and the Notification is only
+loaded (once, then kept) when its condition holds. Other Notifications go through
+Frappe unchanged.
+
+The index is built per DocType with a single query, shared through Redis, and dropped
+in all workers when any Notification is saved or deleted.
+"""
+
+import unicodedata
+from dataclasses import dataclass
+
+import frappe
+
+from gchat_integration.gchat_integration.shared_cache import SharedCache
+
+# condition -> compiled code, None if it must go through frappe.safe_eval
+_conditions = {}
+# (site, Notification name) -> (modified, Notification without its condition)
+_documents = {}
+_eval_globals = None
+
+
+@dataclass(frozen=True)
+class IndexedNotification:
+	"""An enabled Google Chat Notification, as needed to decide whether it fires."""
+
+	name: str
+	event: str
+	condition: str | None
+	modified: str
+
+
+def _load_index(document_type):
+	"""Return `{event: {name: IndexedNotification}}` for a DocType, empty if it has none."""
+	index = {}
+	for row in frappe.get_all(
+		"Notification",
+		filters={"enabled": 1, "channel": "Google Chat", "document_type": document_type},
+		fields=["name", "event", "condition", "modified"],
+	):
+		index.setdefault(row.event, {})[row.name] = IndexedNotification(
+			name=row.name,
+			event=row.event,
+			condition=(row.condition or "").strip() or None,
+			modified=str(row.modified),
+		)
+	return index
+
+
+_index_cache = SharedCache("gchat_notification_index", _load_index)
+
+
+def get_notifications(document_type, event):
+	"""Return `{name: IndexedNotification}` of the Google Chat Notifications for an event."""
+	return _index_cache.get(document_type).get(event) or {}
+
+
+def clear_notification_index(doc, method=None):
+	"""Drop the index in all workers once the change commits (doc_events hook)."""
+	_index_cache.invalidate()
+
+
+def evaluate_alert(original, doc, alert, event):
+	"""`evaluate_alert` answering Google Chat Notifications from the index.
+
+	Args:
+		original: Frappe's `evaluate_alert`
+		doc: Document the event happened on
+		alert: Notification name, or document (for scheduled alerts)
+		event: Notification event, e.g. "New" or "Value Change"
+	"""
+	entry = isinstance(alert, str) and get_notifications(doc.doctype, event).get(alert)
+	if not entry:
+		return original(doc, alert, event)
+
+	if entry.condition:
+		from frappe.email.doctype.notification.notification import get_context
+
+		try:
+			if not evaluate_condition(entry.condition, get_context(doc)):
+				return
+		except Exception:
+			# Let Frappe evaluate it again and report the error as usual
+			return original(doc, alert, event)
+
+	return original(doc, get_notification(entry), event)
+
+
+def evaluate_condition(condition, context):
+	"""Evaluate a Notification condition like `frappe.safe_eval`, compiling it only once."""
+	if condition not in _conditions:
+		_conditions[condition] = _compile_condition(condition)
+
+	code = _conditions[condition]
+	if code is None:
+		return frappe.safe_eval(condition, None, context)
+	return eval(code, _get_eval_globals(), context)
+
+
+def _compile_condition(condition):
+	"""Compile a condition the way `frappe.safe_eval` does, or return None where that is not possible."""
+	try:
+		from frappe.utils.safe_exec import FrappeTransformer, _validate_safe_eval_syntax
+		from RestrictedPython import compile_restricted
+	except ImportError:
+		return None
+
+	code = unicodedata.normalize("NFKC", condition)
+	_validate_safe_eval_syntax(code)
+	return compile_restricted(code, filename="<safe_eval>", mode="eval", policy=FrappeTransformer)
+
+
+def _get_eval_globals():
+	global _eval_globals
+	if _eval_globals is None:
+		from frappe.utils.safe_exec import WHITELISTED_SAFE_EVAL_GLOBALS
+
+		_eval_globals = {"__builtins__": {}, **WHITELISTED_SAFE_EVAL_GLOBALS}
+	return _eval_globals
+
+
+def get_notification(entry):
+	"""Return the Notification of an index entry, with its condition removed since it already held."""
+	key = (frappe.local.site, entry.name)
+	cached = _documents.get(key)
+	if cached and cached[0] == entry.modified:
+		return cached[1]
+
+	notification = frappe.get_doc("Notification", entry.name)
+	notification.condition = None
+	_documents[key] = (entry.modified, notification)
+	return notification
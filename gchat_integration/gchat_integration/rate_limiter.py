@@ -0,0 +1,136 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Cluster-wide token bucket rate limiter for Google Chat spaces.
+
+Google Chat enforces write quotas per space. Buckets live in the bench's Redis, so
+every web and background worker draws from the same budget. A sender reserves a
+token and then waits until its reservation is due. If the wait would be longer than
+the configured maximum, `RateLimitExceeded` is raised so that the caller can requeue.
+"""
+
+import re
+import time
+from hashlib import sha1
+
+import frappe
+
+DEFAULT_RATE_LIMIT = 60  # messages per minute, Google Chat's per-space write quota
+DEFAULT_BURST = 10
+DEFAULT_MAX_WAIT = 5.0  # seconds
+
+SPACE_PATTERN = re.compile(r"/spaces/([^/?#]+)")
+
+# Refill the bucket from elapsed Redis server time and reserve one token, going into
+# debt if needed. Returns the milliseconds until the reservation is due, or -1 (with
+# nothing reserved) if that would be longer than the allowed wait.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens < 1 then
+	wait = math.ceil((1 - tokens) / rate)
+end
+if wait > max_wait then
+	return -1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate) + wait + 1000)
+return wait
+"""
+
+_script = None
+
+
+class RateLimitExceeded(Exception):
+	"""Raised when a token could not be reserved within the allowed wait."""
+
+	def __init__(self, key, retry_after):
+		self.key = key
+		self.retry_after = retry_after
+		super().__init__(f"Rate limit for {key} exceeded, retry after {retry_after:.1f}s")
+
+
+def get_bucket_key(url_or_space):
+	"""Return the bucket for a webhook URL or Space ID.
+
+	Webhook URLs contain the space (`.../v1/spaces/AAAA/messages?...`), so several webhooks
+	posting to the same space share one bucket.
+	"""
+	if match := SPACE_PATTERN.search(url_or_space):
+		return match.group(1)
+	if url_or_space.startswith("spaces/"):
+		return url_or_space.split("/", 1)[1]
+	return sha1(url_or_space.encode()).hexdigest()
+
+
+def acquire(url_or_space, rate_limit=None):
+	"""Wait for a send slot for the space behind `url_or_space`.
+
+	Args:
+		url_or_space: Webhook URL or Space ID
+		rate_limit: Messages per minute, defaults to Google Chat Settings
+
+	Raises:
+		RateLimitExceeded: if the slot is further away than the configured maximum wait
+	"""
+	wait = reserve(url_or_space, rate_limit)
+	if wait:
+		time.sleep(wait)
+
+
+def reserve(url_or_space, rate_limit=None, burst=None, max_wait=None):
+	"""Reserve a send slot without waiting.
+
+	Returns:
+		Seconds until the reserved slot is due, 0 if it can be used right away
+	"""
+	settings = _get_limits()
+	rate_limit = rate_limit or settings["rate_limit"]
+	burst = burst or settings["burst"]
+	max_wait = settings["max_wait"] if max_wait is None else max_wait
+
+	key = get_bucket_key(url_or_space)
+	wait_ms = _get_script()(
+		keys=[frappe.cache().make_key(f"gchat_rate_limit:{key}")],
+		args=[rate_limit / 60000, burst, int(max_wait * 1000)],
+	)
+
+	if wait_ms < 0:
+		# Time for one token to refill is the earliest a retry can succeed
+		raise RateLimitExceeded(key, max(max_wait, 60 / rate_limit))
+
+	return wait_ms / 1000
+
+
+def _get_script():
+	global _script
+	if _script is None:
+		_script = frappe.cache().register_script(TOKEN_BUCKET_SCRIPT)
+	return _script
+
+
+def _get_limits():
+	from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+		get_settings_snapshot,
+	)
+
+	settings = get_settings_snapshot()
+	max_wait = settings.max_rate_limit_wait
+	return {
+		"rate_limit": settings.default_rate_limit or DEFAULT_RATE_LIMIT,
+		"burst": settings.rate_limit_burst or DEFAULT_BURST,
+		"max_wait": DEFAULT_MAX_WAIT if max_wait is None else max_wait,
+	}
@@ -0,0 +1,83 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Retry policy for Google Chat deliveries.
+
+Rate limiting (429), server errors (5xx), timeouts and connection failures are retried
+with exponential backoff and jitter, honouring `Retry-After`. Client errors such as a
+malformed payload (400), a revoked webhook (403) or a deleted space (404) will not
+succeed on a second attempt and are not retried.
+"""
+
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF = 2.0  # seconds before the first retry
+DEFAULT_MAX_BACKOFF = 300.0
+
+# Besides these, every 5xx is retried
+RETRYABLE_STATUS_CODES = frozenset({408, 429})
+
+
+class DeliveryError(Exception):
+	"""A failed delivery to Google Chat, classified for retrying."""
+
+	def __init__(self, message, status_code=None, retryable=False, retry_after=None):
+		self.status_code = status_code
+		self.retryable = retryable
+		self.retry_after = retry_after
+		super().__init__(message)
+
+	@classmethod
+	def from_response(cls, response, message=None):
+		return cls(
+			message or f"{response.status_code}: {response.text}",
+			status_code=response.status_code,
+			retryable=is_retryable_status(response.status_code),
+			retry_after=parse_retry_after(response.headers.get("Retry-After")),
+		)
+
+	@classmethod
+	def from_exception(cls, exc):
+		# Timeouts (including the total deadline) and dropped connections are transient
+		return cls(str(exc) or type(exc).__name__, retryable=isinstance(exc, requests.RequestException))
+
+
+def is_retryable_status(status_code):
+	return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+
+
+def parse_retry_after(value):
+	"""Parse a `Retry-After` header (delta seconds or HTTP date) into seconds."""
+	if not value:
+		return None
+
+	try:
+		return max(float(value), 0)
+	except ValueError:
+		pass
+
+	try:
+		retry_at = parsedate_to_datetime(value)
+	except (TypeError, ValueError):
+		return None
+
+	if not retry_at.tzinfo:
+		retry_at = retry_at.replace(tzinfo=timezone.utc)
+	return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+def get_retry_delay(attempt, retry_after=None, backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF):
+	"""Return seconds to wait before retry number `attempt` (1 for the first retry).
+
+	Half of the exponential delay is fixed and half is random, so senders that failed
+	together do not retry in lockstep. The server's `Retry-After` is a lower bound.
+	"""
+	delay = min(max_backoff, backoff * 2 ** (attempt - 1))
+	delay = delay / 2 + random.uniform(0, delay / 2)
+	return max(delay, retry_after or 0)
@@ -0,0 +1,99 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Two-tier cache for configuration read on every send.
+
+Values live in a process-local dict backed by a Redis hash. A version number in Redis
+ties the two together: invalidating bumps the version, which every worker notices on
+its next (throttled) check and drops its local copy. Redis entries are stored under
+the version they were loaded for, so a value read just before an invalidation can
+never be cached as current.
+"""
+
+import time
+
+import frappe
+
+# Seconds a worker trusts its local copy before checking the version again
+DEFAULT_CHECK_INTERVAL = 1.0
+# Entries of superseded versions are left to expire
+REDIS_TTL = 24 * 60 * 60
+
+
+class _SiteEntries:
+	__slots__ = ("checked_at", "entries", "version")
+
+	def __init__(self, version):
+		self.version = version
+		self.entries = {}
+		self.checked_at = time.monotonic()
+
+
+class SharedCache:
+	"""Process-local dict in front of Redis, invalidated across all workers.
+
+	Args:
+		namespace: Redis key prefix
+		loader: Function returning the value for a key from the database, or None
+		check_interval: Seconds between version checks against Redis
+	"""
+
+	def __init__(self, namespace, loader, check_interval=DEFAULT_CHECK_INTERVAL):
+		self.namespace = namespace
+		self.loader = loader
+		self.check_interval = check_interval
+		# A worker process can serve several sites
+		self._sites = {}
+
+	def get(self, key):
+		site = self._get_site_entries()
+		try:
+			return site.entries[key]
+		except KeyError:
+			pass
+
+		cache = frappe.cache()
+		redis_key = f"{self.namespace}:{site.version}"
+		value = cache.hget(redis_key, key)
+		if value is None:
+			value = self.loader(key)
+			if value is not None:
+				cache.hset(redis_key, key, value)
+				cache.expire(cache.make_key(redis_key), REDIS_TTL)
+
+		site.entries[key] = value
+		return value
+
+	def invalidate(self):
+		"""Invalidate all entries in every worker, once the current transaction commits.
+
+		Invalidating earlier would let another worker reload the old, still committed
+		value under the new version.
+		"""
+		frappe.db.after_commit.add(self.invalidate_now)
+
+	def invalidate_now(self):
+		cache = frappe.cache()
+		old_version = self._get_version()
+		cache.incr(cache.make_key(f"{self.namespace}:version"))
+		cache.delete_key(f"{self.namespace}:{old_version}")
+		self._sites.pop(frappe.local.site, None)
+
+	def _get_site_entries(self):
+		site = self._sites.get(frappe.local.site)
+		if site and time.monotonic() - site.checked_at < self.check_interval:
+			return site
+
+		version = self._get_version()
+		if site and site.version == version:
+			site.checked_at = time.monotonic()
+			return site
+
+		site = self._sites[frappe.local.site] = _SiteEntries(version)
+		return site
+
+	def _get_version(self):
+		cache = frappe.cache()
+		version = cache.get(cache.make_key(f"{self.namespace}:version"))
+		return int(version) if version else 0
@@ -0,0 +1,44 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import jwt
+from frappe.tests import IntegrationTestCase
+
+from gchat_integration.gchat_integration import auth
+from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+	_settings_cache,
+)
+from gchat_integration.gchat_integration.testing.mock_chat_server import MockChatServer
+
+
+class IntegrationTestAuth(IntegrationTestCase):
+	def setUp(self):
+		self.server = MockChatServer().start()
+		self.key = self.server.configure_settings()
+
+	def tearDown(self):
+		self.server.stop()
+		auth._tokens.clear()
+		_settings_cache.invalidate_now()
+
+	def test_token_is_cached(self):
+		token = auth.get_access_token()
+		self.assertEqual(auth.get_access_token(), token)
+
+		# Another worker finds the token in Redis
+		auth._tokens.clear()
+		self.assertEqual(auth.get_access_token(), token)
+		self.assertEqual(len(self.server.requests), 1)
+
+		assertion = self.server.requests[0].body["assertion"]
+		claims = jwt.decode(
+			assertion, self.key.public_key(), algorithms=["RS256"], audience=self.server.token_uri
+		)
+		self.assertEqual(claims["iss"], "bot@test.iam.gserviceaccount.com")
+		self.assertEqual(claims["scope"], auth.CHAT_BOT_SCOPE)
+
+	def test_token_endpoint_failure_is_retryable(self):
+		self.server.fail_next(1, 503)
+		with self.assertRaises(auth.DeliveryError) as error:
+			auth.get_access_token()
+		self.assertTrue(error.exception.retryable)
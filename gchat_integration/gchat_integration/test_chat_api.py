@@ -0,0 +1,125 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import time
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from gchat_integration.gchat_integration import auth
+from gchat_integration.gchat_integration.chat_api import (
+	REPLY_IN_THREAD,
+	create_message,
+	create_messages,
+	update_message,
+)
+from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+	_settings_cache,
+)
+from gchat_integration.gchat_integration.retry import DeliveryError
+from gchat_integration.gchat_integration.testing.mock_chat_server import MockChatServer
+
+
+class IntegrationTestChatAPI(IntegrationTestCase):
+	def setUp(self):
+		self.server = MockChatServer().start()
+		self.server.configure_settings()
+		# Injected errors are meant for the Chat API, not the token endpoint
+		auth.get_access_token()
+
+		# A fresh rate limit bucket per test
+		self.space = f"_TEST{frappe.generate_hash(length=8)}"
+
+	def tearDown(self):
+		self.server.stop()
+		auth._tokens.clear()
+		_settings_cache.invalidate_now()
+
+	def get_message_requests(self):
+		return [r for r in self.server.requests if r.path.startswith("/v1/")]
+
+	def test_create_message(self):
+		message = create_message(self.space, {"text": "Hello"})
+
+		self.assertEqual(message["text"], "Hello")
+		self.assertTrue(message["name"].startswith(f"spaces/{self.space}/messages/"))
+		(request,) = self.get_message_requests()
+		self.assertEqual(request.path, f"/v1/spaces/{self.space}/messages")
+		self.assertEqual(request.query, {})
+		self.assertTrue(request.headers["Authorization"].startswith("Bearer mock-token-"))
+
+	def test_create_message_in_thread(self):
+		first = create_message(f"spaces/{self.space}", {"text": "First"}, thread_key="doc-1")
+		second = create_message(self.space, {"text": "Second", "thread": first["thread"]})
+		third = create_message(
+			self.space, {"text": "Third"}, thread_key="doc-1", reply_option="REPLY_MESSAGE_OR_FAIL"
+		)
+
+		self.assertEqual(first["thread"]["name"], f"spaces/{self.space}/threads/doc-1")
+		self.assertEqual(second["thread"], first["thread"])
+		self.assertEqual(third["thread"], first["thread"])
+
+		requests = self.get_message_requests()
+		self.assertEqual(requests[0].query, {"threadKey": "doc-1", "messageReplyOption": REPLY_IN_THREAD})
+		# A thread in the body needs no key, only the reply option
+		self.assertEqual(requests[1].query, {"messageReplyOption": REPLY_IN_THREAD})
+		self.assertEqual(
+			requests[2].query, {"threadKey": "doc-1", "messageReplyOption": "REPLY_MESSAGE_OR_FAIL"}
+		)
+
+	def test_update_message(self):
+		message = create_message(self.space, {"text": "Open"})
+
+		updated = update_message(message["name"], {"text": "Closed"})
+		self.assertEqual(updated["text"], "Closed")
+		update_message(message["name"], {"text": "Reopened"}, update_mask="text")
+
+		patches = [r for r in self.get_message_requests() if r.method == "PATCH"]
+		self.assertEqual([r.path for r in patches], [f"/v1/{message['name']}"] * 2)
+		self.assertEqual([r.query for r in patches], [{"updateMask": "text,cardsV2"}, {"updateMask": "text"}])
+		self.assertEqual(self.server.messages[message["name"]]["text"], "Reopened")
+
+	def test_errors_raise_delivery_error(self):
+		self.server.fail_next(1, 400)
+		with self.assertRaises(DeliveryError) as error:
+			create_message(self.space, {"text": "Bad request"})
+		self.assertEqual(error.exception.status_code, 400)
+		self.assertFalse(error.exception.retryable)
+
+		self.server.fail_next(1, 503)
+		with self.assertRaises(DeliveryError) as error:
+			create_message(self.space, {"text": "Unavailable"})
+		self.assertEqual(error.exception.status_code, 503)
+		self.assertTrue(error.exception.retryable)
+
+		# Deleted in Google Chat
+		with self.assertRaises(DeliveryError) as error:
+			update_message(f"spaces/{self.space}/messages/missing", {"text": "Gone"})
+		self.assertEqual(error.exception.status_code, 404)
+		self.assertFalse(error.exception.retryable)
+
+	def test_create_messages_in_several_spaces_concurrently(self):
+		spaces = [f"{self.space}{i}" for i in range(3)]
+		self.server.latency = 0.2
+
+		started = time.monotonic()
+		results = create_messages(
+			[(space, [{"text": "First"}, {"text": "Second"}]) for space in spaces], thread_key="parts"
+		)
+		elapsed = time.monotonic() - started
+
+		self.assertEqual([error for error, _latency in results], [None] * 3)
+		# Spaces in parallel, the parts of each one after another
+		self.assertLess(elapsed, 3 * 2 * 0.2)
+		for space in spaces:
+			requests = [r for r in self.get_message_requests() if r.path == f"/v1/spaces/{space}/messages"]
+			self.assertEqual([r.text for r in requests], ["First", "Second"])
+			self.assertEqual({r.query["threadKey"] for r in requests}, {"parts"})
+
+	def test_create_messages_reports_failures_per_space(self):
+		self.server.fail_next(1, 400)
+		((error, _latency),) = create_messages([(self.space, [{"text": "First"}, {"text": "Second"}])])
+
+		self.assertEqual(error.status_code, 400)
+		# Later parts are not sent
+		self.assertEqual(len(self.get_message_requests()), 1)
@@ -0,0 +1,24 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+from frappe.tests import UnitTestCase
+
+from gchat_integration.gchat_integration.commands import parse_command
+
+
+class UnitTestCommands(UnitTestCase):
+	def test_parse_slash_command(self):
+		message = {
+			"text": "/Status SO-0001",
+			"argumentText": " SO-0001",
+			"annotations": [{"type": "SLASH_COMMAND", "slashCommand": {"commandName": "/Status"}}],
+		}
+		self.assertEqual(parse_command(message), ("/status", "SO-0001"))
+
+	def test_parse_keyword(self):
+		self.assertEqual(
+			parse_command({"text": "@Bot stock  ITEM-1", "argumentText": " stock  ITEM-1"}),
+			("stock", "ITEM-1"),
+		)
+		self.assertEqual(parse_command({"text": "help"}), ("help", ""))
+		self.assertEqual(parse_command({}), ("", ""))
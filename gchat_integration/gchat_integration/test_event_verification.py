@@ -0,0 +1,103 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import datetime
+import time
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from frappe.tests import UnitTestCase
+
+from gchat_integration.gchat_integration import event_verification
+from gchat_integration.gchat_integration.event_verification import (
+	CHAT_ISSUER,
+	InvalidEvent,
+	verify_event_token,
+)
+from gchat_integration.gchat_integration.testing.mock_chat_server import MockChatServer
+
+PROJECT_NUMBER = "123456789012"
+
+
+def make_certificate(key):
+	name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, CHAT_ISSUER)])
+	now = datetime.datetime.now(datetime.timezone.utc)
+	certificate = (
+		x509.CertificateBuilder()
+		.subject_name(name)
+		.issuer_name(name)
+		.public_key(key.public_key())
+		.serial_number(x509.random_serial_number())
+		.not_valid_before(now)
+		.not_valid_after(now + datetime.timedelta(days=1))
+		.sign(key, hashes.SHA256())
+	)
+	return certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class UnitTestEventVerification(UnitTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+	def setUp(self):
+		self.server = MockChatServer().start()
+		self.server.certificates = {"chat-key": make_certificate(self.key)}
+		self.addCleanup(self.server.stop)
+
+		certs_url = event_verification.CHAT_CERTS_URL
+		event_verification.CHAT_CERTS_URL = self.server.certs_url
+		event_verification._keys = (0, 0, {})
+
+		def restore():
+			event_verification.CHAT_CERTS_URL = certs_url
+			event_verification._keys = (0, 0, {})
+
+		self.addCleanup(restore)
+
+	def get_authorization(self, key=None, key_id="chat-key", **claims):
+		now = int(time.time())
+		payload = {"iss": CHAT_ISSUER, "aud": PROJECT_NUMBER, "iat": now, "exp": now + 3600} | claims
+		token = jwt.encode(payload, key or self.key, algorithm="RS256", headers={"kid": key_id})
+		return f"Bearer {token}"
+
+	def test_valid_token(self):
+		verify_event_token(self.get_authorization(), PROJECT_NUMBER)
+		verify_event_token(self.get_authorization(), PROJECT_NUMBER)
+
+		# Certificates are fetched once
+		self.assertEqual(len(self.server.requests), 1)
+
+	def test_invalid_tokens_are_rejected(self):
+		other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+		invalid = {
+			"missing": None,
+			"not bearer": self.get_authorization().replace("Bearer", "Basic"),
+			"malformed": "Bearer not-a-jwt",
+			"other project": self.get_authorization(aud="999"),
+			"other issuer": self.get_authorization(iss="someone@example.com"),
+			"expired": self.get_authorization(iat=int(time.time()) - 7200, exp=int(time.time()) - 3600),
+			"forged": self.get_authorization(key=other_key),
+		}
+		for case, authorization in invalid.items():
+			with self.subTest(case), self.assertRaises(InvalidEvent):
+				verify_event_token(authorization, PROJECT_NUMBER)
+
+	def test_unknown_key_refetches_once(self):
+		verify_event_token(self.get_authorization(), PROJECT_NUMBER)
+
+		# Rotated in by Google after the last fetch
+		rotated_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+		self.server.certificates["rotated-key"] = make_certificate(rotated_key)
+		with self.assertRaises(InvalidEvent):
+			# Not refetched within MIN_REFETCH_INTERVAL
+			verify_event_token(self.get_authorization(rotated_key, "rotated-key"), PROJECT_NUMBER)
+
+		fetched_at, expires_at, keys = event_verification._keys
+		event_verification._keys = (fetched_at - event_verification.MIN_REFETCH_INTERVAL, expires_at, keys)
+		verify_event_token(self.get_authorization(rotated_key, "rotated-key"), PROJECT_NUMBER)
+		self.assertEqual(len(self.server.requests), 2)
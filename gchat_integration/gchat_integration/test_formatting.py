@@ -0,0 +1,101 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import random
+import time
+
+from frappe.tests import UnitTestCase
+
+from gchat_integration.gchat_integration.benchmarks import corpus
+from gchat_integration.gchat_integration.benchmarks.reference import (
+	convert_html_to_gchat_text as reference_convert,
+)
+from gchat_integration.gchat_integration.formatting import (
+	BULLET,
+	MARKUP_CHARS,
+	ConversionCache,
+	_convert,
+	_iter_chunks,
+	iter_gchat_lines,
+	iter_message_parts,
+)
+
+FUZZ_CASES = 500
+CHUNK_SIZES = (1, 2, 3, 7, 64, 1000)
+
+# Inputs that make backtracking tokenizers quadratic or worse
+ADVERSARIAL_PATTERNS = ("<", "<b", "<!--", "<li>", "<ul>", "</", "<p class='", "<<>", "<br/")
+
+
+class UnitTestFormatting(UnitTestCase):
+	"""Property tests for the HTML to Google Chat converter."""
+
+	def test_matches_reference_on_documented_tags(self):
+		for seed in range(FUZZ_CASES):
+			html = corpus.documented(random.Random(seed))
+			self.assertEqual(_convert(html), reference_convert(html), html)
+
+	def test_cached_conversion_is_stable(self):
+		cache = ConversionCache(maxsize=8)
+		for messages in corpus.build_corpus().values():
+			for html in messages:
+				expected = _convert(html)
+				self.assertEqual(cache.get_or_convert(html, _convert), expected)
+				self.assertEqual(cache.get_or_convert(html, _convert), expected)
+
+	def test_malformed_input(self):
+		rng = random.Random(0)
+		for _ in range(FUZZ_CASES):
+			html = corpus.malformed(rng, size=200)
+			text = _convert(html)
+			self.assertEqual(text, text.strip())
+			self.assertNotIn("\n\n\n", text)
+
+	def test_streaming_matches_whole_conversion(self):
+		rng = random.Random(0)
+		messages = [html for messages in corpus.build_corpus().values() for html in messages]
+		messages += [corpus.malformed(rng, size=300) for _ in range(FUZZ_CASES)]
+		messages += ["<b>bold<!-- x --></b>", "<br/ <!-- --> -->", "<!-- <!-- -->text", "a < b <i>c</i>"]
+		for html in messages:
+			expected = _convert(html)
+			for chunk_size in CHUNK_SIZES:
+				lines = iter_gchat_lines(_iter_chunks(html, chunk_size))
+				self.assertEqual("\n".join(lines), expected, f"{html!r} in chunks of {chunk_size}")
+
+	def test_message_parts_fit_and_keep_markup_intact(self):
+		rng = random.Random(0)
+		long_line = " ".join(
+			f"<b>{rng.choice(corpus.WORDS)}</b> {rng.choice(corpus.WORDS)}" for _ in range(500)
+		)
+		for html in [corpus.report(rng), f"<p>{long_line}</p>", *corpus.build_corpus()["list_50_rows"]]:
+			for max_length in (200, 1000, 4096):
+				parts = list(iter_message_parts(html, max_length))
+				self.assertEqual(
+					"\n".join(parts).split(), _convert(html).split(), "parts must contain the whole message"
+				)
+				for part in parts:
+					self.assertLessEqual(len(part), max_length)
+					for line in part.split("\n"):
+						for marker in MARKUP_CHARS:
+							self.assertEqual(line.count(marker) % 2, 0, f"{marker} cut in half: {line!r}")
+					self.assertNotEqual(part.strip(), BULLET.strip())
+
+	def test_short_message_is_one_part(self):
+		self.assertEqual(list(iter_message_parts("<b>Hello</b>")), ["*Hello*"])
+		self.assertEqual(list(iter_message_parts("")), [])
+
+	def test_linear_time_on_adversarial_input(self):
+		for pattern in ADVERSARIAL_PATTERNS:
+			small = self._best_time(pattern * 20_000)
+			large = self._best_time(pattern * 80_000)
+			# Linear scaling gives a ratio of 4, quadratic 16
+			self.assertLess(large / max(small, 1e-6), 8, f"{pattern!r} does not scale linearly")
+
+	def _best_time(self, html):
+		best = None
+		for _ in range(3):
+			started = time.perf_counter()
+			_convert(html)
+			elapsed = time.perf_counter() - started
+			best = elapsed if best is None else min(best, elapsed)
+		return best
@@ -0,0 +1,44 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import time
+
+import requests
+from frappe.tests import UnitTestCase
+
+from gchat_integration.gchat_integration.http_client import DeadlineExceeded, get_session, post_json
+from gchat_integration.gchat_integration.testing.mock_chat_server import MockChatServer
+
+
+class UnitTestHTTPClient(UnitTestCase):
+	def test_session_is_reused(self):
+		with MockChatServer() as server:
+			url = server.webhook_url("space")
+			first = post_json(url, {"text": "First"}, timeouts=(1, 5, 5))
+			second = post_json(url, {"text": "Second"}, timeouts=(1, 5, 5))
+
+			self.assertEqual(first.json()["text"], "First")
+			self.assertEqual(second.json()["text"], "Second")
+			self.assertIs(get_session(url), get_session(server.url))
+			# Both requests went over the same kept-alive connection
+			self.assertEqual(server.requests[0].client_address, server.requests[1].client_address)
+
+	def test_deadline_bounds_a_slow_body(self):
+		# The body takes 8s to arrive, each byte well within the read timeout
+		with MockChatServer(trickle=0.5) as server:
+			start = time.monotonic()
+			with self.assertRaises(DeadlineExceeded):
+				post_json(server.webhook_url("space"), {"text": "Slow"}, timeouts=(1, 1, 2))
+			self.assertLess(time.monotonic() - start, 3)
+
+	def test_deadline_bounds_waiting_for_headers(self):
+		with MockChatServer(latency=3) as server:
+			start = time.monotonic()
+			with self.assertRaises(requests.Timeout):
+				post_json(server.webhook_url("space"), {"text": "Slow"}, timeouts=(1, 5, 2))
+			self.assertLess(time.monotonic() - start, 3)
+
+	def test_fast_response_within_deadline(self):
+		with MockChatServer(trickle=0.01) as server:
+			response = post_json(server.webhook_url("space"), {"text": "Quick"}, timeouts=(1, 1, 5))
+			self.assertEqual(response.json()["text"], "Quick")
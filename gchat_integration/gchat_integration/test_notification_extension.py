@@ -0,0 +1,44 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils.jinja import get_jenv
+
+from gchat_integration.gchat_integration.notification_extension import (
+	_template_cache,
+	clear_template_cache,
+	render_message,
+)
+
+
+class IntegrationTestNotificationExtension(IntegrationTestCase):
+	def test_template_is_compiled_once_per_modification(self):
+		notification = frappe._dict(
+			name="_Test Google Chat Render", message="Hello {{ doc.name }}", modified="2026-10-18 12:00:00"
+		)
+		self.addCleanup(clear_template_cache, notification)
+		key = (frappe.local.site, notification.name)
+
+		# Another site's Notification with the same name and timestamp is not used
+		other_key = ("_test_other_site", notification.name)
+		_template_cache[other_key] = (notification.modified, get_jenv().compile("Other site"))
+		self.addCleanup(_template_cache.pop, other_key, None)
+
+		self.assertEqual(render_message(notification, {"doc": frappe._dict(name="A")}), "Hello A")
+		code = _template_cache[key][1]
+		self.assertEqual(render_message(notification, {"doc": frappe._dict(name="B")}), "Hello B")
+		self.assertIs(_template_cache[key][1], code)
+
+		notification.update(message="Bye {{ doc.name }}", modified="2026-10-18 13:00:00")
+		self.assertEqual(render_message(notification, {"doc": frappe._dict(name="A")}), "Bye A")
+		self.assertIsNot(_template_cache[key][1], code)
+
+	def test_saving_the_notification_drops_its_template(self):
+		notification = frappe._dict(
+			name="_Test Google Chat Render", message="{{ 1 + 1 }}", modified="2026-10-18"
+		)
+		self.assertEqual(render_message(notification, {}), "2")
+
+		clear_template_cache(notification)
+		self.assertNotIn((frappe.local.site, notification.name), _template_cache)
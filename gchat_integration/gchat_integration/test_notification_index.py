@@ -0,0 +1,65 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import frappe
+from frappe.email.doctype.notification.notification import get_context
+from frappe.tests import IntegrationTestCase
+
+from gchat_integration.gchat_integration.notification_index import (
+	evaluate_alert,
+	evaluate_condition,
+	get_notifications,
+)
+
+
+class IntegrationTestNotificationIndex(IntegrationTestCase):
+	def setUp(self):
+		webhook = frappe.get_doc(
+			{
+				"doctype": "Google Chat Webhook",
+				"webhook_name": "_Test Index Webhook",
+				"webhook_url": "https://chat.googleapis.com/v1/spaces/INDEX/messages?key=1",
+			}
+		).insert()
+		self.notification = frappe.get_doc(
+			{
+				"doctype": "Notification",
+				"name": "_Test Google Chat Index",
+				"subject": "_Test Google Chat Index",
+				"document_type": "ToDo",
+				"event": "New",
+				"channel": "Google Chat",
+				"google_chat_type": "Webhook",
+				"google_chat_webhook": webhook.name,
+				"condition": "doc.priority == 'High'",
+				"message": "{{ doc.description }}",
+				"enabled": 1,
+			}
+		).insert()
+		frappe.db.after_commit.run()
+
+	def test_index_follows_notification_changes(self):
+		self.assertIn(self.notification.name, get_notifications("ToDo", "New"))
+		self.assertEqual(get_notifications("ToDo", "Cancel"), {})
+		self.assertEqual(get_notifications("Note", "New"), {})
+
+		self.notification.enabled = 0
+		self.notification.save()
+		frappe.db.after_commit.run()
+		self.assertNotIn(self.notification.name, get_notifications("ToDo", "New"))
+
+	def test_condition_is_evaluated_before_loading_the_notification(self):
+		todo = frappe.get_doc({"doctype": "ToDo", "description": "_Test Index", "priority": "Low"})
+		self.assertFalse(evaluate_condition("doc.priority == 'High'", get_context(todo)))
+
+		calls = []
+		evaluate_alert(lambda *args: calls.append(args), todo, self.notification.name, "New")
+		self.assertEqual(calls, [])
+
+		todo.priority = "High"
+		evaluate_alert(lambda *args: calls.append(args), todo, self.notification.name, "New")
+		self.assertEqual(len(calls), 1)
+		_doc, notification, event = calls[0]
+		self.assertEqual(
+			(notification.name, notification.condition, event), (self.notification.name, None, "New")
+		)
@@ -0,0 +1,55 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import time
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from gchat_integration.gchat_integration.rate_limiter import RateLimitExceeded, get_bucket_key, reserve
+
+
+class UnitTestRateLimiter(UnitTestCase):
+	def test_webhooks_of_a_space_share_a_bucket(self):
+		self.assertEqual(
+			get_bucket_key("https://chat.googleapis.com/v1/spaces/AAAA/messages?key=1&token=2"), "AAAA"
+		)
+		self.assertEqual(get_bucket_key("spaces/AAAA"), "AAAA")
+		self.assertEqual(
+			get_bucket_key("https://example.com/hook"), get_bucket_key("https://example.com/hook")
+		)
+
+
+class IntegrationTestRateLimiter(IntegrationTestCase):
+	def setUp(self):
+		self.space = f"spaces/_TEST{frappe.generate_hash(length=8)}"
+		key = frappe.cache().make_key(f"gchat_rate_limit:{get_bucket_key(self.space)}")
+		self.addCleanup(frappe.cache().delete, key)
+
+	def test_burst_then_wait(self):
+		for _ in range(3):
+			self.assertEqual(reserve(self.space, rate_limit=60, burst=3, max_wait=5), 0)
+
+		# One token per second, later reservations queue behind earlier ones
+		self.assertAlmostEqual(reserve(self.space, rate_limit=60, burst=3, max_wait=5), 1, delta=0.1)
+		self.assertAlmostEqual(reserve(self.space, rate_limit=60, burst=3, max_wait=5), 2, delta=0.1)
+
+	def test_wait_beyond_max_wait_raises(self):
+		self.assertEqual(reserve(self.space, rate_limit=60, burst=1, max_wait=0.5), 0)
+
+		with self.assertRaises(RateLimitExceeded) as error:
+			reserve(self.space, rate_limit=60, burst=1, max_wait=0.5)
+		# A retry cannot succeed before the next token
+		self.assertEqual(error.exception.retry_after, 1)
+
+		# Nothing was reserved by the rejected call
+		self.assertAlmostEqual(reserve(self.space, rate_limit=60, burst=1, max_wait=5), 1, delta=0.1)
+
+	def test_bucket_refills(self):
+		# 100 tokens per second
+		self.assertEqual(reserve(self.space, rate_limit=6000, burst=1, max_wait=0), 0)
+		with self.assertRaises(RateLimitExceeded):
+			reserve(self.space, rate_limit=6000, burst=1, max_wait=0)
+
+		time.sleep(0.05)
+		self.assertEqual(reserve(self.space, rate_limit=6000, burst=1, max_wait=0), 0)
@@ -0,0 +1,134 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from gchat_integration.api import handle_workflow_action
+from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+	_settings_cache,
+)
+from gchat_integration.gchat_integration.workflow_approvals import (
+	DOCUMENTS_INPUT,
+	MAX_LISTED_ERRORS,
+	apply_workflow_actions,
+	approvals_command,
+	get_digest_card,
+	get_result_message,
+	get_selected_documents,
+	handle_bulk_action,
+)
+
+TEST_WORKFLOW = "_Test Google Chat Approval"
+
+
+class UnitTestWorkflowApprovals(UnitTestCase):
+	def test_digest_card_round_trip(self):
+		approvals = [
+			{
+				"doctype": "ToDo",
+				"name": f"TD-{i}",
+				"state": "Pending",
+				"modified": "2026-10-18 12:00:00.000000",
+			}
+			for i in range(3)
+		]
+		card = get_digest_card(approvals)
+		widgets = card["cardsV2"][0]["card"]["sections"][0]["widgets"]
+		items = widgets[0]["selectionInput"]["items"]
+		selected, approve_all = widgets[1]["buttonList"]["buttons"]
+
+		expected = [["ToDo", f"TD-{i}", "2026-10-18 12:00:00.000000"] for i in range(3)]
+		self.assertEqual(get_selected_documents({"action": approve_all["onClick"]["action"]}), expected)
+
+		event = {
+			"action": selected["onClick"]["action"],
+			"common": {"formInputs": {DOCUMENTS_INPUT: {"stringInputs": {"value": [items[1]["value"]]}}}},
+		}
+		self.assertEqual(get_selected_documents(event), expected[1:2])
+
+	def test_result_message_lists_failures(self):
+		results = [("ToDo", f"TD-{i}", "Not a valid Workflow Action" if i % 2 else None) for i in range(50)]
+		message = get_result_message("Approve", results)
+		self.assertTrue(message.startswith("*Approve*: 25 of 50 documents done"))
+		self.assertEqual(message.count("Not a valid Workflow Action"), MAX_LISTED_ERRORS)
+		self.assertIn("and 5 more", message)
+
+
+class IntegrationTestWorkflowApprovals(IntegrationTestCase):
+	def setUp(self):
+		if not frappe.db.exists("Workflow", TEST_WORKFLOW):
+			workflow = frappe.new_doc("Workflow")
+			workflow.workflow_name = TEST_WORKFLOW
+			workflow.document_type = "ToDo"
+			workflow.workflow_state_field = "workflow_state"
+			workflow.is_active = 1
+			workflow.send_email_alert = 0
+			workflow.append("states", {"state": "Pending", "allow_edit": "System Manager"})
+			workflow.append("states", {"state": "Approved", "allow_edit": "System Manager"})
+			workflow.append(
+				"transitions",
+				{
+					"state": "Pending",
+					"action": "Approve",
+					"next_state": "Approved",
+					"allowed": "System Manager",
+					"allow_self_approval": 1,
+				},
+			)
+			workflow.insert(ignore_permissions=True)
+
+	def tearDown(self):
+		# apply_workflow_actions commits, so the test records must be removed and committed too
+		frappe.db.rollback()
+		todos = frappe.get_all("ToDo", filters={"description": ("like", "_Test Approval%")}, pluck="name")
+		if todos:
+			frappe.db.delete(
+				"Workflow Action", {"reference_doctype": "ToDo", "reference_name": ("in", todos)}
+			)
+		for name in todos:
+			frappe.delete_doc("ToDo", name, ignore_permissions=True, force=True)
+		frappe.delete_doc_if_exists("Workflow", TEST_WORKFLOW, force=True)
+		frappe.db.commit()
+
+	def test_changed_documents_are_not_approved(self):
+		fresh, changed = (
+			frappe.get_doc({"doctype": "ToDo", "description": f"_Test Approval {i}"}).insert()
+			for i in range(2)
+		)
+		card_version = str(changed.modified)
+		changed.description = "_Test Approval edited"
+		changed.save()
+
+		results = apply_workflow_actions(
+			"Administrator",
+			[["ToDo", fresh.name, str(fresh.modified)], ["ToDo", changed.name, card_version]],
+			"Approve",
+		)
+
+		self.assertIsNone(results[0][2])
+		self.assertIn("changed since the card was sent", results[1][2])
+		self.assertEqual(frappe.db.get_value("ToDo", fresh.name, "workflow_state"), "Approved")
+		self.assertEqual(frappe.db.get_value("ToDo", changed.name, "workflow_state"), "Pending")
+
+		# Already approved: reported, not raised
+		results = apply_workflow_actions("Administrator", [["ToDo", fresh.name, None]], "Approve")
+		self.assertTrue(results[0][2])
+
+	def test_refused_without_event_verification(self):
+		self.addCleanup(_settings_cache.invalidate_now)
+		frappe.db.set_single_value(
+			"Google Chat Settings", {"enable_bot": 1, "enable_workflow_approvals": 1, "project_number": None}
+		)
+		_settings_cache.invalidate_now()
+
+		# Anyone can post an event naming any user when requests are not verified
+		event = {
+			"user": {"email": "admin@example.com"},
+			"action": {
+				"parameters": [{"key": "doctype", "value": "ToDo"}, {"key": "docname", "value": "TD-1"}]
+			},
+		}
+		self.assertIn("Project Number", approvals_command(event, ""))
+		self.assertIn("Project Number", handle_bulk_action(event)["text"])
+		self.assertIn("Project Number", handle_workflow_action(event, "Approve")["text"])
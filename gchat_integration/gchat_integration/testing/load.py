@@ -0,0 +1,160 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+End-to-end load harness for webhook notifications.
+
+Fires `count` notifications through the real path, against a local `MockChatServer`:
+a ToDo insert triggers a Google Chat Notification, `send_a_google_chat_msg` writes the
+outbox row, and the outbox drain delivers it with `send_google_chat_message`. Reports
+throughput, p50/p99 latency from insert to receipt and error rates.
+
+	bench --site test_site execute gchat_integration.gchat_integration.testing.load.run \\
+		--kwargs "{'count': 500, 'latency': 0.05, 'error_rate': 0.05}"
+
+Creates a webhook, a Notification and ToDos prefixed with "_GChat Load", and removes
+them afterwards. Do not run it on a production site.
+"""
+
+import re
+import time
+
+import frappe
+
+from gchat_integration.gchat_integration.testing.mock_chat_server import MockChatServer
+
+PREFIX = "_GChat Load"
+MARKER_PATTERN = re.compile(r"\[gchat-load:([^\]]+)\]")
+DRAIN_TIMEOUT = 300  # seconds to wait for retried messages
+
+
+def run(count=100, latency=0, error_rate=0, rate_limit=60000, seed=0):
+	"""Send `count` notifications through a mock Google Chat server and report the results.
+
+	Args:
+		count: Number of notifications
+		latency: Seconds the mock server waits before every response
+		error_rate: Fraction of requests the mock server answers with 429/5xx
+		rate_limit: Messages per minute for the load test webhook
+		seed: Seed for the mock server's error injection
+	"""
+	frappe.only_for("System Manager")
+
+	with MockChatServer(latency=latency, error_rate=error_rate, seed=seed) as server:
+		webhook, notification = _setup(server, rate_limit)
+		try:
+			inserted_at = _fire(count)
+			drained_at = _drain()
+			report = _report(server, inserted_at, drained_at)
+		finally:
+			_teardown(webhook, notification)
+
+	for key, value in report.items():
+		print(f"{key:<22}{value}")
+	return report
+
+
+def _setup(server, rate_limit):
+	webhook = frappe.get_doc(
+		{
+			"doctype": "Google Chat Webhook",
+			"webhook_name": f"{PREFIX} {frappe.generate_hash(length=6)}",
+			"webhook_url": server.webhook_url(),
+			"rate_limit": rate_limit,
+		}
+	).insert(ignore_permissions=True)
+
+	notification = frappe.get_doc(
+		{
+			"doctype": "Notification",
+			"name": f"{PREFIX} {frappe.generate_hash(length=6)}",
+			"subject": PREFIX,
+			"document_type": "ToDo",
+			"event": "New",
+			"channel": "Google Chat",
+			"google_chat_type": "Webhook",
+			"google_chat_webhook": webhook.name,
+			"condition": f"doc.description.startswith('{PREFIX}')",
+			"message": "<p>Load test <b>[gchat-load:{{ doc.name }}]</b></p>",
+			"enabled": 1,
+		}
+	).insert(ignore_permissions=True)
+	frappe.db.commit()
+	return webhook, notification
+
+
+def _fire(count):
+	"""Insert ToDos one transaction at a time, like separate requests, and return their insert times."""
+	inserted_at = {}
+	for i in range(count):
+		started = time.time()
+		todo = frappe.get_doc({"doctype": "ToDo", "description": f"{PREFIX} {i}"}).insert(
+			ignore_permissions=True
+		)
+		frappe.db.commit()
+		inserted_at[todo.name] = started
+	return inserted_at
+
+
+def _drain():
+	"""Deliver everything in this process, including retries, and return when the outbox is empty."""
+	from gchat_integration.gchat_integration.doctype.google_chat_outbox.google_chat_outbox import (
+		drain_deferred,
+		drain_outbox,
+	)
+
+	started = time.monotonic()
+	drain_outbox()
+	while (
+		frappe.db.count("Google Chat Outbox", {"status": "Queued"})
+		and time.monotonic() - started < DRAIN_TIMEOUT
+	):
+		# Waits for rows deferred by retries, then picks up anything queued meanwhile
+		drain_deferred()
+		drain_outbox()
+	return time.time()
+
+
+def _report(server, inserted_at, drained_at):
+	received_at = {}
+	for request in server.requests:
+		if request.status == 200 and (match := MARKER_PATTERN.search(request.text)):
+			received_at.setdefault(match.group(1), request.received_at)
+
+	latencies = sorted(received_at[name] - inserted_at[name] for name in received_at if name in inserted_at)
+	count = len(inserted_at)
+	injected = sum(1 for request in server.requests if request.status != 200)
+	dead_letters = frappe.db.count(
+		"Google Chat Outbox", {"status": "Dead Letter", "reference_name": ("in", list(inserted_at))}
+	)
+	started = min(inserted_at.values(), default=drained_at)
+	duration = drained_at - started
+
+	return {
+		"notifications": count,
+		"delivered": len(received_at),
+		"dead_letters": dead_letters,
+		"undelivered_rate": round(1 - len(received_at) / count, 4) if count else 0,
+		"requests": len(server.requests),
+		"error_responses": injected,
+		"error_response_rate": round(injected / len(server.requests), 4) if server.requests else 0,
+		"duration_s": round(duration, 3),
+		"throughput_per_s": round(len(received_at) / duration, 1) if duration > 0 else 0,
+		"latency_p50_ms": _percentile(latencies, 50),
+		"latency_p99_ms": _percentile(latencies, 99),
+	}
+
+
+def _percentile(values, percentile):
+	if not values:
+		return None
+	index = min(len(values) - 1, round(percentile / 100 * (len(values) - 1)))
+	return round(values[index] * 1000, 1)
+
+
+def _teardown(webhook, notification):
+	frappe.db.delete("ToDo", {"description": ("like", f"{PREFIX}%")})
+	frappe.db.delete("Google Chat Outbox", {"webhook": webhook.name})
+	frappe.delete_doc("Notification", notification.name, ignore_permissions=True, force=True)
+	frappe.delete_doc("Google Chat Webhook", webhook.name, ignore_permissions=True, force=True)
+	frappe.db.commit()
@@ -0,0 +1,338 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Local stand-in for the Google Chat webhook and Chat API endpoints.
+
+Serves over plain HTTP on localhost, for tests and load runs that must not reach Google:
+
+- `POST /v1/spaces/{space}/messages`: incoming webhook and Chat API message create
+- `PATCH /v1/spaces/{space}/messages/{message}`: Chat API message update
+- `POST /token`: OAuth token endpoint for service account credentials
+- `GET /certs`: X.509 certificates Google Chat signs its requests to the app with
+
+Every request is recorded. Latency, and 429/5xx responses (randomly or for the next
+N requests), can be injected. Needs no site (except for the fixture helpers
+`configure_settings` and `create_webhook`), it can also run on its own:
+
+	python -m gchat_integration.gchat_integration.testing.mock_chat_server --port 8765 --latency 0.05
+"""
+
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MESSAGES_PATH = re.compile(r"^/v1/spaces/([^/]+)/messages$")
+MESSAGE_PATH = re.compile(r"^/v1/spaces/([^/]+)/messages/([^/]+)$")
+TOKEN_PATH = "/token"
+CERTS_PATH = "/certs"
+DEFAULT_ERROR_STATUSES = (429, 500, 503)
+
+
+@dataclass
+class RecordedRequest:
+	method: str
+	path: str
+	query: dict
+	headers: dict
+	body: dict | None
+	status: int
+	received_at: float = field(default_factory=time.time)
+	client_address: tuple | None = None
+
+	@property
+	def text(self):
+		return (self.body or {}).get("text", "")
+
+
+class MockChatServer:
+	"""Threaded mock Google Chat server.
+
+	Args:
+		host: Interface to bind
+		port: Port to bind, 0 picks a free one
+		latency: Seconds to wait before every response
+		error_rate: Fraction (0..1) of requests answered with one of `error_statuses`
+		error_statuses: Status codes injected by `error_rate`
+		retry_after: `Retry-After` seconds sent with injected 429s
+		seed: Seed for the error injection, for reproducible runs
+		trickle: Seconds to wait before each byte of a response body, for slow senders
+	"""
+
+	def __init__(
+		self,
+		host="127.0.0.1",
+		port=0,
+		latency=0,
+		error_rate=0,
+		error_statuses=DEFAULT_ERROR_STATUSES,
+		retry_after=1,
+		seed=None,
+		trickle=0,
+	):
+		self.latency = latency
+		self.trickle = trickle
+		self.error_rate = error_rate
+		self.error_statuses = tuple(error_statuses)
+		self.retry_after = retry_after
+		self.requests = []
+		self.messages = {}
+		# Key ID to PEM certificate, served on `certs_url`
+		self.certificates = {}
+
+		self._random = random.Random(seed)
+		self._forced_errors = []
+		self._ids = itertools.count(1)
+		self._lock = threading.Lock()
+		self._server = ThreadingHTTPServer((host, port), self._make_handler())
+		self._server.daemon_threads = True
+		self._thread = None
+
+	@property
+	def url(self):
+		host, port = self._server.server_address[:2]
+		return f"http://{host}:{port}"
+
+	@property
+	def token_uri(self):
+		return f"{self.url}{TOKEN_PATH}"
+
+	@property
+	def certs_url(self):
+		return f"{self.url}{CERTS_PATH}"
+
+	def webhook_url(self, space="MOCKSPACE"):
+		"""Return an incoming webhook URL for `space`, in the format Google Chat issues them."""
+		return f"{self.url}/v1/spaces/{space}/messages?key=mock-key&token=mock-token"
+
+	def start(self):
+		self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+		self._thread.start()
+		return self
+
+	def stop(self):
+		self._server.shutdown()
+		self._server.server_close()
+		if self._thread:
+			self._thread.join()
+
+	def __enter__(self):
+		return self.start()
+
+	def __exit__(self, *exc_info):
+		self.stop()
+
+	def fail_next(self, count=1, status=503):
+		"""Answer the next `count` requests with `status`."""
+		with self._lock:
+			self._forced_errors.extend([status] * count)
+
+	def reset(self):
+		with self._lock:
+			self.requests.clear()
+			self.messages.clear()
+			self._forced_errors.clear()
+
+	def configure_settings(self):
+		"""Point Google Chat Settings at this server, with a new service account key.
+
+		Needs a site. Returns the private key the service account signs its token requests with.
+		"""
+		import frappe
+		from cryptography.hazmat.primitives import serialization
+		from cryptography.hazmat.primitives.asymmetric import rsa
+
+		key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+		pem = key.private_bytes(
+			serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+		).decode()
+
+		settings = frappe.get_single("Google Chat Settings")
+		settings.service_account_creds = json.dumps(
+			{
+				"type": "service_account",
+				"project_id": "test",
+				"private_key_id": "test-key",
+				"private_key": pem,
+				"client_email": "bot@test.iam.gserviceaccount.com",
+			}
+		)
+		settings.token_uri = self.token_uri
+		settings.chat_api_base_url = f"{self.url}/v1"
+		settings.save()
+		frappe.db.after_commit.run()
+		return key
+
+	def create_webhook(self, webhook_name, space="MOCKSPACE", **fields):
+		"""Insert a Google Chat Webhook posting to `space` on this server. Needs a site."""
+		import frappe
+
+		return frappe.get_doc(
+			{
+				"doctype": "Google Chat Webhook",
+				"webhook_name": webhook_name,
+				"webhook_url": self.webhook_url(space),
+				**fields,
+			}
+		).insert()
+
+	def _next_status(self):
+		with self._lock:
+			if self._forced_errors:
+				return self._forced_errors.pop(0)
+			if self.error_rate and self._random.random() < self.error_rate:
+				return self._random.choice(self.error_statuses)
+		return 200
+
+	def _record(self, handler, body, status):
+		parts = urlsplit(handler.path)
+		request = RecordedRequest(
+			method=handler.command,
+			path=parts.path,
+			query={key: values[-1] for key, values in parse_qs(parts.query).items()},
+			headers=dict(handler.headers),
+			body=body,
+			status=status,
+			client_address=handler.client_address,
+		)
+		with self._lock:
+			self.requests.append(request)
+		return request
+
+	def _handle(self, handler):
+		length = int(handler.headers.get("Content-Length") or 0)
+		raw = handler.rfile.read(length) if length else b""
+		path = urlsplit(handler.path).path
+		if handler.command == "POST" and path == TOKEN_PATH:
+			body = {key: values[-1] for key, values in parse_qs(raw.decode()).items()}
+		else:
+			try:
+				body = json.loads(raw) if raw else None
+			except ValueError:
+				body = None
+
+		if self.latency:
+			time.sleep(self.latency)
+
+		status = self._next_status()
+		if status != 200:
+			self._record(handler, body, status)
+			headers = {"Retry-After": str(self.retry_after)} if status == 429 and self.retry_after else {}
+			return status, {"error": {"code": status, "message": "Injected by MockChatServer"}}, headers
+
+		if handler.command == "POST" and path == TOKEN_PATH:
+			self._record(handler, body, 200)
+			return (
+				200,
+				{"access_token": f"mock-token-{next(self._ids)}", "expires_in": 3600, "token_type": "Bearer"},
+				{},
+			)
+
+		if handler.command == "GET" and path == CERTS_PATH:
+			self._record(handler, body, 200)
+			return 200, dict(self.certificates), {"Cache-Control": "public, max-age=3600"}
+
+		if handler.command == "POST" and (match := MESSAGES_PATH.match(path)):
+			self._record(handler, body, 200)
+			return 200, self._create_message(match.group(1), body or {}, handler.path), {}
+
+		if handler.command == "PATCH" and (match := MESSAGE_PATH.match(path)):
+			name = f"spaces/{match.group(1)}/messages/{match.group(2)}"
+			if name not in self.messages:
+				self._record(handler, body, 404)
+				return 404, {"error": {"code": 404, "message": f"{name} not found"}}, {}
+
+			self._record(handler, body, 200)
+			with self._lock:
+				self.messages[name].update(body or {})
+				return 200, dict(self.messages[name]), {}
+
+		self._record(handler, body, 404)
+		return 404, {"error": {"code": 404, "message": f"No mock for {handler.command} {path}"}}, {}
+
+	def _create_message(self, space, body, raw_path):
+		message_id = next(self._ids)
+		query = parse_qs(urlsplit(raw_path).query)
+		thread = (body.get("thread") or {}).get("name")
+		if not thread:
+			thread_key = (body.get("thread") or {}).get("threadKey") or query.get("threadKey", [None])[-1]
+			thread = f"spaces/{space}/threads/{thread_key or message_id}"
+
+		message = dict(body, name=f"spaces/{space}/messages/{message_id}", thread={"name": thread})
+		with self._lock:
+			self.messages[message["name"]] = message
+		return message
+
+	def _make_handler(self):
+		server = self
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+
+			def _respond(self):
+				status, body, headers = server._handle(self)
+				payload = json.dumps(body).encode()
+				self.send_response(status)
+				self.send_header("Content-Type", "application/json")
+				self.send_header("Content-Length", str(len(payload)))
+				for key, value in headers.items():
+					self.send_header(key, value)
+				self.end_headers()
+				if not server.trickle:
+					self.wfile.write(payload)
+					return
+
+				self.wfile.flush()
+				try:
+					for i in range(len(payload)):
+						time.sleep(server.trickle)
+						self.wfile.write(payload[i : i + 1])
+						self.wfile.flush()
+				except ConnectionError:
+					# The client gave up waiting
+					self.close_connection = True
+
+			do_POST = do_PATCH = do_GET = _respond
+
+			def log_message(self, format, *args):
+				pass
+
+		return Handler
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+	)
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=8765)
+	parser.add_argument("--latency", type=float, default=0, help="seconds before every response")
+	parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests that fail")
+	parser.add_argument("--seed", type=int)
+	parser.add_argument(
+		"--trickle", type=float, default=0, help="seconds before each byte of a response body"
+	)
+	args = parser.parse_args(argv)
+
+	server = MockChatServer(
+		args.host, args.port, args.latency, args.error_rate, seed=args.seed, trickle=args.trickle
+	)
+	print(f"Mock Google Chat server on {server.url}")
+	print(f"Webhook URL: {server.webhook_url()}")
+	try:
+		server._server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server._server.server_close()
+
+
+if __name__ == "__main__":
+	main()
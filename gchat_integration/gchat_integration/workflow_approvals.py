@@ -0,0 +1,287 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+"""
+Bulk workflow approvals from a Google Chat card.
+
+The `approvals` command answers with a digest card of the user's open Workflow Actions,
+with a checkbox per document and "Approve Selected" / "Approve All" buttons. A click
+queues one background job that applies the action to every document as the clicking
+user, then posts a single result message to the card's thread.
+
+The clicking user is taken from the event, so approvals are refused unless Google
+Chat's bearer token is verified for every request (a Google Cloud Project Number is
+set in Google Chat Settings). Without it, anyone could post an event naming any user.
+
+Each document is locked and compared with the version listed on the card before the
+transition is applied: a document changed since the card was sent is reported, not
+approved. Documents are committed one by one, so a failure only affects its document.
+"""
+
+import json
+from hashlib import sha1
+
+import frappe
+from frappe.utils import strip_html
+
+DEFAULT_ACTION = "Approve"
+BULK_ACTION_METHOD = "apply_workflow_action_bulk"
+DOCUMENTS_INPUT = "documents"
+# Documents per card, and per click
+MAX_DOCUMENTS = 100
+# Failed documents listed in the result message, the rest are counted
+MAX_LISTED_ERRORS = 20
+
+
+def get_unavailable_reason():
+	"""Return why workflow approvals cannot be used from Google Chat, or None."""
+	from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+		is_event_verification_enabled,
+		is_workflow_approvals_enabled,
+	)
+
+	if not is_workflow_approvals_enabled():
+		return "Workflow approvals are not enabled"
+	if not is_event_verification_enabled():
+		return "Workflow approvals need the Google Cloud Project Number in Google Chat Settings"
+
+
+def get_event_user(event):
+	"""Return the enabled User of the Google Chat user who sent an event, or None."""
+	email = (event.get("user") or {}).get("email")
+	if not email:
+		return None
+	return frappe.db.get_value("User", {"email": email, "enabled": 1}, "name")
+
+
+def approvals_command(event, argument_text):
+	"""`approvals` command: the digest card of the user's pending approvals."""
+	if reason := get_unavailable_reason():
+		return reason
+
+	user = get_event_user(event)
+	if not user:
+		return "Your Google Chat account is not linked to an enabled user"
+
+	approvals = get_pending_approvals(user)
+	if not approvals:
+		return "You have no pending approvals"
+
+	return get_digest_card(approvals)
+
+
+def get_pending_approvals(user, limit=MAX_DOCUMENTS):
+	"""Return the documents with an open Workflow Action for `user`, oldest first.
+
+	Returns:
+		List of dicts with `doctype`, `name`, `state` and `modified` (the version the
+		action will be checked against)
+	"""
+	actions = frappe.get_list(
+		"Workflow Action",
+		filters={"status": "Open"},
+		fields=["reference_doctype", "reference_name", "workflow_state"],
+		order_by="creation asc",
+		limit=limit,
+		user=user,
+	)
+
+	names = {}
+	for action in actions:
+		names.setdefault(action.reference_doctype, set()).add(action.reference_name)
+
+	# One query per DocType for the current versions
+	modified = {}
+	for doctype, doctype_names in names.items():
+		for row in frappe.get_all(
+			doctype, filters={"name": ("in", list(doctype_names))}, fields=["name", "modified"]
+		):
+			modified[(doctype, row.name)] = str(row.modified)
+
+	approvals = []
+	seen = set()
+	for action in actions:
+		key = (action.reference_doctype, action.reference_name)
+		if key in modified and key not in seen:
+			seen.add(key)
+			approvals.append(
+				{
+					"doctype": action.reference_doctype,
+					"name": action.reference_name,
+					"state": action.workflow_state,
+					"modified": modified[key],
+				}
+			)
+	return approvals
+
+
+def get_digest_card(approvals, action=DEFAULT_ACTION):
+	"""Build the digest card for `get_pending_approvals` results."""
+	values = [json.dumps([row["doctype"], row["name"], row["modified"]]) for row in approvals]
+
+	def button(text, documents=None):
+		parameters = [{"key": "action", "value": action}]
+		if documents is not None:
+			parameters.append({"key": DOCUMENTS_INPUT, "value": json.dumps(documents)})
+		return {
+			"text": text,
+			"onClick": {"action": {"function": BULK_ACTION_METHOD, "parameters": parameters}},
+		}
+
+	return {
+		"cardsV2": [
+			{
+				"cardId": "workflow-approvals",
+				"card": {
+					"header": {
+						"title": "Pending Approvals",
+						"subtitle": f"{len(approvals)} document{'s' if len(approvals) != 1 else ''}",
+					},
+					"sections": [
+						{
+							"widgets": [
+								{
+									"selectionInput": {
+										"name": DOCUMENTS_INPUT,
+										"type": "CHECK_BOX",
+										"items": [
+											{
+												"text": f"{row['doctype']}: {row['name']} ({row['state']})",
+												"value": value,
+												"selected": False,
+											}
+											for row, value in zip(approvals, values, strict=True)
+										],
+									}
+								},
+								{
+									"buttonList": {
+										"buttons": [
+											button(f"{action} Selected"),
+											button(f"{action} All", [json.loads(value) for value in values]),
+										]
+									}
+								},
+							]
+						}
+					],
+				},
+			}
+		]
+	}
+
+
+def get_selected_documents(event):
+	"""Return the `[doctype, name, modified]` documents of a digest card click.
+
+	"Approve All" carries all documents of the card as a parameter, "Approve Selected"
+	gets the checked ones from the form inputs.
+	"""
+	action = event.get("action") or {}
+	for parameter in action.get("parameters") or ():
+		if parameter.get("key") == DOCUMENTS_INPUT:
+			return json.loads(parameter.get("value") or "[]")
+
+	form_inputs = (event.get("common") or {}).get("formInputs") or {}
+	values = ((form_inputs.get(DOCUMENTS_INPUT) or {}).get("stringInputs") or {}).get("value") or []
+	return [json.loads(value) for value in values]
+
+
+def handle_bulk_action(event):
+	"""CARD_CLICKED handler of the digest card: queue the batch and acknowledge it."""
+	if reason := get_unavailable_reason():
+		return {"text": reason}
+
+	user = get_event_user(event)
+	if not user:
+		return {"text": "Your Google Chat account is not linked to an enabled user"}
+
+	parameters = {p.get("key"): p.get("value") for p in (event.get("action") or {}).get("parameters") or ()}
+	action = parameters.get("action") or DEFAULT_ACTION
+	documents = get_selected_documents(event)[:MAX_DOCUMENTS]
+	if not documents:
+		return {"text": "No documents selected"}
+
+	# A second click with the same selection while the first runs is dropped
+	job_id = sha1(json.dumps([user, action, documents]).encode()).hexdigest()
+	frappe.enqueue(
+		process_bulk_action,
+		queue="long",
+		job_id=f"gchat_workflow_action:{job_id}",
+		deduplicate=True,
+		chat_event=event,
+		user=user,
+		action=action,
+		documents=documents,
+	)
+	return {"text": f"Applying {action} to {len(documents)} document{'s' if len(documents) != 1 else ''}..."}
+
+
+def process_bulk_action(chat_event, user, action, documents):
+	"""Background job: apply the action and post the consolidated result to the card's thread."""
+	from gchat_integration.api import post_event_response
+
+	results = apply_workflow_actions(user, documents, action)
+	post_event_response(chat_event, {"text": get_result_message(action, results)})
+
+
+def apply_workflow_actions(user, documents, action):
+	"""Apply a workflow action to several documents as `user`, committing each one.
+
+	Args:
+		documents: List of `[doctype, name, modified]`, `modified` None skips the version check
+
+	Returns:
+		List of `(doctype, name, error)`, with `error` None for applied documents
+	"""
+	previous_user = frappe.session.user
+	frappe.set_user(user)
+	results = []
+	try:
+		for doctype, name, modified in documents:
+			try:
+				apply_workflow_action(doctype, name, action, modified)
+				frappe.db.commit()
+				results.append((doctype, name, None))
+			except Exception as e:
+				frappe.db.rollback()
+				if not isinstance(e, (frappe.ValidationError, frappe.PermissionError)):
+					frappe.log_error(
+						f"Google Chat workflow action {action} failed for {doctype} {name}",
+						"Google Chat Integration",
+					)
+				results.append((doctype, name, strip_html(str(e)) or e.__class__.__name__))
+			finally:
+				frappe.clear_messages()
+	finally:
+		frappe.set_user(previous_user)
+
+	return results
+
+
+def apply_workflow_action(doctype, name, action, modified=None):
+	"""Apply a workflow action to a document, if it is still the version given as `modified`.
+
+	Raises:
+		frappe.TimestampMismatchError: if the document changed since `modified`
+	"""
+	from frappe.model.workflow import apply_workflow
+
+	# The row stays locked until the commit, nothing can change it between the check and the save
+	doc = frappe.get_doc(doctype, name, for_update=True)
+	if modified and str(doc.modified) != modified:
+		raise frappe.TimestampMismatchError(f"{doctype} {name} was changed since the card was sent")
+
+	apply_workflow(doc, action)
+
+
+def get_result_message(action, results):
+	"""One message for all documents of a batch, listing the failed ones."""
+	failed = [(doctype, name, error) for doctype, name, error in results if error]
+	lines = [f"*{action}*: {len(results) - len(failed)} of {len(results)} documents done"]
+	if failed:
+		lines.append("Not done:")
+		lines.extend(f"• {doctype} {name}: {error}" for doctype, name, error in failed[:MAX_LISTED_ERRORS])
+		if len(failed) > MAX_LISTED_ERRORS:
+			lines.append(f"…and {len(failed) - MAX_LISTED_ERRORS} more")
+	return "\n".join(lines)
@@ -98,24 +98,15 @@ fixtures = [
 				"in",
 				[
 					"Notification-google_chat_webhook",
+					"Notification-google_chat_webhooks",
+					"Notification-google_chat_message_mode",
 					"Notification-google_chat_space",
-					"Notification-google_chat_type"
-				]
+					"Notification-google_chat_type",
+				],
 			]
-		]
+		],
 	},
-	{
-		"dt": "Property Setter",
-		"filters": [
-			[
-				"name",
-				"in",
-				[
-					"Notification-channel-options"
-				]
-			]
-		]
-	}
+	{"dt": "Property Setter", "filters": [["name", "in", ["Notification-channel-options"]]]},
 ]
 
 
@@ -143,9 +134,7 @@ fixtures = [
 
 # DocType JS
 # ----------
-doctype_js = {
-	"Notification": "public/js/notification_custom.js"
-}
+doctype_js = {"Notification": "public/js/notification_custom.js"}
 
 # Desk Notifications
 # ------------------
@@ -178,6 +167,19 @@ doctype_js = {
 # 	}
 # }
 
+doc_events = {
+	"Notification": {
+		"on_update": [
+			"gchat_integration.gchat_integration.notification_extension.clear_template_cache",
+			"gchat_integration.gchat_integration.notification_index.clear_notification_index",
+		],
+		"on_trash": [
+			"gchat_integration.gchat_integration.notification_extension.clear_template_cache",
+			"gchat_integration.gchat_integration.notification_index.clear_notification_index",
+		],
+	}
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -199,6 +201,25 @@ doctype_js = {
 # 	],
 # }
 
+scheduler_events = {
+	"all": [
+		"gchat_integration.gchat_integration.doctype.google_chat_outbox.google_chat_outbox.process_outbox",
+		"gchat_integration.gchat_integration.doctype.google_chat_delivery_log.google_chat_delivery_log.flush_delivery_log",
+	],
+}
+
+# Google Chat Bot Commands
+# ------------------------
+# Slash commands or keywords (first word of a message) handled by the bot,
+# see gchat_integration/commands.py
+
+gchat_commands = {
+	"/help": "gchat_integration.gchat_integration.commands.help_command",
+	"help": "gchat_integration.gchat_integration.commands.help_command",
+	"/approvals": "gchat_integration.gchat_integration.workflow_approvals.approvals_command",
+	"approvals": "gchat_integration.gchat_integration.workflow_approvals.approvals_command",
+}
+
 # Testing
 # -------
 
@@ -243,8 +264,10 @@ doctype_js = {
 # Migrate
 # -------
 after_migrate = [
-    "gchat_integration.gchat_integration.install.setup_notification_extension",
-    "gchat_integration.gchat_integration.setup_workspace.setup_integrations_workspace"
+	"gchat_integration.gchat_integration.install.create_settings",
+	"gchat_integration.gchat_integration.install.create_notification_custom_fields",
+	"gchat_integration.gchat_integration.install.setup_notification_extension",
+	"gchat_integration.gchat_integration.setup_workspace.setup_integrations_workspace",
 ]
 
 # App startup - Load notification extension on every request
@@ -252,7 +275,6 @@ after_migrate = [
 app_startup = "gchat_integration.gchat_integration.notification_extension.extend_notification"
 
 
-
 # Job Events
 # ----------
 # before_job = ["gchat_integration.utils.before_job"]
@@ -296,8 +318,11 @@ app_startup = "gchat_integration.gchat_integration.notification_extension.extend
 # 	"Logging DocType Name": 30  # days to retain logs
 # }
 
+default_log_clearing_doctypes = {
+	"Google Chat Delivery Log": 30,
+}
+
 # Translation
 # ------------
 # List of apps whose translatable strings should be excluded from this app's translations.
 # ignore_translatable_strings_from = []
-
@@ -0,0 +1,12 @@
+# Copyright (c) 2026, Frappe and contributors
+# License: MIT. See LICENSE
+
+import frappe
+
+
+def execute():
+	"""Drop the stored value of the removed Verification Token setting.
+
+	Incoming events are verified with the Google Cloud Project Number instead.
+	"""
+	frappe.db.delete("Singles", {"doctype": "Google Chat Settings", "field": "verification_token"})
@@ -0,0 +1,87 @@
+# Copyright (c) 2026, Frappe and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import now
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from gchat_integration.api import (
+	claim_event,
+	get_event_key,
+	handle_google_chat_event,
+	process_event,
+	release_event,
+)
+from gchat_integration.gchat_integration.doctype.google_chat_settings.google_chat_settings import (
+	_settings_cache,
+)
+
+
+class IntegrationTestEventDeduplication(IntegrationTestCase):
+	def setUp(self):
+		settings = frappe.db.get_singles_dict("Google Chat Settings")
+		self.addCleanup(_settings_cache.invalidate_now)
+		self.addCleanup(
+			frappe.db.set_single_value,
+			"Google Chat Settings",
+			{
+				"enable_bot": settings.get("enable_bot") or 0,
+				"project_number": settings.get("project_number"),
+				"process_events_in_background": settings.get("process_events_in_background") or 0,
+			},
+		)
+		frappe.db.set_single_value(
+			"Google Chat Settings",
+			{"enable_bot": 1, "project_number": None, "process_events_in_background": 0},
+		)
+		_settings_cache.invalidate_now()
+
+		self.event = {
+			"type": "ADDED_TO_SPACE",
+			"eventTime": now(),
+			"space": {"name": f"spaces/_TEST{frappe.generate_hash(length=8)}", "displayName": "Ops"},
+			"user": {"name": "users/1", "displayName": "Jane"},
+		}
+		self.addCleanup(release_event, get_event_key(self.event))
+
+		previous_request = getattr(frappe.local, "request", None)
+		self.addCleanup(setattr, frappe.local, "request", previous_request)
+
+	def post_event(self, event):
+		frappe.local.request = Request(EnvironBuilder(method="POST", json=event).get_environ())
+		return handle_google_chat_event()
+
+	def test_retried_delivery_gets_the_first_response(self):
+		response = self.post_event(self.event)
+		self.assertEqual(response, {"text": "Thanks for adding me to Ops, Jane!"})
+
+		with patch("gchat_integration.api.dispatch_event") as dispatch_event:
+			self.assertEqual(self.post_event(self.event), response)
+		dispatch_event.assert_not_called()
+
+	def test_retry_while_first_delivery_is_pending(self):
+		self.assertIsNone(claim_event(get_event_key(self.event)))
+
+		with patch("gchat_integration.api.dispatch_event") as dispatch_event:
+			self.assertEqual(self.post_event(self.event), {})
+		dispatch_event.assert_not_called()
+
+	def test_failed_event_is_released(self):
+		with patch("gchat_integration.api.dispatch_event", side_effect=Exception("handler failed")):
+			self.assertEqual(self.post_event(self.event), {"text": "Error processing event"})
+
+		# Google Chat's retry is handled again
+		self.assertEqual(self.post_event(self.event), {"text": "Thanks for adding me to Ops, Jane!"})
+
+	def test_failed_background_event_is_released(self):
+		event_key = get_event_key(self.event)
+		self.assertIsNone(claim_event(event_key))
+
+		with patch("gchat_integration.api.dispatch_event", side_effect=Exception("handler failed")):
+			process_event(self.event)
+
+		self.assertIsNone(claim_event(event_key))